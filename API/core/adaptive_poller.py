@@ -0,0 +1,82 @@
+import random
+from typing import Dict, List
+
+FAST_INTERVAL = 5          # segundos entre consultas de un dispositivo inestable
+HOT_TTL = 300              # segundos que un dispositivo sigue inestable después de su último cambio
+REBOOT_WINDOW = 600        # uptime por debajo del cual se considera reinicio reciente
+MAX_SWEEP_FACTOR = 4       # el barrido completo se espacia hasta 4 x polling_interval
+STABLE_CYCLES_PER_STEP = 4 # ciclos sin cambios para espaciar un paso más el barrido
+MAX_HOT_PER_TICK = 50      # dispositivos individuales por consulta rápida
+BACKOFF_BASE = 2           # segundos
+BACKOFF_MAX = 300          # segundos
+
+# Campos cuyo cambio indica un dispositivo inestable (upTime avanza en cada resync y no cuenta)
+VOLATILE_FIELDS = {"reachabilityStatus", "collectionStatus", "bootDateTime", "interfaceCount", "softwareVersion"}
+
+def backoff_delay(failures: int, base: float = BACKOFF_BASE, maximum: float = BACKOFF_MAX) -> float:
+    """Espera exponencial con jitter (entre 50% y 150% del valor nominal)"""
+    return min(maximum, base * 2 ** max(0, failures - 1)) * random.uniform(0.5, 1.5)
+
+class AdaptivePoller:
+    """
+    Decide qué consultar entre barridos completos.
+    Los dispositivos que cambian campos relevantes o se reiniciaron hace poco
+    pasan a "calientes" y se consultan uno a uno vía /network-device/{id} cada
+    FAST_INTERVAL; el resto espera al barrido, que se espacia mientras el
+    inventario está estable. Las consultas que fallan se reintentan con espera
+    exponencial y jitter.
+    """
+    def __init__(self):
+        self.hot_until: Dict[str, float] = {}
+        self.next_poll: Dict[str, float] = {}
+        self.failures: Dict[str, int] = {}
+        self.stable_cycles = 0
+
+    def observe(self, changes, devices_by_id, now: float, cycle: bool = False):
+        """Actualizar el estado con el ChangeSet de un sondeo (cycle=True en el ciclo principal)"""
+        volatile = False
+        for device_id in changes.removed:
+            self.hot_until.pop(device_id, None)
+            self.next_poll.pop(device_id, None)
+            self.failures.pop(device_id, None)
+        for device_id, modified in changes.modified.items():
+            if VOLATILE_FIELDS.intersection(modified):
+                self._mark_hot(device_id, now)
+                volatile = True
+        for device_id in changes.changed_ids():
+            device = devices_by_id.get(device_id)
+            uptime = device.uptime_seconds if device is not None else None
+            if uptime is not None and uptime < REBOOT_WINDOW:
+                self._mark_hot(device_id, now)
+        if cycle:
+            self.stable_cycles = 0 if volatile else self.stable_cycles + 1
+
+    def _mark_hot(self, device_id: str, now: float):
+        self.hot_until[device_id] = now + HOT_TTL
+        self.next_poll.setdefault(device_id, now + FAST_INTERVAL * random.uniform(0.8, 1.2))
+
+    def sweep_interval(self, base_interval: float) -> float:
+        return base_interval * min(MAX_SWEEP_FACTOR, 1 + self.stable_cycles // STABLE_CYCLES_PER_STEP)
+
+    def due(self, now: float) -> List[str]:
+        """Dispositivos calientes cuya próxima consulta ya venció"""
+        for device_id in [d for d, until in self.hot_until.items() if until < now]:
+            del self.hot_until[device_id]
+            self.next_poll.pop(device_id, None)
+            self.failures.pop(device_id, None)
+        due = [d for d, at in self.next_poll.items() if at <= now]
+        due.sort(key=self.next_poll.__getitem__)
+        return due[:MAX_HOT_PER_TICK]
+
+    def record(self, device_id: str, ok: bool, now: float):
+        if device_id not in self.hot_until:
+            return
+        if ok:
+            self.failures.pop(device_id, None)
+            self.next_poll[device_id] = now + FAST_INTERVAL * random.uniform(0.8, 1.2)
+        else:
+            failures = self.failures[device_id] = self.failures.get(device_id, 0) + 1
+            self.next_poll[device_id] = now + backoff_delay(failures)
+
+    def status(self) -> Dict:
+        return {"hot_devices": len(self.hot_until), "stable_cycles": self.stable_cycles}
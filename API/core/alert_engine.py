@@ -0,0 +1,223 @@
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+@dataclass
+class Alert:
+    type: str
+    message: str
+    severity: str
+    timestamp: str
+    device_id: Optional[str] = None
+    status: str = "open"
+    resolved_at: Optional[str] = None
+    interface: Optional[str] = None
+
+@dataclass(frozen=True)
+class AlertRule:
+    type: str
+    severity: str
+    fields: Tuple[str, ...]           # campos de DeviceInfo de los que depende la regla
+    condition: Callable[[object], bool]
+    message: str                      # plantilla con campos de DeviceInfo
+    raise_after: float = 0            # segundos que debe mantenerse la condición para abrir
+    clear_after: float = 0            # segundos sin condición para resolver
+
+def _recent_reboot(device) -> bool:
+    uptime = device.uptime_seconds
+    return uptime is not None and uptime < 300  # Menos de 5 minutos de uptime
+
+class _Attributes:
+    """Atributos de un objeto como mapeo para format_map (DeviceInfo usa __slots__, sin __dict__)"""
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __getitem__(self, name: str):
+        return getattr(self.obj, name)
+
+DEFAULT_RULES = (
+    AlertRule(
+        type="DEVICE_UNREACHABLE",
+        severity="critical",
+        fields=("reachabilityStatus",),
+        condition=lambda d: d.reachabilityStatus.lower() != "reachable",
+        message="El dispositivo {hostname} ({managementIpAddress}) no es alcanzable",
+        clear_after=30
+    ),
+    AlertRule(
+        type="UNSUPPORTED_DEVICE",
+        severity="warning",
+        fields=("deviceSupportLevel",),
+        condition=lambda d: d.deviceSupportLevel.lower() != "supported",
+        message="El dispositivo {hostname} no está soportado (Estado: {deviceSupportLevel})"
+    ),
+    AlertRule(
+        type="COLLECTION_ISSUE",
+        severity="warning",
+        fields=("collectionStatus",),
+        condition=lambda d: d.collectionStatus.lower() != "managed",
+        message="Problema con la colección de datos del dispositivo {hostname} (Estado: {collectionStatus})"
+    ),
+    AlertRule(
+        type="RECENT_REBOOT",
+        severity="warning",
+        fields=("upTime",),
+        condition=_recent_reboot,
+        message="El dispositivo {hostname} se reinició recientemente (Uptime: {upTime})"
+    ),
+)
+
+# Reglas sobre InterfaceSample (interface_stats); los umbrales se aplican al calcular los indicadores
+INTERFACE_RULES = (
+    AlertRule(
+        type="HIGH_BANDWIDTH",
+        severity="warning",
+        fields=("over_bandwidth",),
+        condition=lambda s: s.over_bandwidth,
+        message="Uso de ancho de banda alto en {hostname} {interface} (rx {rx_utilization}% / tx {tx_utilization}%)"
+    ),
+    AlertRule(
+        type="HIGH_ERROR_RATE",
+        severity="warning",
+        fields=("over_errors",),
+        condition=lambda s: s.over_errors,
+        message="Tasa de errores alta en {hostname} {interface} ({error_delta} errores en el último intervalo)"
+    ),
+)
+
+class AlertState:
+    """Estado de una alerta (tipo, dispositivo) entre ciclos"""
+    __slots__ = ("active", "since", "alert", "transitions", "flapping")
+
+    def __init__(self, now: float):
+        self.active = False       # resultado de la última evaluación de la condición
+        self.since = now          # desde cuándo la condición tiene ese valor
+        self.alert = None         # alerta abierta o resuelta más reciente
+        self.transitions: Deque[float] = deque()
+        self.flapping = False
+
+class AlertEngine:
+    """
+    Motor de alertas incremental.
+    Las reglas se indexan una vez por campo; en cada ciclo solo se evalúan los
+    dispositivos del ChangeSet y las reglas que dependen de los campos que cambiaron.
+    Las alertas se identifican por (tipo, device_id), conservan su timestamp de
+    apertura, aplican histéresis y supresión de oscilaciones, y las resueltas se
+    retienen durante `retention` segundos.
+    """
+    def __init__(self, rules=DEFAULT_RULES, retention: float = 24 * 3600,
+                 flap_window: float = 600, flap_threshold: int = 4):
+        self.rules = {rule.type: rule for rule in rules}
+        self.rules_by_field: Dict[str, List[AlertRule]] = defaultdict(list)
+        for rule in rules:
+            for field_name in rule.fields:
+                self.rules_by_field[field_name].append(rule)
+        self.retention = retention
+        self.flap_window = flap_window
+        self.flap_threshold = flap_threshold
+        self.states: Dict[Tuple[str, str], AlertState] = {}
+        self._pending: Set[Tuple[str, str]] = set()      # claves cuya condición no coincide con la alerta
+        self._by_device: Dict[str, Set[str]] = defaultdict(set)
+
+    def evaluate(self, changes, devices_by_id: Dict[str, object], now: Optional[float] = None) -> List[Tuple[str, object]]:
+        """Aplicar un ChangeSet; devuelve los eventos ("open" | "resolve", Alert) del ciclo"""
+        now = now if now is not None else time.time()
+        for device_id in changes.added:
+            self._evaluate_rules(devices_by_id[device_id], self.rules.values(), now)
+        for device_id, modified in changes.modified.items():
+            rules = {rule.type: rule for name in modified for rule in self.rules_by_field.get(name, ())}
+            if rules:
+                self._evaluate_rules(devices_by_id[device_id], rules.values(), now)
+        for device_id in changes.removed:
+            for alert_type in self._by_device.get(device_id, ()):
+                state = self.states[(alert_type, device_id)]
+                self._set_condition(state, (alert_type, device_id), False, now)
+                state.since = now - self.rules[alert_type].clear_after
+                state.flapping = False
+        events = self._advance(devices_by_id, now)
+        self._expire(now)
+        return events
+
+    def _evaluate_rules(self, device, rules, now: float):
+        for rule in rules:
+            key = (rule.type, device.id)
+            active = bool(rule.condition(device))
+            state = self.states.get(key)
+            if state is None:
+                if not active:
+                    continue
+                state = self.states[key] = AlertState(now)
+                self._by_device[device.id].add(rule.type)
+            self._set_condition(state, key, active, now)
+
+    def _set_condition(self, state: AlertState, key, active: bool, now: float):
+        if active == state.active:
+            return
+        state.active = active
+        state.since = now
+        state.transitions.append(now)
+        while state.transitions and state.transitions[0] < now - self.flap_window:
+            state.transitions.popleft()
+        state.flapping = len(state.transitions) >= self.flap_threshold
+        self._pending.add(key)
+
+    def _advance(self, devices_by_id, now: float) -> List[Tuple[str, object]]:
+        """Abrir o resolver las alertas cuya condición superó la histéresis"""
+        events = []
+        for key in list(self._pending):
+            state = self.states[key]
+            rule = self.rules[key[0]]
+            is_open = state.alert is not None and state.alert.status == "open"
+            if state.active == is_open:
+                self._pending.discard(key)
+                continue
+            if state.flapping:
+                # Mientras oscila se mantiene el último estado publicado
+                while state.transitions and state.transitions[0] < now - self.flap_window:
+                    state.transitions.popleft()
+                state.flapping = len(state.transitions) >= self.flap_threshold
+                continue
+            if state.active and now - state.since >= rule.raise_after:
+                device = devices_by_id.get(key[1])
+                state.alert = Alert(
+                    type=rule.type,
+                    message=rule.message.format_map(_Attributes(device)) if device is not None else rule.type,
+                    severity=rule.severity,
+                    timestamp=datetime.fromtimestamp(now).strftime(TIMESTAMP_FORMAT),
+                    device_id=getattr(device, "device_id", key[1]),
+                    interface=getattr(device, "interface", None)
+                )
+                events.append(("open", state.alert))
+                self._pending.discard(key)
+            elif not state.active and now - state.since >= rule.clear_after:
+                state.alert = replace(state.alert, status="resolved",
+                                      resolved_at=datetime.fromtimestamp(now).strftime(TIMESTAMP_FORMAT))
+                events.append(("resolve", state.alert))
+                self._pending.discard(key)
+        return events
+
+    def _expire(self, now: float):
+        """Olvidar alertas resueltas más viejas que la retención"""
+        cutoff = datetime.fromtimestamp(now - self.retention).strftime(TIMESTAMP_FORMAT)
+        for key, state in list(self.states.items()):
+            if key in self._pending or state.active:
+                continue
+            if state.alert is None or (state.alert.status == "resolved" and state.alert.resolved_at < cutoff):
+                del self.states[key]
+                self._by_device[key[1]].discard(key[0])
+                if not self._by_device[key[1]]:
+                    del self._by_device[key[1]]
+
+    def open_alerts(self) -> List:
+        return [state.alert for state in self.states.values()
+                if state.alert is not None and state.alert.status == "open"]
+
+    def resolved_alerts(self) -> List:
+        return [state.alert for state in self.states.values()
+                if state.alert is not None and state.alert.status == "resolved"]
@@ -0,0 +1,175 @@
+"""
+Historial de alertas en SQLite (modo WAL).
+
+Cada alerta abierta por el motor es una fila; al resolverse se completa
+resolved_at en la misma fila. Los eventos se acumulan en memoria y se
+escriben en una sola transacción por ciclo (flush), que también borra las
+alertas resueltas hace más de alert-retention horas. Las consultas usan una
+conexión por hilo y, gracias a WAL, no esperan a la escritura en curso.
+"""
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from alert_engine import TIMESTAMP_FORMAT
+
+ALERT_DB = "alerts.db"
+EXPIRE_INTERVAL = 300    # segundos entre borrados por retención
+QUERY_LIMIT = 100        # alertas por página por defecto
+MAX_QUERY_LIMIT = 1000
+
+# Los índices de una columna quedan ordenados por id dentro de cada valor: los filtros
+# por dispositivo, tipo o severidad paginan (id < cursor ORDER BY id DESC) sin ordenar
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    device_id TEXT,
+    interface TEXT NOT NULL DEFAULT '',
+    message TEXT NOT NULL,
+    opened_at REAL NOT NULL,
+    resolved_at REAL
+);
+CREATE INDEX IF NOT EXISTS alerts_device ON alerts (device_id);
+CREATE INDEX IF NOT EXISTS alerts_type ON alerts (type);
+CREATE INDEX IF NOT EXISTS alerts_severity ON alerts (severity);
+CREATE INDEX IF NOT EXISTS alerts_opened ON alerts (opened_at);
+CREATE INDEX IF NOT EXISTS alerts_resolved ON alerts (resolved_at);
+CREATE INDEX IF NOT EXISTS alerts_open ON alerts (type, device_id, interface) WHERE resolved_at IS NULL;
+"""
+
+def _epoch(timestamp: Optional[str]) -> Optional[float]:
+    if not timestamp:
+        return None
+    return datetime.strptime(timestamp, TIMESTAMP_FORMAT).timestamp()
+
+def _timestamp(epoch: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(epoch).strftime(TIMESTAMP_FORMAT) if epoch is not None else None
+
+class AlertStore:
+    def __init__(self, path: str = ALERT_DB):
+        self.path = path
+        self._pending: List[Tuple[str, object]] = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._local = threading.local()
+        self._expired_at = 0.0
+
+    # La base se abre con el primer uso, no al construir el monitor
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")   # con WAL, la base no se corrompe ante un corte
+        return connection
+
+    def _writer_connection(self) -> sqlite3.Connection:
+        if self._writer is None:
+            writer = self._connect()
+            with writer:
+                writer.executescript(SCHEMA)
+                # Alertas que quedaron abiertas en una ejecución anterior: el motor las vuelve
+                # a abrir en el primer ciclo si la condición sigue
+                writer.execute("UPDATE alerts SET resolved_at = ? WHERE resolved_at IS NULL", (time.time(),))
+            self._writer = writer
+        return self._writer
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            with self._write_lock:
+                self._writer_connection()    # crea el esquema si la base es nueva
+            connection = self._connect()
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    def add(self, events: Sequence[Tuple[str, object]]):
+        """Encolar eventos ("open" | "resolve", Alert) para el próximo flush"""
+        if events:
+            with self._pending_lock:
+                self._pending.extend(events)
+
+    def flush(self, retention: float, now: Optional[float] = None) -> int:
+        """Escribir los eventos pendientes en una transacción; cada EXPIRE_INTERVAL, aplicar la retención"""
+        now = now if now is not None else time.time()
+        with self._pending_lock:
+            events, self._pending = self._pending, []
+        expire = now - self._expired_at >= EXPIRE_INTERVAL
+        if not events and not expire:
+            return 0
+        with self._write_lock:
+            writer = self._writer_connection()
+            with writer:
+                for event, alert in events:
+                    key = (alert.type, alert.device_id, alert.interface or "")
+                    if event == "open":
+                        writer.execute(
+                            "INSERT INTO alerts (type, device_id, interface, severity, message, opened_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (*key, alert.severity, alert.message, _epoch(alert.timestamp))
+                        )
+                    else:
+                        writer.execute(
+                            "UPDATE alerts SET resolved_at = ? "
+                            "WHERE type = ? AND device_id IS ? AND interface = ? AND resolved_at IS NULL",
+                            (_epoch(alert.resolved_at) or now, *key)
+                        )
+                if expire:
+                    writer.execute("DELETE FROM alerts WHERE resolved_at < ?", (now - retention,))
+                    self._expired_at = now
+        return len(events)
+
+    def query(self, device_id: Optional[str] = None, type: Optional[str] = None,
+              severity: Optional[str] = None, status: str = "all", start: Optional[float] = None,
+              end: Optional[float] = None, limit: int = QUERY_LIMIT, cursor: Optional[int] = None) -> Dict:
+        """
+        Alertas de la más nueva a la más vieja. start/end seleccionan las que estuvieron
+        abiertas en algún momento del intervalo. `cursor` es el `next_cursor` de la
+        página anterior (paginación por id, estable aunque lleguen alertas nuevas).
+        """
+        if status not in ("open", "resolved", "all"):
+            raise ValueError("status debe ser open, resolved o all")
+        if not 0 < limit <= MAX_QUERY_LIMIT:
+            raise ValueError(f"limit debe estar entre 1 y {MAX_QUERY_LIMIT}")
+        clauses, params = [], []
+        for column, value in (("device_id", device_id), ("type", type), ("severity", severity)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if status == "open":
+            clauses.append("resolved_at IS NULL")
+        elif status == "resolved":
+            clauses.append("resolved_at IS NOT NULL")
+        if end is not None:
+            clauses.append("opened_at <= ?")
+            params.append(end)
+        if start is not None:
+            clauses.append("(resolved_at IS NULL OR resolved_at >= ?)")
+            params.append(start)
+        if cursor is not None:
+            clauses.append("id < ?")
+            params.append(cursor)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT * FROM alerts {where} ORDER BY id DESC LIMIT ?", (*params, limit + 1)
+        ).fetchall()
+        alerts = [{
+            "type": row["type"],
+            "message": row["message"],
+            "severity": row["severity"],
+            "timestamp": _timestamp(row["opened_at"]),
+            "device_id": row["device_id"],
+            "status": "open" if row["resolved_at"] is None else "resolved",
+            "resolved_at": _timestamp(row["resolved_at"]),
+            "interface": row["interface"] or None
+        } for row in rows[:limit]]
+        return {"alerts": alerts, "next_cursor": rows[limit - 1]["id"] if len(rows) > limit else None}
+
+    def close(self):
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
@@ -1,18 +1,55 @@
 import os
+import json
+import time
+import zlib
+import asyncio
+import inspect
 import threading
+from functools import partial
+from dataclasses import asdict
 from typing import List, Dict, Optional
 from datetime import datetime
+from contextlib import asynccontextmanager
+import anyio
 import fastapi
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, field_validator
-import uvicorn
-import pyang
-from pyang.repository import FileRepository
-from network_monitor import NetworkMonitor, Alert
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from pydantic import BaseModel, Field, field_validator
+from network_monitor import NetworkMonitor
+from snapshot_channel import CollectorUnavailable
+from response_cache import ResponseCache
+from event_stream import format_sse, parse_event_id
+from metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS
+from yang_schema import YangSchema, load_schema
+from alert_store import QUERY_LIMIT
+import yang_data
+
+@asynccontextmanager
+async def lifespan(app: fastapi.FastAPI):
+    # El monitor arranca con el servidor y no al importar el módulo: los procesos
+    # hijos (p. ej. el render de reportes con spawn) reimportan este archivo
+    yang_schema()
+    started = monitor.start_monitoring()
+    if inspect.isawaitable(started):
+        await started
+    yield
+    if COLLECTOR_MODE == "asyncio":
+        await monitor.close()    # además cierra los clientes httpx de los controladores
+    else:
+        monitor.stop_monitoring()
+
+def monitor_call(method, *args, **kwargs):
+    """
+    Llamar a un método del monitor desde un handler síncrono (threadpool).
+    Los del monitor asyncio se ejecutan en el event loop de la aplicación.
+    """
+    if inspect.iscoroutinefunction(method):
+        return anyio.from_thread.run(partial(method, *args, **kwargs))
+    return method(*args, **kwargs)
 
 # Configuración de la aplicación FastAPI
 app = fastapi.FastAPI(
+    lifespan=lifespan,
     title="Network Monitor RESTCONF API",
     description="API RESTCONF para el sistema de monitoreo de red con validación YANG",
     version="2.0.0",
@@ -32,17 +69,87 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(CollectorUnavailable)
+async def collector_unavailable(request: fastapi.Request, exc: CollectorUnavailable):
+    return JSONResponse(status_code=fastapi.status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": str(exc)})
+
+@app.middleware("http")
+async def record_latency(request: fastapi.Request, call_next):
+    # Se etiqueta con la plantilla de la ruta (no con la URL) para no multiplicar series
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - started,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code
+    )
+    return response
+
 # Configuración de modelos YANG
 YANG_MODELS_DIR = os.path.join(os.path.dirname(__file__), "yang_models")
 YANG_MODELS = [
     "ietf-yang-types.yang",
     "ietf-inet-types.yang",
+    "network-devices.yang",
     "network-monitor.yang",
     "network-monitor-extensions.yang"
 ]
 
+YANG_JSON = "application/yang-data+json"
+YANG_XML = "application/yang-data+xml"
+_yang_schema: Optional[YangSchema] = None
+_yang_lock = threading.Lock()
+
+def yang_schema() -> YangSchema:
+    """Esquema compilado de YANG_MODELS (caché en yang_models/__yangcache__), cargado al arrancar"""
+    global _yang_schema
+    if _yang_schema is None:
+        with _yang_lock:
+            if _yang_schema is None:
+                _yang_schema = load_schema(YANG_MODELS_DIR, YANG_MODELS)
+    return _yang_schema
+
+def yang_media_type(request: fastapi.Request) -> Optional[str]:
+    """Formato YANG pedido en Accept; None mantiene el JSON plano de siempre"""
+    accept = request.headers.get("accept", "")
+    found = sorted((accept.find(media), media) for media in (YANG_JSON, YANG_XML) if media in accept)
+    return found[0][1] if found else None
+
+def yang_response(request: fastapi.Request, media_type: str, key: tuple, generation: int,
+                  path: str, build, epoch: str = "") -> Response:
+    """Respuesta cacheada por generación codificada con el esquema compilado"""
+    schema = yang_schema()
+    encode = schema.encode_xml if media_type == YANG_XML else schema.encode_json
+    return response_cache.response(request, (media_type, *key), generation, build,
+                                   media_type=media_type, serialize=partial(encode, path), epoch=epoch)
+
 # Instancia del monitor de red
-monitor = NetworkMonitor()
+# Con varios workers de uvicorn la recolección corre en collector_service.py y cada
+# worker lee la instantánea que publica (NETMON_COLLECTOR=external). Con
+# NETMON_COLLECTOR=asyncio el ciclo es una tarea del event loop de la API (httpx).
+COLLECTOR_MODE = os.environ.get("NETMON_COLLECTOR", "thread")
+if COLLECTOR_MODE == "external":
+    from remote_monitor import RemoteMonitor
+    monitor = RemoteMonitor()
+elif COLLECTOR_MODE == "asyncio":
+    from async_monitor import AsyncNetworkMonitor
+    monitor = AsyncNetworkMonitor()
+else:
+    monitor = NetworkMonitor()
+
+# Respuestas serializadas por generación del monitor (ETag / If-None-Match)
+response_cache = ResponseCache()
+
+STREAM_POLL_INTERVAL = 1   # segundos entre revisiones del EventBus
+STREAM_KEEPALIVE = 15      # segundos sin eventos antes de enviar un comentario keep-alive
+MAX_POLLING_INTERVAL = 86400   # segundos (un sondeo por día)
+MAX_HISTORY_LIMIT = 100000     # puntos de historial por dispositivo
+MAX_INTERFACE_TOP = 1000       # interfaces por consulta top=N
+# cProfile y tracemalloc (/admin/profile, /admin/memory) exponen el interior del proceso:
+# solo se habilitan explícitamente con NETMON_DIAGNOSTICS=1
+DIAGNOSTICS_ENABLED = os.environ.get("NETMON_DIAGNOSTICS") == "1"
 
 class DeviceModel(BaseModel):
     id: str
@@ -66,6 +173,7 @@ class DeviceModel(BaseModel):
     deviceSupportLevel: Optional[str] = None
     collectionStatus: Optional[str] = None
     bootDateTime: Optional[str] = None
+    controller: Optional[str] = None
 
     class Config:
         json_schema_extra = {
@@ -84,6 +192,9 @@ class AlertModel(BaseModel):
     severity: str
     timestamp: str
     device_id: Optional[str] = None
+    status: str = "open"
+    resolved_at: Optional[str] = None
+    interface: Optional[str] = None
 
     class Config:
         json_schema_extra = {
@@ -92,6 +203,17 @@ class AlertModel(BaseModel):
             "yang-path": "alerts/alert"
         }
 
+class AlertHistoryModel(BaseModel):
+    alerts: List[AlertModel]
+    next_cursor: Optional[int] = None
+
+    class Config:
+        json_schema_extra = {
+            "yang-type": "container",
+            "yang-module": "network-alerts",
+            "yang-path": "alert-history"
+        }
+
 class HistoryPointModel(BaseModel):
     timestamp: str
     reachability: str
@@ -106,10 +228,69 @@ class HistoryPointModel(BaseModel):
             "yang-path": "/device-history/point"
         }
 
+class BulkHistoryRequestModel(BaseModel):
+    device_ids: List[str]
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    fields: Optional[List[str]] = None
+
+    class Config:
+        json_schema_extra = {
+            "yang-type": "rpc",
+            "yang-module": "network-devices",
+            "yang-path": "/get-history/input"
+        }
+
+class ChangeSetModel(BaseModel):
+    added: List[str]
+    removed: List[str]
+    modified: Dict[str, List[str]]
+
+    class Config:
+        json_schema_extra = {
+            "yang-type": "container",
+            "yang-module": "network-devices",
+            "yang-path": "/device-changes"
+        }
+
+class InterfaceModel(BaseModel):
+    device_id: str
+    hostname: str
+    interface: str
+    description: str = ""
+    enabled: bool
+    oper_status: str
+    speed: Optional[int] = None            # Mbps
+    in_octets: Optional[int] = None
+    out_octets: Optional[int] = None
+    in_errors: Optional[int] = None
+    out_errors: Optional[int] = None
+    rx_bps: Optional[float] = None
+    tx_bps: Optional[float] = None
+    rx_utilization: Optional[float] = None
+    tx_utilization: Optional[float] = None
+    error_delta: Optional[float] = None
+    error_rate: Optional[float] = None
+    last_updated: Optional[str] = None
+
+    class Config:
+        json_schema_extra = {
+            "yang-type": "list",
+            "yang-module": "network-monitor",
+            "yang-path": "interfaces/interface"
+        }
+
+class ProfileRequestModel(BaseModel):
+    cycles: int = 1
+    mode: str = "cprofile"     # cprofile | sampling
+
 class MonitorConfigModel(BaseModel):
-    polling_interval: int
-    history_limit: int
+    polling_interval: int = Field(gt=0, le=MAX_POLLING_INTERVAL)
+    history_limit: int = Field(gt=0, le=MAX_HISTORY_LIMIT)
     running: bool
+    alert_retention: int = 24
+    bandwidth_threshold: float = 70.0
+    error_threshold: int = 5
 
     class Config:
         json_schema_extra = {
@@ -118,69 +299,267 @@ class MonitorConfigModel(BaseModel):
             "yang-path": "/monitor-config"
         }
 
-# Iniciar el monitor en segundo plano
-monitor_thread = threading.Thread(target=monitor.start_monitoring)
-monitor_thread.daemon = True
-monitor_thread.start()
-
 ## Endpoints de Dispositivos
 @app.get("/restconf/data/network-devices:devices", 
          response_model=List[DeviceModel],
          tags=["devices"])
-def get_devices():
-    """Obtener todos los dispositivos monitoreados"""
-    if not monitor.devices:
-        if not monitor.fetch_devices():
+def get_devices(request: fastapi.Request,
+                hostname: Optional[str] = None,
+                managementIpAddress: Optional[str] = None,
+                serialNumber: Optional[str] = None,
+                reachabilityStatus: Optional[str] = None,
+                platformId: Optional[str] = None,
+                family: Optional[str] = None,
+                role: Optional[str] = None,
+                softwareVersion: Optional[str] = None,
+                controller: Optional[str] = None):
+    """Obtener los dispositivos monitoreados, opcionalmente filtrados por campo"""
+    snapshot = monitor.snapshot
+    if not snapshot.devices:
+        if not monitor_call(monitor.refresh):
             raise fastapi.HTTPException(
                 status_code=fastapi.status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="No se pudieron obtener los dispositivos"
             )
-    return monitor.devices
+        snapshot = monitor.snapshot
+    criteria = {
+        "hostname": hostname,
+        "managementIpAddress": managementIpAddress,
+        "serialNumber": serialNumber,
+        "reachabilityStatus": reachabilityStatus,
+        "platformId": platformId,
+        "family": family,
+        "role": role,
+        "softwareVersion": softwareVersion,
+        "controller": controller
+    }
+    index = snapshot.index
+    media_type = yang_media_type(request)
+    if media_type:
+        return yang_response(
+            request, media_type, ("devices", *criteria.values()), snapshot.generation, yang_data.DEVICES,
+            lambda: yang_data.devices_data(yang_schema(), index.filter(**criteria)), snapshot.epoch
+        )
+    return response_cache.response(
+        request,
+        ("devices", *criteria.values()),
+        snapshot.generation,
+        lambda: [d.to_dict() for d in index.filter(**criteria)],
+        epoch=snapshot.epoch
+    )
 
 @app.get("/restconf/data/network-devices:devices/device={device_id}", 
          response_model=DeviceModel,
          tags=["devices"])
-def get_device(device_id: str):
+def get_device(request: fastapi.Request, device_id: str):
     """Obtener un dispositivo específico"""
-    device = next((d for d in monitor.devices if d.id == device_id), None)
+    snapshot = monitor.snapshot
+    device = snapshot.index.get("id", device_id)
     if not device:
         raise fastapi.HTTPException(status_code=404, detail="Dispositivo no encontrado")
-    return device
+    media_type = yang_media_type(request)
+    if media_type:
+        return yang_response(request, media_type, ("device", device_id), snapshot.generation, yang_data.DEVICE,
+                             lambda: yang_data.device_entry(yang_schema(), device), snapshot.epoch)
+    return response_cache.response(request, ("device", device_id), snapshot.generation, lambda: device.to_dict(),
+                                   epoch=snapshot.epoch)
+
+@app.get("/restconf/data/network-devices:devices/device={device_id}/interfaces", 
+         response_model=List[InterfaceModel],
+         tags=["devices"])
+def get_device_interfaces(request: fastapi.Request, device_id: str):
+    """Obtener las interfaces de un dispositivo con sus contadores, tasas y utilización"""
+    snapshot = monitor.snapshot
+    stats = snapshot.interfaces
+    if device_id not in stats.rows_by_device:
+        raise fastapi.HTTPException(status_code=404, detail="Interfaces no encontradas")
+    media_type = yang_media_type(request)
+    if media_type:
+        return yang_response(request, media_type, ("interfaces", device_id), stats.generation, yang_data.INTERFACES,
+                             lambda: yang_data.interfaces_data(stats.device_samples(device_id)), snapshot.epoch)
+    return response_cache.response(
+        request, ("interfaces", device_id), stats.generation,
+        lambda: [asdict(s) for s in stats.device_samples(device_id)], epoch=snapshot.epoch
+    )
+
+@app.get("/restconf/data/network-monitor:interfaces", 
+         response_model=List[InterfaceModel],
+         tags=["monitor"])
+def get_interfaces(request: fastapi.Request,
+                   top: Optional[int] = fastapi.Query(None, ge=1, le=MAX_INTERFACE_TOP),
+                   sort: str = "utilization"):
+    """
+    Obtener las interfaces de todos los dispositivos.
+    Con top=N se devuelven las N de mayor utilización (sort=utilization) o tasa de errores (sort=errors).
+    """
+    if sort not in ("utilization", "errors"):
+        raise fastapi.HTTPException(status_code=400, detail="sort debe ser utilization o errors")
+    snapshot = monitor.snapshot
+    stats = snapshot.interfaces
+    build = (lambda: [asdict(s) for s in stats.samples()]) if top is None else \
+            (lambda: [asdict(s) for s in stats.top(top, sort)])
+    return response_cache.response(request, ("interfaces", top, sort), stats.generation, build, epoch=snapshot.epoch)
+
+def history_window() -> float:
+    """Segundos que cubre el historial en memoria: inicio por defecto de un rango con solo `end`"""
+    status = monitor.status()
+    return status["history_limit"] * status["polling_interval"]
 
 @app.get("/restconf/data/network-devices:device-history/device={device_id}", 
          response_model=List[HistoryPointModel],
          tags=["devices"])
-def get_device_history(device_id: str):
-    """Obtener historial de un dispositivo"""
-    if device_id not in monitor.device_history:
+def get_device_history(device_id: str,
+                       start: Optional[datetime] = None,
+                       end: Optional[datetime] = None,
+                       step: Optional[int] = None):
+    """
+    Obtener historial de un dispositivo.
+    Con start/end se lee desde los segmentos en disco; con step (segundos) se
+    devuelven agregados del nivel de rollup más grueso que divide el paso.
+    """
+    if step is not None:
+        end_ts = end.timestamp() if end else datetime.now().timestamp()
+        start_ts = start.timestamp() if start else end_ts - 86400
+        points = monitor.history_rollups.query(device_id, start_ts, end_ts, step)
+        if points is None:
+            steps = [tier for tier, _ in monitor.history_rollups.tiers]
+            raise fastapi.HTTPException(status_code=400, detail=f"step debe ser múltiplo de alguno de {steps}")
+        return JSONResponse(content=points)
+    if start is not None or end is not None:
+        end_ts = end.timestamp() if end else datetime.now().timestamp()
+        start_ts = start.timestamp() if start else end_ts - history_window()
+        return monitor.history_segments.points(device_id, start_ts, end_ts)
+    history = monitor.snapshot.history
+    if device_id not in history:
         raise fastapi.HTTPException(status_code=404, detail="Historial no encontrado")
-    return monitor.device_history[device_id]
+    return history.points(device_id)
+
+@app.post("/restconf/operations/network-devices:get-history",
+          tags=["devices"])
+def get_history_bulk(request: fastapi.Request, query: BulkHistoryRequestModel):
+    """
+    Historial de varios dispositivos en una sola petición, como NDJSON
+    (una línea {"device_id", "points"} por dispositivo), comprimido con gzip si
+    el cliente lo acepta. `fields` limita los campos de cada punto.
+    """
+    fields = query.fields
+    if fields is not None:
+        unknown = set(fields) - set(HistoryPointModel.model_fields)
+        if unknown:
+            raise fastapi.HTTPException(status_code=400, detail=f"Campos desconocidos: {sorted(unknown)}")
+    if query.start is not None or query.end is not None:
+        end_ts = query.end.timestamp() if query.end else datetime.now().timestamp()
+        start_ts = query.start.timestamp() if query.start else end_ts - history_window()
+        history = monitor.history_segments.points_by_device(query.device_ids, start_ts, end_ts)
+        source = lambda device_id: history[device_id]
+    else:
+        snapshot_history = monitor.snapshot.history
+        source = lambda device_id: (snapshot_history.points(device_id)
+                                    if device_id in snapshot_history else [])
+
+    def lines():
+        for device_id in query.device_ids:
+            points = source(device_id)
+            if fields is not None:
+                points = [{name: point[name] for name in fields} for point in points]
+            yield json.dumps({"device_id": device_id, "points": points},
+                             separators=(",", ":"), ensure_ascii=False).encode() + b"\n"
+
+    headers = {}
+    body = lines()
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        body = _gzip_stream(body)
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+def _gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+@app.get("/restconf/data/network-devices:device-changes", 
+         response_model=ChangeSetModel,
+         tags=["devices"])
+def get_device_changes():
+    """Obtener los cambios del inventario en el último sondeo"""
+    return monitor.snapshot.changes
 
 ## Endpoints de Alertas
 @app.get("/restconf/data/network-alerts:alerts", 
          response_model=List[AlertModel],
          tags=["alerts"])
-def get_alerts():
-    """Obtener todas las alertas activas"""
-    return monitor.alerts
+def get_alerts(request: fastapi.Request, status: str = "open"):
+    """Obtener las alertas activas (status=resolved|all incluye las resueltas retenidas)"""
+    snapshot = monitor.snapshot
+    if status == "open":
+        alerts = snapshot.alerts
+    elif status == "resolved":
+        alerts = snapshot.resolved_alerts
+    elif status == "all":
+        alerts = snapshot.alerts + snapshot.resolved_alerts
+    else:
+        raise fastapi.HTTPException(status_code=400, detail="status debe ser open, resolved o all")
+    media_type = yang_media_type(request)
+    if media_type:
+        return yang_response(request, media_type, ("alerts", status), snapshot.generation, yang_data.ALERTS,
+                             lambda: yang_data.alerts_data(alerts), snapshot.epoch)
+    return response_cache.response(
+        request, ("alerts", status), snapshot.generation, lambda: [asdict(a) for a in alerts],
+        epoch=snapshot.epoch
+    )
+
+@app.get("/restconf/data/network-alerts:alert-history",
+         response_model=AlertHistoryModel,
+         tags=["alerts"])
+def get_alert_history(device_id: Optional[str] = None,
+                      type: Optional[str] = None,
+                      severity: Optional[str] = None,
+                      status: str = "all",
+                      start: Optional[datetime] = None,
+                      end: Optional[datetime] = None,
+                      limit: int = QUERY_LIMIT,
+                      cursor: Optional[int] = None):
+    """
+    Historial de alertas (retenido alert-retention horas tras resolverse), de la
+    más nueva a la más vieja. start/end devuelven las alertas abiertas en algún
+    momento del intervalo; para la página siguiente se pasa cursor=next_cursor.
+    """
+    try:
+        return monitor.alert_history.query(device_id, type, severity, status,
+                                           start.timestamp() if start else None,
+                                           end.timestamp() if end else None,
+                                           limit, cursor)
+    except ValueError as e:
+        raise fastapi.HTTPException(status_code=400, detail=str(e))
 
 ## Endpoints de Control
 @app.get("/restconf/data/network-monitor:status", 
          response_model=MonitorConfigModel,
          tags=["monitor"])
-def get_monitor_status():
+def get_monitor_status(request: fastapi.Request):
     """Obtener estado del monitor"""
-    return {
-        "polling_interval": monitor.polling_interval,
-        "history_limit": monitor.history_limit,
-        "running": monitor.running
-    }
+    status = monitor.status()
+    media_type = yang_media_type(request)
+    if media_type:
+        schema = yang_schema()
+        encode = schema.encode_xml if media_type == YANG_XML else schema.encode_json
+        return Response(encode(yang_data.MONITOR_CONFIG, yang_data.config_data(status)), media_type=media_type)
+    return status
+
+@app.get("/restconf/data/network-monitor:controllers", 
+         tags=["monitor"])
+def get_controllers():
+    """Estado y duración del último ciclo de cada controlador DNA Center"""
+    return monitor.scheduler.status()
 
 @app.post("/restconf/data/network-monitor:update", 
           tags=["monitor"])
 def force_update():
     """Forzar actualización de datos"""
-    monitor.fetch_devices()
+    monitor_call(monitor.refresh, force=True)
     return {"message": "Actualización forzada iniciada"}
 
 @app.put("/restconf/data/network-monitor:config", 
@@ -188,16 +567,112 @@ def force_update():
          tags=["monitor"])
 def update_config(config: MonitorConfigModel):
     """Actualizar configuración del monitor"""
-    monitor.polling_interval = config.polling_interval
-    monitor.history_limit = config.history_limit
-    
-    if config.running and not monitor.running:
-        monitor.start_monitoring()
-    elif not config.running and monitor.running:
-        monitor.stop_monitoring()
-    
-    return get_monitor_status()
+    return monitor_call(monitor.configure, **config.model_dump())
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Métricas en formato de exposición de Prometheus"""
+    return Response(monitor.render_metrics(), media_type=CONTENT_TYPE)
+
+## Endpoints de administración (diagnóstico sobre el proceso en ejecución)
+def require_diagnostics():
+    if not DIAGNOSTICS_ENABLED:
+        raise fastapi.HTTPException(status_code=403, detail="Diagnóstico deshabilitado (NETMON_DIAGNOSTICS=1)")
+
+@app.post("/admin/profile", tags=["admin"], dependencies=[fastapi.Depends(require_diagnostics)])
+def start_profile(request: ProfileRequestModel):
+    """Perfilar los próximos `cycles` ciclos del monitor (cprofile o sampling)"""
+    try:
+        monitor.profiler.start(request.cycles, request.mode)
+    except ValueError as e:
+        raise fastapi.HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise fastapi.HTTPException(status_code=409, detail=str(e))
+    return monitor.profiler.status()
+
+@app.get("/admin/profile", tags=["admin"], dependencies=[fastapi.Depends(require_diagnostics)])
+def get_profile():
+    """Estado del perfilado y resultado del último"""
+    return monitor.profiler.status()
+
+@app.delete("/admin/profile", tags=["admin"], dependencies=[fastapi.Depends(require_diagnostics)])
+def stop_profile():
+    """Terminar el perfilado al final del ciclo en curso"""
+    monitor.profiler.stop()
+    return monitor.profiler.status()
+
+@app.post("/admin/memory", tags=["admin"], dependencies=[fastapi.Depends(require_diagnostics)])
+def start_memory_tracing(frames: int = 10):
+    """Activar tracemalloc (solo registra asignaciones posteriores)"""
+    monitor.memory.start(frames)
+    return {"tracing": monitor.memory.running}
+
+@app.get("/admin/memory/snapshot", tags=["admin"], dependencies=[fastapi.Depends(require_diagnostics)])
+def get_memory_snapshot(limit: int = 20, group_by: str = "lineno"):
+    """Principales sitios de asignación y su crecimiento desde la instantánea anterior"""
+    try:
+        return monitor.memory.snapshot(limit, group_by)
+    except ValueError as e:
+        raise fastapi.HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise fastapi.HTTPException(status_code=409, detail=str(e))
+
+@app.delete("/admin/memory", tags=["admin"], dependencies=[fastapi.Depends(require_diagnostics)])
+def stop_memory_tracing():
+    """Desactivar tracemalloc"""
+    monitor.memory.stop()
+    return {"tracing": monitor.memory.running}
+
+@app.get("/admin/cycles", tags=["admin"])
+def get_recent_cycles(limit: int = 20):
+    """Tiempos por etapa de los ciclos más recientes (el más nuevo primero)"""
+    cycles = list(monitor.recent_cycles)[-limit:][::-1] if limit > 0 else []
+    return {"polling_interval": monitor.polling_interval, "cycles": cycles}
+
+@app.get("/admin/yang/validate", tags=["admin"])
+def validate_snapshot():
+    """Validar la instantánea publicada completa (inventario, interfaces, alertas y configuración) contra los modelos YANG"""
+    return yang_data.validate_snapshot(yang_schema(), monitor.snapshot, config=monitor.status())
+
+## Stream de eventos
+@app.get("/restconf/streams/network-monitor:events", tags=["monitor"])
+async def stream_events(request: fastapi.Request, last_event_id: Optional[str] = None):
+    """
+    Stream SSE con los cambios de dispositivos, apertura/resolución de alertas y
+    el estado del monitor en cada ciclo. Cada evento lleva un id `<época>-<seq>`;
+    para reanudar se envía el último visto en `Last-Event-ID` o `last_event_id`.
+    Si ya no está en el backlog o es de otra ejecución del monitor (la secuencia
+    empieza de nuevo al reiniciar) se emite `resync` y el cliente debe volver a
+    leer el estado completo.
+    """
+    if last_event_id is None:
+        last_event_id = request.headers.get("last-event-id")
+
+    async def events():
+        bus = monitor.events
+        epoch, last = (bus.epoch, bus.last_seq) if last_event_id is None else parse_event_id(last_event_id)
+        idle = 0.0
+        while not await request.is_disconnected():
+            bus = monitor.events
+            pending = bus.since(last) if epoch == bus.epoch else None
+            if pending is None:
+                epoch, last = bus.epoch, bus.last_seq
+                yield format_sse(bus.event_id(last), "resync", monitor.status())
+                continue
+            for seq, event, data in pending:
+                yield format_sse(bus.event_id(seq), event, data)
+                last = seq
+            if pending:
+                idle = 0.0
+            elif idle >= STREAM_KEEPALIVE:
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            await asyncio.sleep(STREAM_POLL_INTERVAL)
+            idle += STREAM_POLL_INTERVAL
 
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
 
 ## Endpoint de descubrimiento RESTCONF
 @app.get("/.well-known/host-meta", include_in_schema=False)
@@ -217,6 +692,7 @@ def get_host_meta():
     )
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(
         app,
         host="127.0.0.1",
@@ -0,0 +1,181 @@
+import time
+import asyncio
+from typing import Dict, List, Optional
+import httpx
+from collector import PaginatedCollector, PAGE_SIZE, FETCH_WORKERS, CONNECT_TIMEOUT, PAGE_TIMEOUT, PAGE_RETRIES
+from controllers import ControllerScheduler, Controller
+from metrics import DNAC_REQUESTS, DNAC_REQUEST_SECONDS
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_BACKOFF = 0.3      # segundos; se duplica en cada reintento (como Retry de urllib3)
+
+class AsyncPaginatedCollector:
+    """
+    Versión asyncio de PaginatedCollector sobre httpx.AsyncClient: las
+    páginas se piden concurrentemente (hasta `max_workers` a la vez) sobre un
+    único pool keep-alive, sin hilos.
+    """
+    def __init__(self, base_url: str, headers: Dict[str, str],
+                 page_size: int = PAGE_SIZE, max_workers: int = FETCH_WORKERS,
+                 timeout: float = PAGE_TIMEOUT, retries: int = PAGE_RETRIES):
+        self.base_url = base_url.rstrip("/")
+        self.resource = self.base_url.rsplit("/", 1)[-1]
+        self.page_size = page_size
+        self.retries = retries
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            timeout=httpx.Timeout(timeout, connect=CONNECT_TIMEOUT),
+            # retries del transporte: solo errores de conexión; 429/5xx se reintentan en _get
+            transport=httpx.AsyncHTTPTransport(
+                verify=False, retries=retries,
+                limits=httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers)
+            )
+        )
+        self._slots = asyncio.Semaphore(max_workers)
+
+    async def _get(self, resource: str, url: str, **kwargs) -> httpx.Response:
+        """GET con reintentos ante 429/5xx y latencia y código HTTP registrados en las métricas"""
+        started = time.perf_counter()
+        status = "error"
+        try:
+            async with self._slots:
+                for attempt in range(self.retries + 1):
+                    response = await self.client.get(url, **kwargs)
+                    if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                        break
+                    await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+            status = str(response.status_code)
+            return response
+        finally:
+            label = f"{self.resource}/{resource}"
+            DNAC_REQUEST_SECONDS.observe(time.perf_counter() - started, resource=label)
+            DNAC_REQUESTS.inc(resource=label, status=status)
+
+    async def fetch_count(self) -> Optional[int]:
+        try:
+            response = await self._get("count", f"{self.base_url}/count")
+            if response.status_code == 200:
+                return int(response.json().get("response", 0))
+            print(f"Error al obtener el total de dispositivos: {response.status_code}")
+        except Exception as e:
+            print(f"Error en fetch_count: {str(e)}")
+        return None
+
+    async def fetch_page(self, offset: int) -> List[Dict]:
+        response = await self._get("page", self.base_url, params={"offset": offset, "limit": self.page_size})
+        if response.status_code != 200:
+            raise RuntimeError(f"página offset={offset}: HTTP {response.status_code}")
+        return response.json().get("response", [])
+
+    async def fetch_device(self, device_id: str) -> Optional[Dict]:
+        try:
+            response = await self._get("device", f"{self.base_url}/{device_id}")
+            if response.status_code == 200:
+                return response.json().get("response") or None
+            print(f"Error al obtener el dispositivo {device_id}: {response.status_code}")
+        except Exception as e:
+            print(f"Error en fetch_device: {str(e)}")
+        return None
+
+    async def fetch_devices(self, device_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        results = await asyncio.gather(*(self.fetch_device(device_id) for device_id in device_ids))
+        return dict(zip(device_ids, results))
+
+    async def collect(self, deadline: Optional[float] = None) -> Optional[List[Dict]]:
+        """Igual que PaginatedCollector.collect: None si alguna página falla o no llega antes de `deadline`"""
+        total = await self.fetch_count()
+        timeout = None if deadline is None else max(0, deadline - time.time())
+        try:
+            if total is None:
+                pages = await asyncio.wait_for(self._collect_sequential(), timeout)
+            else:
+                pages = await self._collect_concurrent(total, timeout)
+        except asyncio.TimeoutError:
+            print("Error en la recolección paginada: límite del ciclo alcanzado")
+            return None
+        except Exception as e:
+            print(f"Error en la recolección paginada: {str(e)}")
+            return None
+        return PaginatedCollector._merge(pages)
+
+    async def _collect_concurrent(self, total: int, timeout: Optional[float]) -> List[List[Dict]]:
+        offsets = range(1, max(total, 1) + 1, self.page_size)
+        tasks = [asyncio.ensure_future(self.fetch_page(offset)) for offset in offsets]
+        done, pending = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_EXCEPTION)
+        if pending:
+            for task in pending:
+                task.cancel()
+            failed = [t for t in done if t.exception() is not None]
+            if failed:
+                raise failed[0].exception()
+            raise asyncio.TimeoutError()
+        return [task.result() for task in tasks]
+
+    async def _collect_sequential(self) -> List[List[Dict]]:
+        pages = []
+        offset = 1
+        while True:
+            page = await self.fetch_page(offset)
+            pages.append(page)
+            if len(page) < self.page_size:
+                return pages
+            offset += self.page_size
+
+    async def close(self):
+        await self.client.aclose()
+
+class AsyncControllerScheduler(ControllerScheduler):
+    """
+    ControllerScheduler sobre el event loop: mismas reglas (intervalo por
+    controlador, nunca dos sondeos del mismo controlador, espera tras fallos),
+    con tareas asyncio en lugar del pool de hilos. Un controlador que no
+    responde antes del límite sigue descargando en segundo plano.
+    """
+    collector_class = AsyncPaginatedCollector
+
+    def __init__(self, controllers: List[Controller]):
+        super().__init__(controllers)
+        self._tasks = set()     # sondeos que siguen en segundo plano después del límite del ciclo
+
+    def _create_executor(self) -> None:
+        return None     # los sondeos son tareas del event loop, no hilos
+
+    async def collect(self, default_interval: float, deadline: Optional[float] = None,
+                      force: bool = False) -> Optional[List[Dict]]:
+        tasks = [asyncio.ensure_future(self._poll(controller, poll_deadline))
+                 for controller, poll_deadline in self._due(default_interval, force)]
+        if tasks:
+            self._tasks.update(tasks)
+            for task in tasks:
+                task.add_done_callback(self._tasks.discard)
+            await asyncio.wait(tasks, timeout=None if deadline is None else max(0, deadline - time.time()))
+        return self.merged()
+
+    async def _poll(self, controller: Controller, deadline: float):
+        started = time.time()
+        try:
+            self._store(controller, await self._collectors[controller.name].collect(deadline=deadline))
+        except Exception as e:
+            self._failed(controller, str(e))
+            print(f"Error en el controlador {controller.name}: {str(e)}")
+        finally:
+            with self._lock:
+                controller.last_duration = time.time() - started
+                controller.in_flight = False
+
+    async def fetch_devices(self, device_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        results: Dict[str, Optional[Dict]] = {}
+        for controller, raw_ids in self._by_controller(device_ids):
+            self._replace(controller, await self._collectors[controller.name].fetch_devices(raw_ids), results)
+        return results
+
+    async def collect_interfaces(self, deadline: Optional[float] = None) -> Optional[List[Dict]]:
+        return self._merge_interfaces(await asyncio.gather(
+            *(self._interface_collectors[c.name].collect(deadline=deadline) for c in self.controllers)
+        ))
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        for collector in (*self._collectors.values(), *self._interface_collectors.values()):
+            await collector.close()
@@ -0,0 +1,197 @@
+"""
+Modo asyncio del monitor (NETMON_COLLECTOR=asyncio en api_restconf.py).
+
+El ciclo de sondeo es una tarea del event loop de la API, creada y detenida
+por el lifespan; las descargas usan httpx (async_collector.py) y el trabajo
+de CPU (parseo, alertas, historial, reportes) corre en asyncio.to_thread
+para no bloquear las peticiones.
+"""
+import time
+import asyncio
+import threading
+from typing import Dict, Optional
+from network_monitor import NetworkMonitor, INTERFACE_POLLING_INTERVAL
+from adaptive_poller import FAST_INTERVAL
+from async_collector import AsyncControllerScheduler
+
+class AsyncNetworkMonitor(NetworkMonitor):
+    scheduler_class = AsyncControllerScheduler
+
+    def __init__(self):
+        super().__init__()
+        self._task: Optional[asyncio.Task] = None
+        self._flight: Optional[asyncio.Task] = None
+        self._flight_cycle = False        # el sondeo en curso lo lanzó el ciclo (tiempos por etapa)
+        self._mutex = asyncio.Lock()      # inventario y alertas: una sola modificación a la vez
+        self._wake = asyncio.Event()
+
+    async def start_monitoring(self):
+        self.running = True
+        # Una sola tarea de sondeo: si ya existe, solo se reprograma la espera
+        if self._task is not None and not self._task.done():
+            self._wake.set()
+            return
+        self._task = asyncio.create_task(self._monitoring_loop(), name="network-monitor")
+        print(f"Monitor iniciado (asyncio). Actualizando cada {self.polling_interval} segundos...")
+
+    async def stop_monitoring(self):
+        self.running = False
+        for task in (self._task, self._flight):
+            if task is not None and not task.done():
+                task.cancel()
+        if self._task is not None:
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        print("Monitor detenido")
+
+    async def close(self):
+        await self.stop_monitoring()
+        if self._scheduler is not None:
+            await self._scheduler.close()
+        self.report_worker.close()
+        self.alert_history.close()
+
+    async def configure(self, running: bool, **config) -> Dict:
+        self._apply_config(**config)
+        if running and not self.running:
+            await self.start_monitoring()
+        elif not running and self.running:
+            await self.stop_monitoring()
+        else:
+            self._wake.set()
+        return self.status()
+
+    def _in_cycle(self) -> bool:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            return False    # fuera del event loop (asyncio.to_thread)
+        return task is self._task or (task is self._flight and self._flight_cycle)
+
+    async def _monitoring_loop(self):
+        self._loop_ident = threading.get_ident()
+        try:
+            await asyncio.to_thread(self.load_history)
+        except Exception as e:
+            self._cycle_failed(e)
+        while self.running:
+            start_time = time.time()
+            self._cycle_stages = {}
+            self.profiler.cycle_started()
+            error = None
+            try:
+                with self._stage("cycle"):
+                    await self._poll_inventory(cycle=True)
+                    with self._stage("history"):
+                        await asyncio.to_thread(self.update_history)
+                    if time.time() - self._interfaces_polled_at >= INTERFACE_POLLING_INTERVAL:
+                        with self._stage("interfaces"):
+                            await self.update_interface_stats()
+                    self.cycles += 1
+                    with self._stage("publish"):
+                        self._publish()
+                    with self._stage("alert_history"):
+                        await asyncio.to_thread(self.flush_alert_history)
+                    if self.cycles % 5 == 0:
+                        with self._stage("reports"):
+                            await asyncio.to_thread(self.generate_reports)
+            except Exception as e:
+                error = self._cycle_failed(e)
+            self.profiler.cycle_finished()
+            self._record_cycle(start_time, error)
+            self._update_gauges()
+            self.events.publish("status", self.status())
+            try:
+                await self.refresh_hot_devices(start_time)
+            except Exception as e:
+                self._cycle_failed(e)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), max(0, start_time + self.polling_interval - time.time()))
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    async def refresh(self, force: bool = False) -> bool:
+        if not await self._poll_inventory(force=force):
+            return False
+        self._publish()
+        return True
+
+    async def _poll_inventory(self, force: bool = False, cycle: bool = False) -> bool:
+        # Single-flight: el sondeo es una tarea propia que todos los llamadores esperan (shield: si
+        # una petición se cancela al desconectarse el cliente, el sondeo sigue para los demás)
+        if self._flight is None:
+            self._flight_cycle = cycle
+            self._flight = asyncio.ensure_future(self._sync_inventory(force, cycle))
+            self._flight.add_done_callback(self._flight_done)
+        return await asyncio.shield(self._flight)
+
+    def _flight_done(self, task: asyncio.Task):
+        self._flight = None
+        if not task.cancelled():
+            task.exception()    # ya la recibieron los llamadores; evita el aviso de excepción no leída
+
+    async def _sync_inventory(self, force: bool, cycle: bool) -> bool:
+        async with self._mutex:
+            ok = await self.fetch_devices(force=force)
+            if ok:
+                self.poller.observe(self.changes, self._devices_by_id, time.time(), cycle=cycle)
+            with self._stage("alerts"):
+                await asyncio.to_thread(self.check_for_alerts)
+        return ok
+
+    async def fetch_devices(self, force: bool = False) -> bool:
+        deadline = time.time() + self.polling_interval * 0.8
+        sweep_interval = self.poller.sweep_interval(self.polling_interval)
+        with self._stage("fetch"):
+            devices = await self.scheduler.collect(sweep_interval, deadline=deadline, force=force)
+        if devices is None:
+            print("Error al obtener dispositivos: ningún controlador respondió")
+            return False
+        with self._stage("parse"):
+            await asyncio.to_thread(self._parse_devices, {"response": devices})
+        return True
+
+    async def refresh_hot_devices(self, cycle_started: float):
+        while self.running:
+            now = time.time()
+            until = cycle_started + self.polling_interval
+            if now >= until:
+                return
+            controllers_due = self.scheduler.next_due()
+            if controllers_due is not None and controllers_due <= now:
+                await self.refresh()
+                now = time.time()
+                controllers_due = self.scheduler.next_due()
+            due = self.poller.due(now)
+            if due:
+                results = await self.scheduler.fetch_devices(due)
+                now = time.time()
+                for device_id in due:
+                    self.poller.record(device_id, results.get(device_id) is not None, now)
+                if any(results.values()):
+                    devices = self.scheduler.merged()
+                    if devices is not None:
+                        async with self._mutex:
+                            await asyncio.to_thread(self._apply_hot_devices, devices, now)
+                        self._publish()
+            try:
+                wake_at = until if controllers_due is None else min(until, controllers_due)
+                await asyncio.wait_for(self._wake.wait(), max(0, min(FAST_INTERVAL, wake_at - time.time())))
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def update_interface_stats(self) -> bool:
+        now = time.time()
+        self._interfaces_polled_at = now
+        rows = await self.scheduler.collect_interfaces(deadline=now + self.polling_interval * 0.8)
+        if rows is None:
+            print("Error al obtener interfaces: ningún controlador respondió")
+            return False
+        async with self._mutex:
+            await asyncio.to_thread(self._apply_interfaces, rows, now)
+        return True
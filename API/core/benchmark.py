@@ -0,0 +1,356 @@
+"""
+Benchmarks del monitor contra el simulador local de DNA Center.
+
+    python benchmark.py --sizes 100 1000 10000 50000 --output benchmark_results.jsonl
+
+Para cada tamaño de inventario se mide:
+- parse: dispositivos por segundo de _parse_devices (inventario nuevo y con cambios)
+- poll_cycle: duración de cada etapa de un ciclo completo contra el simulador
+- history: bytes por dispositivo del historial en memoria
+- inventory: memoria y tamaño serializado del inventario con DeviceInfo frente a la
+  disposición anterior (dataclass con un str propio por campo)
+- reports: tiempo de generación de reportes (el gráfico solo hasta --chart-max-devices)
+- api: latencia p50/p99 de los endpoints principales (en proceso, con TestClient)
+
+Una vez por ejecución se mide además el arranque (startup): tiempo de importar
+network_monitor y api_restconf en un intérprete nuevo, y tiempo hasta la
+primera respuesta de uvicorn (estado del monitor y primer inventario).
+
+Cada ejecución agrega una línea JSON a --output para comparar regresiones entre versiones.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import socket
+import argparse
+import tempfile
+import urllib.request
+import pickle
+import tracemalloc
+import subprocess
+from dataclasses import make_dataclass
+from datetime import datetime
+from statistics import median
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import network_monitor
+from network_monitor import NetworkMonitor, DeviceInfo, DEVICE_FIELDS
+from history_store import HistoryStore
+from dnac_simulator import DNACSimulator
+
+SIZES = (100, 1000, 10000, 50000)
+RESULTS_FILE = "benchmark_results.jsonl"
+CYCLES = 5                   # ciclos de sondeo medidos por tamaño
+HISTORY_POINTS = 120         # puntos de historial por dispositivo para medir memoria
+API_REQUESTS = 100           # peticiones por endpoint
+CHART_MAX_DEVICES = 1000     # por encima, el gráfico de alcanzabilidad no se mide
+STARTUP_RUNS = 5             # intérpretes nuevos por medición de arranque
+STARTUP_DEVICES = 100        # inventario del simulador para el primer GET de dispositivos
+STARTUP_TIMEOUT = 60         # segundos de espera por la primera respuesta de uvicorn
+STARTUP_MODULES = ("network_monitor", "api_restconf")
+LAZY_MODULES = ("requests", "httpx", "matplotlib", "pyang", "uvicorn", "numpy")   # no deberían cargarse al importar
+CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Disposición de DeviceInfo antes de __slots__ e internado, como referencia para bench_inventory_memory
+LegacyDeviceInfo = make_dataclass("LegacyDeviceInfo", [(name, str) for name, _ in DEVICE_FIELDS],
+                                  namespace={"__module__": __name__})
+
+def timed(fn: Callable) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def bench_parse(monitor: NetworkMonitor, simulator: DNACSimulator, devices: int) -> Dict:
+    with simulator.inventory.lock:
+        payload = {"response": [dict(d) for d in simulator.inventory.devices]}
+    cold = timed(lambda: monitor._parse_devices(payload))
+    simulator.inventory.tick()
+    with simulator.inventory.lock:
+        payload = {"response": [dict(d) for d in simulator.inventory.devices]}
+    steady = timed(lambda: monitor._parse_devices(payload))
+    return {
+        "cold_seconds": cold,
+        "cold_devices_per_second": devices / cold,
+        "steady_seconds": steady,
+        "steady_devices_per_second": devices / steady,
+        "changed_devices": len(monitor.changes.changed_ids())
+    }
+
+def bench_poll_cycle(monitor: NetworkMonitor, simulator: DNACSimulator, cycles: int) -> Dict:
+    stages = {"fetch": [], "alerts": [], "history": [], "interfaces": [], "publish": [], "total": []}
+    for _ in range(cycles):
+        simulator.inventory.tick()
+        fetch = timed(lambda: monitor.fetch_devices(force=True))
+        alerts = timed(monitor.check_for_alerts)
+        history = timed(monitor.update_history)
+        interfaces = timed(monitor.update_interface_stats)
+        publish = timed(monitor._publish)
+        for name, value in (("fetch", fetch), ("alerts", alerts), ("history", history), ("interfaces", interfaces),
+                            ("publish", publish), ("total", fetch + alerts + history + interfaces + publish)):
+            stages[name].append(value)
+    return {name: {"median_seconds": median(values), "max_seconds": max(values)}
+            for name, values in stages.items()}
+
+def bench_history_memory(monitor: NetworkMonitor, points: int) -> Dict:
+    devices = monitor.devices
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    store = HistoryStore(points)
+    now = time.time()
+    for i in range(points):
+        ts = now + i * monitor.polling_interval
+        for device in devices:
+            store.append_parsed(device.id, ts, device.reachabilityStatus, device.uptime_seconds or 0,
+                                int(device.interfaceCount or 0), device.softwareVersion)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    used = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return {
+        "points_per_device": points,
+        "bytes_total": used,
+        "bytes_per_device": used / max(1, len(devices)),
+        "bytes_per_point": used / max(1, len(devices) * points)
+    }
+
+def bench_inventory_memory(simulator: DNACSimulator) -> Dict:
+    # Decodificado de JSON, como llega por HTTP: cada dispositivo trae su propia copia de cada texto
+    with simulator.inventory.lock:
+        text = json.dumps(simulator.inventory.devices)
+    layouts = {
+        "dataclass": lambda values: LegacyDeviceInfo(*values),
+        "slots": DeviceInfo.from_values
+    }
+    result = {}
+    for layout, build in layouts.items():
+        tracemalloc.start()
+        payload = json.loads(text)
+        started = time.perf_counter()
+        devices = [build(tuple(device.get(name, default) for name, default in DEVICE_FIELDS))
+                   for device in payload]
+        seconds = time.perf_counter() - started
+        del payload
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        result[layout] = {
+            "bytes_total": used,
+            "bytes_per_device": used / max(1, len(devices)),
+            "build_seconds": seconds,
+            "pickle_bytes": len(pickle.dumps(devices, protocol=pickle.HIGHEST_PROTOCOL))
+        }
+        del devices
+    result["memory_ratio"] = result["slots"]["bytes_total"] / max(1, result["dataclass"]["bytes_total"])
+    return result
+
+def bench_reports(monitor: NetworkMonitor, chart_max_devices: int) -> Dict:
+    snapshot_started = time.perf_counter()
+    snapshot = network_monitor.ReportSnapshot(
+        devices_table=tuple(monitor._devices_table()),
+        reachability=monitor._reachability_series() if len(monitor.devices) <= chart_max_devices else (),
+        alerts=tuple(monitor._alerts_data())
+    )
+    snapshot_seconds = time.perf_counter() - snapshot_started
+    write_seconds = timed(lambda: monitor.report_worker.write(snapshot))
+    return {
+        "snapshot_seconds": snapshot_seconds,
+        "write_seconds": write_seconds,
+        "chart_included": bool(snapshot.reachability)
+    }
+
+def bench_api(monitor: NetworkMonitor, requests: int) -> Dict:
+    import api_restconf
+    from fastapi.testclient import TestClient
+
+    api_restconf.monitor = monitor
+    client = TestClient(api_restconf.app)
+    device_id = monitor.devices[0].id
+    endpoints = {
+        "devices": "/restconf/data/network-devices:devices",
+        "devices_filtered": "/restconf/data/network-devices:devices?reachabilityStatus=Unreachable",
+        "device": f"/restconf/data/network-devices:devices/device={device_id}",
+        "device_history": f"/restconf/data/network-devices:device-history/device={device_id}",
+        "device_interfaces": f"/restconf/data/network-devices:devices/device={device_id}/interfaces",
+        "alerts": "/restconf/data/network-alerts:alerts",
+        "status": "/restconf/data/network-monitor:status"
+    }
+    results = {}
+    for name, url in endpoints.items():
+        latencies = []
+        status = None
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - started) * 1000)
+            status = response.status_code
+        results[name] = {
+            "status": status,
+            "p50_ms": percentile(latencies, 50),
+            "p99_ms": percentile(latencies, 99),
+            "bytes": len(response.content)
+        }
+    return results
+
+def bench_import(module: str, runs: int) -> Dict:
+    # Cada medición en un intérprete nuevo: dentro de este proceso los módulos ya están cargados
+    code = ("import sys, time, json; started = time.perf_counter(); import {0}; "
+            "print(json.dumps([time.perf_counter() - started, sorted(m for m in {1} if m in sys.modules)]))"
+            ).format(module, LAZY_MODULES)
+    seconds, loaded = [], []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=CORE_DIR, check=True).stdout
+        elapsed, loaded = json.loads(output.splitlines()[-1])
+        seconds.append(elapsed)
+    return {"median_seconds": median(seconds), "max_seconds": max(seconds), "lazy_modules_loaded": loaded}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_response(url: str, started: float, process: subprocess.Popen) -> float:
+    """Segundos desde `started` hasta la primera respuesta 200 de `url`"""
+    while time.perf_counter() - started < STARTUP_TIMEOUT:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn terminó con código {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=STARTUP_TIMEOUT) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except OSError:
+            time.sleep(0.01)
+    raise RuntimeError(f"sin respuesta de {url} en {STARTUP_TIMEOUT} s")
+
+def bench_first_response(simulator: DNACSimulator) -> Dict:
+    # controllers.json en el directorio de trabajo apunta la API al simulador
+    with open("controllers.json", "w") as f:
+        json.dump([{"name": "default", "base_url": simulator.base_url}], f)
+    port = free_port()
+    base = f"http://127.0.0.1:{port}/restconf/data"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_restconf:app", "--app-dir", CORE_DIR,
+         "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        status = wait_for_response(f"{base}/network-monitor:status", started, process)
+        devices = wait_for_response(f"{base}/network-devices:devices", started, process)
+    finally:
+        process.terminate()
+        process.wait()
+        os.remove("controllers.json")
+    return {"status_seconds": status, "devices_seconds": devices}
+
+def bench_startup(args) -> Dict:
+    print("arranque...")
+    result = {"imports": {module: bench_import(module, args.startup_runs) for module in STARTUP_MODULES}}
+    simulator = DNACSimulator(STARTUP_DEVICES, port=0).start()
+    try:
+        result["first_response"] = bench_first_response(simulator)
+    finally:
+        simulator.stop()
+    return result
+
+def bench_size(devices: int, args) -> Dict:
+    simulator = DNACSimulator(devices, port=0, churn=args.churn, latency=args.latency,
+                              error_rate=args.error_rate).start()
+    network_monitor.BASE_URL = simulator.base_url
+    monitor = NetworkMonitor()
+    try:
+        print(f"[{devices}] parse...")
+        result = {"devices": devices, "parse": bench_parse(monitor, simulator, devices)}
+        print(f"[{devices}] ciclo de sondeo...")
+        result["poll_cycle"] = bench_poll_cycle(monitor, simulator, args.cycles)
+        print(f"[{devices}] memoria del historial...")
+        result["history"] = bench_history_memory(monitor, args.history_points)
+        print(f"[{devices}] memoria del inventario...")
+        result["inventory"] = bench_inventory_memory(simulator)
+        print(f"[{devices}] reportes...")
+        result["reports"] = bench_reports(monitor, args.chart_max_devices)
+        print(f"[{devices}] API...")
+        result["api"] = bench_api(monitor, args.requests)
+        return result
+    finally:
+        monitor.scheduler.close()
+        monitor.report_worker.close()
+        simulator.stop()
+
+def print_summary(run: Dict):
+    startup = run.get("startup")
+    if startup:
+        imports = "  ".join(f"{module} {result['median_seconds']:.3f} s"
+                            for module, result in startup["imports"].items())
+        first = startup["first_response"]
+        print(f"\nimportar: {imports}")
+        print(f"primera respuesta: estado {first['status_seconds']:.3f} s  "
+              f"dispositivos {first['devices_seconds']:.3f} s")
+    print(f"\n{'dispositivos':>12} {'parse/s':>10} {'ciclo s':>9} {'B/disp':>9} {'inv B/disp':>10} "
+          f"{'antes':>7} {'reportes s':>10} {'devices p50':>11} {'p99 ms':>8}")
+    for result in run["results"]:
+        api = result["api"]["devices"]
+        inventory = result["inventory"]
+        print(f"{result['devices']:>12} {result['parse']['steady_devices_per_second']:>10.0f} "
+              f"{result['poll_cycle']['total']['median_seconds']:>9.3f} "
+              f"{result['history']['bytes_per_device']:>9.0f} "
+              f"{inventory['slots']['bytes_per_device']:>10.0f} {inventory['dataclass']['bytes_per_device']:>7.0f} "
+              f"{result['reports']['write_seconds']:>10.3f} "
+              f"{api['p50_ms']:>11.2f} {api['p99_ms']:>8.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del monitor contra dnac_simulator")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--cycles", type=int, default=CYCLES)
+    parser.add_argument("--requests", type=int, default=API_REQUESTS)
+    parser.add_argument("--history-points", type=int, default=HISTORY_POINTS)
+    parser.add_argument("--chart-max-devices", type=int, default=CHART_MAX_DEVICES)
+    parser.add_argument("--churn", type=float, default=0.01)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--startup-runs", type=int, default=STARTUP_RUNS,
+                        help="intérpretes nuevos por medición de arranque (0 omite el arranque)")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+
+    run = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": []
+    }
+    # Historial en disco y reportes van a un directorio temporal
+    workdir = tempfile.mkdtemp(prefix="netmon-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        if args.startup_runs > 0:
+            run["startup"] = bench_startup(args)
+        for devices in args.sizes:
+            run["results"].append(bench_size(devices, args))
+    finally:
+        os.chdir(cwd)
+
+    with open(output, "a") as f:
+        f.write(json.dumps(run) + "\n")
+    print_summary(run)
+    print(f"\nResultados agregados a {output}")
+
+if __name__ == "__main__":
+    main()
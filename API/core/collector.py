@@ -0,0 +1,151 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from typing import List, Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import DNAC_REQUESTS, DNAC_REQUEST_SECONDS
+
+# Desactivar advertencias de SSL (las sesiones usan verify=False)
+requests.packages.urllib3.disable_warnings()
+
+# Configuración de paginación
+PAGE_SIZE = 500          # DNA Center limita el tamaño de página a 500
+FETCH_WORKERS = 4        # páginas descargadas en paralelo
+CONNECT_TIMEOUT = 3.05   # segundos
+PAGE_TIMEOUT = 10        # segundos de lectura por página
+PAGE_RETRIES = 2         # reintentos por página (errores de conexión, 429 y 5xx)
+
+class PaginatedCollector:
+    """
+    Descarga el inventario de /network-device en páginas offset/limit.
+    Las páginas se piden en paralelo sobre una única sesión keep-alive y
+    se combinan en una sola instantánea sin duplicados.
+    """
+    def __init__(self, base_url: str, headers: Dict[str, str],
+                 page_size: int = PAGE_SIZE, max_workers: int = FETCH_WORKERS,
+                 timeout: float = PAGE_TIMEOUT, retries: int = PAGE_RETRIES):
+        self.base_url = base_url.rstrip("/")
+        self.resource = self.base_url.rsplit("/", 1)[-1]   # etiqueta en las métricas (network-device, interface)
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.timeout = (CONNECT_TIMEOUT, timeout)
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        self.session.verify = False
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dnac-page")
+
+    def _get(self, resource: str, url: str, **kwargs) -> requests.Response:
+        """GET con latencia y código HTTP registrados en las métricas"""
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+            status = str(response.status_code)
+            return response
+        finally:
+            label = f"{self.resource}/{resource}"
+            DNAC_REQUEST_SECONDS.observe(time.perf_counter() - started, resource=label)
+            DNAC_REQUESTS.inc(resource=label, status=status)
+
+    def fetch_count(self) -> Optional[int]:
+        """Obtener el total de dispositivos (/network-device/count)"""
+        try:
+            response = self._get("count", f"{self.base_url}/count")
+            if response.status_code == 200:
+                return int(response.json().get("response", 0))
+            print(f"Error al obtener el total de dispositivos: {response.status_code}")
+        except Exception as e:
+            print(f"Error en fetch_count: {str(e)}")
+        return None
+
+    def fetch_page(self, offset: int) -> List[Dict]:
+        """Obtener una página; el offset de DNA Center empieza en 1"""
+        response = self._get("page", self.base_url, params={"offset": offset, "limit": self.page_size})
+        if response.status_code != 200:
+            raise RuntimeError(f"página offset={offset}: HTTP {response.status_code}")
+        return response.json().get("response", [])
+
+    def fetch_device(self, device_id: str) -> Optional[Dict]:
+        """Obtener un único dispositivo (/network-device/{id}); None si falla"""
+        try:
+            response = self._get("device", f"{self.base_url}/{device_id}")
+            if response.status_code == 200:
+                return response.json().get("response") or None
+            print(f"Error al obtener el dispositivo {device_id}: {response.status_code}")
+        except Exception as e:
+            print(f"Error en fetch_device: {str(e)}")
+        return None
+
+    def fetch_devices(self, device_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """Obtener varios dispositivos en paralelo sobre la misma sesión"""
+        futures = {device_id: self._executor.submit(self.fetch_device, device_id) for device_id in device_ids}
+        return {device_id: future.result() for device_id, future in futures.items()}
+
+    def collect(self, deadline: Optional[float] = None) -> Optional[List[Dict]]:
+        """
+        Descargar todas las páginas antes de `deadline` (epoch en segundos).
+        Devuelve None si alguna página falla, para no publicar un inventario parcial.
+        """
+        total = self.fetch_count()
+        try:
+            if total is None:
+                pages = self._collect_sequential(deadline)
+            else:
+                pages = self._collect_concurrent(total, deadline)
+        except Exception as e:
+            print(f"Error en la recolección paginada: {str(e)}")
+            return None
+        return self._merge(pages)
+
+    def _collect_concurrent(self, total: int, deadline: Optional[float]) -> List[List[Dict]]:
+        offsets = range(1, max(total, 1) + 1, self.page_size)
+        futures = [self._executor.submit(self.fetch_page, offset) for offset in offsets]
+        timeout = None if deadline is None else max(0, deadline - time.time())
+        done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+        if pending:
+            for future in pending:
+                future.cancel()
+            failed = [f for f in done if f.exception() is not None]
+            if failed:
+                raise failed[0].exception()
+            raise TimeoutError(f"{len(pending)} páginas sin respuesta antes del límite del ciclo")
+        # El orden de `futures` conserva el orden por offset
+        return [future.result() for future in futures]
+
+    def _collect_sequential(self, deadline: Optional[float]) -> List[List[Dict]]:
+        # Sin total conocido no se puede repartir el trabajo: se pagina hasta una página incompleta
+        pages = []
+        offset = 1
+        while True:
+            if deadline is not None and time.time() > deadline:
+                raise TimeoutError("límite del ciclo alcanzado durante la paginación")
+            page = self.fetch_page(offset)
+            pages.append(page)
+            if len(page) < self.page_size:
+                return pages
+            offset += self.page_size
+
+    @staticmethod
+    def _merge(pages: List[List[Dict]]) -> List[Dict]:
+        # Un dispositivo puede aparecer en dos páginas si el inventario cambia durante
+        # la descarga; se conserva la primera aparición
+        merged: Dict[str, Dict] = {}
+        for page in pages:
+            for device_data in page:
+                merged.setdefault(device_data.get("id", ""), device_data)
+        return list(merged.values())
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
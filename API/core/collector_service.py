@@ -0,0 +1,134 @@
+"""
+Proceso colector dedicado: un único NetworkMonitor que sondea DNA Center y
+comparte cada instantánea con cualquier cantidad de workers de la API.
+
+    python collector_service.py
+    NETMON_COLLECTOR=external uvicorn api_restconf:app --workers 4
+
+Con NETMON_COLLECTOR=external, api_restconf.py no crea su propio monitor sino
+un RemoteMonitor (remote_monitor.py) que lee la instantánea compartida y envía
+al colector las operaciones que modifican estado.
+"""
+import time
+import argparse
+import threading
+from dataclasses import replace
+from typing import Callable, Dict, Optional
+import network_monitor
+from network_monitor import NetworkMonitor, MonitorSnapshot
+from metrics import REGISTRY, HTTP_REQUEST_SECONDS
+from snapshot_channel import SharedState, SnapshotPublisher, ControlServer, SHARED_EVENTS
+
+def control_calls(service: "CollectorService") -> Dict[str, Callable]:
+    """Operaciones que los workers pueden pedir por el socket de control"""
+    monitor = service.monitor
+
+    def configure(config: Dict) -> Dict:
+        status = monitor.configure(**config)
+        service.publish(monitor.snapshot)   # el estado publicado incluye la configuración
+        return status
+
+    return {
+        "refresh": monitor.refresh,
+        "configure": configure,
+        "history.contains": lambda device_id: device_id in monitor.device_history,
+        "history.points": monitor.device_history.points,
+        "rollups.query": monitor.history_rollups.query,
+        "alerts.query": monitor.alert_history.query,
+        "segments.points": monitor.history_segments.points,
+        "segments.points_by_device": monitor.history_segments.points_by_device,
+        "profiler.start": monitor.profiler.start,
+        "profiler.stop": monitor.profiler.stop,
+        "profiler.status": monitor.profiler.status,
+        "memory.start": monitor.memory.start,
+        "memory.stop": monitor.memory.stop,
+        "memory.snapshot": monitor.memory.snapshot,
+        "memory.running": lambda: monitor.memory.running,
+    }
+
+class CollectorService:
+    """
+    Publica cada instantánea del monitor para los workers. La serialización
+    (cientos de ms con decenas de miles de dispositivos) corre en un hilo
+    propio para no atrasar el ciclo; si llegan varias instantáneas mientras
+    tanto solo se escribe la última.
+    """
+    def __init__(self, monitor: NetworkMonitor, snapshot_path: Optional[str] = None,
+                 control_path: Optional[str] = None):
+        self.monitor = monitor
+        self.publisher = SnapshotPublisher(snapshot_path)
+        self.control = ControlServer(control_calls(self), control_path)
+        self._pending: Optional[MonitorSnapshot] = None
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, snapshot: MonitorSnapshot):
+        self._pending = snapshot
+        self._wake.set()
+
+    def _publish_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closing:
+                return
+            try:
+                self._write(self._pending)
+            except OSError as e:
+                print(f"Error al publicar la instantánea: {str(e)}")
+
+    def _write(self, snapshot: MonitorSnapshot):
+        # El historial en memoria no se copia a los workers: lo consultan por el socket de control
+        monitor = self.monitor
+        events = monitor.events.since(max(0, monitor.events.last_seq - SHARED_EVENTS)) or []
+        self.publisher.publish(SharedState(
+            snapshot=replace(snapshot, history=None),
+            history_until=snapshot.history.until,
+            status=monitor.status(),
+            controllers=monitor.scheduler.status(),
+            cycles=tuple(monitor.recent_cycles),
+            events=tuple(events),
+            last_event_seq=monitor.events.last_seq,
+            event_epoch=monitor.events.epoch,
+            metrics=REGISTRY.render(exclude=(HTTP_REQUEST_SECONDS.name,))
+        ))
+
+    def start(self):
+        self._write(self.monitor.snapshot)
+        self._thread = threading.Thread(target=self._publish_loop, daemon=True, name="snapshot-publisher")
+        self._thread.start()
+        self.monitor.snapshot_listeners.append(self.publish)
+        self.control.start()
+        self.monitor.start_monitoring()
+
+    def stop(self):
+        self.monitor.stop_monitoring()
+        self.control.stop()
+        self.monitor.snapshot_listeners.remove(self.publish)
+        self._closing = True
+        self._wake.set()
+        self._thread.join()
+        self.publisher.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Colector de DNA Center compartido por los workers de la API")
+    parser.add_argument("--base-url", default=network_monitor.BASE_URL)
+    # Por defecto en el directorio privado de snapshot_channel.runtime_dir (NETMON_RUNTIME_DIR)
+    parser.add_argument("--snapshot", default=None)
+    parser.add_argument("--control", default=None)
+    args = parser.parse_args()
+    network_monitor.BASE_URL = args.base_url
+
+    service = CollectorService(NetworkMonitor(), args.snapshot, args.control)
+    service.start()
+    print(f"Colector publicando en {service.publisher.path} (control: {service.control.server_address})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\nDeteniendo colector...")
+        service.stop()
+
+if __name__ == "__main__":
+    main()
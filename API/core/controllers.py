@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from collector import PaginatedCollector
+from adaptive_poller import backoff_delay
+
+CONTROLLERS_FILE = "controllers.json"   # lista opcional de controladores DNA Center
+DUE_SLACK = 1.0                         # segundos de tolerancia para considerar un sondeo vencido
+
+@dataclass
+class Controller:
+    name: str
+    base_url: str
+    headers: Dict[str, str]
+    polling_interval: Optional[int] = None   # None: usa el intervalo del monitor
+    # Estado del último ciclo del controlador
+    last_started: float = 0.0
+    last_duration: Optional[float] = None
+    last_success: Optional[float] = None
+    last_error: Optional[str] = None
+    device_count: int = 0
+    in_flight: bool = False
+    failures: int = 0           # fallos consecutivos
+    retry_at: float = 0.0       # no se vuelve a sondear antes (espera exponencial con jitter)
+    devices: Optional[List[Dict]] = field(default=None, repr=False)
+
+def load_controllers(base_url: str, headers: Dict[str, str], path: str = CONTROLLERS_FILE) -> List[Controller]:
+    """
+    Leer `controllers.json` ([{"name", "base_url", "token", "polling_interval"}]).
+    Sin archivo se usa un único controlador con BASE_URL y HEADERS.
+    """
+    if not os.path.exists(path):
+        return [Controller(name="default", base_url=base_url, headers=headers)]
+    with open(path) as f:
+        entries = json.load(f)
+    controllers = []
+    for entry in entries:
+        entry_headers = dict(entry.get("headers") or {"Content-Type": "application/json"})
+        if entry.get("token"):
+            entry_headers["X-Auth-Token"] = entry["token"]
+        controllers.append(Controller(
+            name=entry["name"],
+            base_url=entry["base_url"],
+            headers=entry_headers,
+            polling_interval=entry.get("polling_interval")
+        ))
+    return controllers
+
+def interface_url(base_url: str) -> str:
+    """URL del inventario de interfaces (/interface) junto a /network-device"""
+    return base_url.rstrip("/").rsplit("/", 1)[0] + "/interface"
+
+class ControllerScheduler:
+    """
+    Sondea varios DNA Center con un único planificador.
+    Cada controlador tiene su propio intervalo, credenciales y sesión; se lanza
+    cuando le toca (next_due() indica al monitor cuándo despertar) y nunca hay
+    dos sondeos en curso del mismo controlador. Un controlador lento o caído
+    conserva su último inventario y no retrasa a los demás: collect() solo
+    espera hasta el límite del ciclo. Tras un fallo el controlador espera cada
+    vez más (con jitter) antes del siguiente intento.
+    Con más de un controlador los ids se prefijan con "<controlador>:".
+    """
+    collector_class = PaginatedCollector
+
+    def __init__(self, controllers: List[Controller]):
+        self.controllers = controllers
+        self.namespaced = len(controllers) > 1
+        self._collectors = {c.name: self.collector_class(c.base_url, c.headers) for c in controllers}
+        self._interface_collectors = {c.name: self.collector_class(interface_url(c.base_url), c.headers)
+                                      for c in controllers}
+        self._executor = self._create_executor()
+        self._interface_futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _create_executor(self) -> Optional[ThreadPoolExecutor]:
+        # Dos hilos por controlador: el inventario y las interfaces de uno no esperan al otro
+        return ThreadPoolExecutor(max_workers=max(1, 2 * len(self.controllers)), thread_name_prefix="dnac-ctrl")
+
+    def collect(self, default_interval: float, deadline: Optional[float] = None,
+                force: bool = False) -> Optional[List[Dict]]:
+        """Lanzar los controladores vencidos (todos con force), esperar hasta `deadline` y combinar"""
+        futures = [self._executor.submit(self._poll, controller, poll_deadline)
+                   for controller, poll_deadline in self._due(default_interval, force)]
+        if futures:
+            wait(futures, timeout=None if deadline is None else max(0, deadline - time.time()))
+        return self.merged()
+
+    def _due(self, default_interval: float, force: bool) -> List[Tuple[Controller, float]]:
+        """Controladores a sondear ahora (quedan marcados en curso) con el límite de su sondeo"""
+        now = time.time()
+        due = []
+        for controller in self.controllers:
+            interval = controller.polling_interval or default_interval
+            with self._lock:
+                if controller.in_flight:
+                    continue
+                if not force and now + DUE_SLACK < max(controller.last_started + interval, controller.retry_at):
+                    continue
+                controller.in_flight = True
+                controller.last_started = now
+            due.append((controller, now + interval * 0.8))
+        return due
+
+    def next_due(self) -> Optional[float]:
+        """
+        Próximo vencimiento de los controladores con intervalo propio (None si no hay
+        ninguno libre). El monitor se despierta entonces aunque su ciclo no haya terminado:
+        un polling_interval menor que el del monitor no queda redondeado al ciclo.
+        """
+        with self._lock:
+            times = [max(c.last_started + c.polling_interval, c.retry_at)
+                     for c in self.controllers if c.polling_interval and not c.in_flight]
+        return min(times, default=None)
+
+    def _poll(self, controller: Controller, deadline: float):
+        started = time.time()
+        try:
+            self._store(controller, self._collectors[controller.name].collect(deadline=deadline))
+        except Exception as e:
+            self._failed(controller, str(e))
+            print(f"Error en el controlador {controller.name}: {str(e)}")
+        finally:
+            with self._lock:
+                controller.last_duration = time.time() - started
+                controller.in_flight = False
+
+    def _store(self, controller: Controller, devices: Optional[List[Dict]]):
+        if devices is None:
+            self._failed(controller, "inventario incompleto")
+            return
+        devices = [self._tag(controller, d) for d in devices]
+        with self._lock:
+            controller.devices = devices
+            controller.device_count = len(devices)
+            controller.last_success = time.time()
+            controller.last_error = None
+            controller.failures = 0
+            controller.retry_at = 0.0
+
+    def _failed(self, controller: Controller, error: str):
+        with self._lock:
+            controller.last_error = error
+            controller.failures += 1
+            controller.retry_at = time.time() + backoff_delay(controller.failures)
+
+    def _tag(self, controller: Controller, device: Dict) -> Dict:
+        if self.namespaced:
+            return dict(device, id=f"{controller.name}:{device.get('id', '')}", controller=controller.name)
+        return dict(device, controller=controller.name)
+
+    def _split_id(self, device_id: str):
+        """Controlador e id original de un dispositivo (sin prefijo)"""
+        if self.namespaced:
+            name, _, raw_id = device_id.partition(":")
+            return name, raw_id
+        return self.controllers[0].name, device_id
+
+    def fetch_devices(self, device_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Consultar dispositivos individuales y reemplazarlos en el último
+        inventario de su controlador. Devuelve id -> datos (None si falló).
+        """
+        results: Dict[str, Optional[Dict]] = {}
+        for controller, raw_ids in self._by_controller(device_ids):
+            self._replace(controller, self._collectors[controller.name].fetch_devices(raw_ids), results)
+        return results
+
+    def _by_controller(self, device_ids: List[str]) -> List[Tuple[Controller, List[str]]]:
+        by_controller: Dict[str, List[str]] = {}
+        for device_id in device_ids:
+            name, raw_id = self._split_id(device_id)
+            by_controller.setdefault(name, []).append(raw_id)
+        controllers = {c.name: c for c in self.controllers}
+        return [(controllers[name], raw_ids) for name, raw_ids in by_controller.items() if name in controllers]
+
+    def _replace(self, controller: Controller, fetched: Dict[str, Optional[Dict]], results: Dict[str, Optional[Dict]]):
+        with self._lock:
+            positions = {d.get("id"): i for i, d in enumerate(controller.devices or [])}
+            for raw_id, data in fetched.items():
+                device = self._tag(controller, data) if data is not None else None
+                device_id = f"{controller.name}:{raw_id}" if self.namespaced else raw_id
+                if device is not None and device_id in positions:
+                    controller.devices[positions[device_id]] = device
+                results[device_id] = device
+
+    def collect_interfaces(self, deadline: Optional[float] = None) -> Optional[List[Dict]]:
+        """
+        Inventario de interfaces de todos los controladores, consultados en paralelo
+        hasta `deadline`; None si ninguno respondió a tiempo. Un controlador que no
+        terminó sigue con esa descarga y no se le lanza otra en el ciclo siguiente.
+        """
+        futures = []
+        for controller in self.controllers:
+            future = self._interface_futures.get(controller.name)
+            if future is None or future.done():
+                future = self._interface_futures[controller.name] = self._executor.submit(
+                    self._interface_collectors[controller.name].collect, deadline=deadline
+                )
+            futures.append(future)
+        wait(futures, timeout=None if deadline is None else max(0, deadline - time.time()))
+        return self._merge_interfaces([self._interface_result(controller, future)
+                                       for controller, future in zip(self.controllers, futures)])
+
+    def _interface_result(self, controller: Controller, future: Future) -> Optional[List[Dict]]:
+        if not future.done():
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Error en las interfaces del controlador {controller.name}: {str(e)}")
+            return None
+
+    def _merge_interfaces(self, results: List[Optional[List[Dict]]]) -> Optional[List[Dict]]:
+        interfaces, answered = [], False
+        for controller, rows in zip(self.controllers, results):
+            if rows is None:
+                continue
+            answered = True
+            if self.namespaced:
+                rows = [dict(r, deviceId=f"{controller.name}:{r.get('deviceId', '')}") for r in rows]
+            interfaces.extend(rows)
+        return interfaces if answered else None
+
+    def merged(self) -> Optional[List[Dict]]:
+        """Último inventario de cada controlador; None si ninguno respondió todavía"""
+        with self._lock:
+            parts = [c.devices for c in self.controllers if c.devices is not None]
+        if not parts:
+            return None
+        return [device for part in parts for device in part]
+
+    def status(self) -> List[Dict]:
+        return [{
+            "name": c.name,
+            "base_url": c.base_url,
+            "polling_interval": c.polling_interval,
+            "last_duration": c.last_duration,
+            "last_success": c.last_success,
+            "last_error": c.last_error,
+            "device_count": c.device_count,
+            "in_flight": c.in_flight,
+            "failures": c.failures,
+            "retry_at": c.retry_at or None
+        } for c in self.controllers]
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for collector in (*self._collectors.values(), *self._interface_collectors.values()):
+            collector.close()
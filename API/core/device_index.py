@@ -0,0 +1,60 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+# Campos únicos por dispositivo
+PRIMARY_KEYS = ("id", "hostname", "managementIpAddress", "serialNumber")
+# Campos de baja cardinalidad usados para filtrar
+SECONDARY_KEYS = ("reachabilityStatus", "platformId", "family", "role", "softwareVersion", "controller")
+
+class DeviceIndex:
+    """
+    Índices inmutables sobre una instantánea del inventario.
+    Se construye uno nuevo por sondeo y se publica con una sola asignación,
+    así los lectores nunca ven un índice a medio construir.
+    """
+    def __init__(self, devices: Sequence):
+        self.devices = tuple(devices)
+        self.primary: Dict[str, Dict[str, int]] = {key: {} for key in PRIMARY_KEYS}
+        self.secondary: Dict[str, Dict[str, List[int]]] = {key: defaultdict(list) for key in SECONDARY_KEYS}
+        for position, device in enumerate(self.devices):
+            for key in PRIMARY_KEYS:
+                value = getattr(device, key)
+                if value:
+                    self.primary[key].setdefault(value, position)
+            for key in SECONDARY_KEYS:
+                self.secondary[key][getattr(device, key)].append(position)
+        self.secondary = {key: dict(values) for key, values in self.secondary.items()}
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def get(self, key: str, value: str) -> Optional[object]:
+        """Búsqueda O(1) por id, hostname, IP de gestión o número de serie"""
+        position = self.primary[key].get(value)
+        return None if position is None else self.devices[position]
+
+    def values(self, key: str) -> List[str]:
+        """Valores distintos de un campo secundario"""
+        return list(self.secondary[key])
+
+    def filter(self, **criteria: Optional[str]) -> List:
+        """
+        Dispositivos que cumplen todos los criterios (campo=valor).
+        Se intersecan las posiciones de cada índice; nunca se recorre el inventario.
+        """
+        criteria = {key: value for key, value in criteria.items() if value is not None}
+        if not criteria:
+            return list(self.devices)
+        candidates = None
+        for key, value in criteria.items():
+            if key in self.primary:
+                position = self.primary[key].get(value)
+                positions = set() if position is None else {position}
+            elif key in self.secondary:
+                positions = set(self.secondary[key].get(value, ()))
+            else:
+                raise KeyError(key)
+            candidates = positions if candidates is None else candidates & positions
+            if not candidates:
+                return []
+        return [self.devices[position] for position in sorted(candidates)]
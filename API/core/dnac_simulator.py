@@ -0,0 +1,265 @@
+"""
+Simulador local de la API de inventario de Cisco DNA Center.
+
+Sirve /dna/intent/api/v1/network-device (paginado offset/limit, /count y
+/{id}) y /dna/intent/api/v1/interface con N dispositivos sintéticos, para
+ejecutar network_monitor.py, api_restconf.py y benchmark.py sin el sandbox
+ni la VPN.
+
+    python dnac_simulator.py --devices 1000 --churn 0.02 --latency 0.05 --error-rate 0.01
+
+y apuntar BASE_URL (o controllers.json) a http://127.0.0.1:9000/dna/intent/api/v1/network-device
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from typing import Dict, List, Optional
+
+API_PREFIX = "/dna/intent/api/v1"
+DEFAULT_PORT = 9000
+MAX_PAGE_SIZE = 500            # DNA Center no devuelve más de 500 elementos por página
+INTERFACES_PER_DEVICE = 4
+TICK = 5.0                     # segundos simulados entre rondas de cambios
+
+PLATFORMS = (
+    ("C9300-24U", "Switches and Hubs", "ACCESS", "17.9.4a"),
+    ("C9500-40X", "Switches and Hubs", "DISTRIBUTION", "17.9.4a"),
+    ("ISR4451-X/K9", "Routers", "BORDER ROUTER", "17.6.5"),
+    ("C9800-40-K9", "Wireless Controller", "ACCESS", "17.12.1"),
+)
+VERSIONS = ("17.6.5", "17.9.4a", "17.12.1", "17.12.1prd9")
+
+def format_uptime(seconds: int) -> str:
+    days, rest = divmod(int(seconds), 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, secs = divmod(rest, 60)
+    prefix = f"{days} day{'s' if days != 1 else ''}, " if days else ""
+    return f"{prefix}{hours}:{minutes:02d}:{secs:02d}.00"
+
+class SimulatedInventory:
+    """
+    Inventario sintético con cambios a lo largo del tiempo.
+    En cada TICK una fracción `churn` de los dispositivos cambia: pierde o
+    recupera alcanzabilidad, se reinicia, cambia de versión o de estado de
+    recolección. Los contadores de interfaces avanzan según una carga por
+    interfaz (algunas por encima del 70%).
+    """
+    def __init__(self, devices: int, churn: float = 0.01, seed: int = 1):
+        self.random = random.Random(seed)
+        self.churn = churn
+        self.started = time.time()
+        self.simulated_at = self.started
+        self.lock = threading.Lock()
+        self.devices: List[Dict] = [self._device(i) for i in range(devices)]
+        self.by_id: Dict[str, Dict] = {d["id"]: d for d in self.devices}
+        self.boot: Dict[str, float] = {
+            d["id"]: self.started - self.random.randint(600, 90 * 86400) for d in self.devices
+        }
+        self.interfaces: List[Dict] = []
+        self.load: List[float] = []
+        for d in self.devices:
+            for port in range(INTERFACES_PER_DEVICE):
+                self.interfaces.append({
+                    "id": f"{d['id']}-if{port}",
+                    "deviceId": d["id"],
+                    "portName": f"GigabitEthernet1/0/{port + 1}",
+                    "description": "",
+                    "status": "up",
+                    "adminStatus": "UP",
+                    "speed": "1000000",   # kbps
+                    "inOctets": self.random.randint(0, 1 << 40),
+                    "outOctets": self.random.randint(0, 1 << 40),
+                    "inErrors": 0,
+                    "outErrors": 0
+                })
+                self.load.append(self.random.choice((0.05, 0.1, 0.3, 0.5, 0.8)))
+        self._refresh(self.started, 0)
+
+    def _device(self, i: int) -> Dict:
+        platform, family, role, version = PLATFORMS[i % len(PLATFORMS)]
+        return {
+            "id": f"sim-{i:06d}",
+            "hostname": f"sim-{family.split()[0].lower()}-{i:06d}",
+            "managementIpAddress": f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}",
+            "macAddress": ":".join(f"{b:02x}" for b in (0, 0x1b, 0x54, (i >> 16) & 255, (i >> 8) & 255, i & 255)),
+            "softwareVersion": version,
+            "reachabilityStatus": "Reachable",
+            "upTime": "",
+            "serialNumber": f"SIM{i:08d}",
+            "platformId": platform,
+            "interfaceCount": str(INTERFACES_PER_DEVICE),
+            "lastUpdated": "",
+            "description": f"Dispositivo simulado {i}",
+            "role": role,
+            "vendor": "Cisco",
+            "type": platform,
+            "family": family,
+            "series": family,
+            "softwareType": "IOS-XE",
+            "deviceSupportLevel": "Supported",
+            "collectionStatus": "Managed",
+            "bootDateTime": ""
+        }
+
+    def advance(self):
+        """Aplicar las rondas de cambios pendientes y actualizar uptime y contadores"""
+        with self.lock:
+            now = time.time()
+            rounds = int((now - self.simulated_at) // TICK)
+            if rounds <= 0:
+                return
+            self.simulated_at += rounds * TICK
+            self._apply_rounds(rounds, now)
+
+    def tick(self, rounds: int = 1):
+        """Forzar rondas de cambios sin esperar TICK (usado por benchmark.py)"""
+        with self.lock:
+            self._apply_rounds(rounds, time.time())
+
+    def _apply_rounds(self, rounds: int, now: float):
+        changes = int(len(self.devices) * self.churn * rounds)
+        for device in self.random.sample(self.devices, min(changes, len(self.devices))):
+            self._mutate(device, now)
+        self._refresh(now, rounds * TICK)
+
+    def _refresh(self, now: float, elapsed: float):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        for device in self.devices:
+            device["upTime"] = format_uptime(now - self.boot[device["id"]])
+            device["bootDateTime"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.boot[device["id"]]))
+            device["lastUpdated"] = stamp
+        if not elapsed:
+            return
+        for interface, load in zip(self.interfaces, self.load):
+            octets = int(load * 1_000_000_000 / 8 * elapsed)
+            interface["inOctets"] = (interface["inOctets"] + octets) % (1 << 64)
+            interface["outOctets"] = (interface["outOctets"] + octets // 2) % (1 << 64)
+            if load > 0.7 and self.random.random() < 0.1:
+                interface["inErrors"] = (interface["inErrors"] + self.random.randint(1, 20)) % (1 << 32)
+
+    def _mutate(self, device: Dict, now: float):
+        change = self.random.random()
+        if change < 0.5:
+            device["reachabilityStatus"] = (
+                "Unreachable" if device["reachabilityStatus"] == "Reachable" else "Reachable"
+            )
+        elif change < 0.7:
+            self.boot[device["id"]] = now - self.random.randint(30, 240)
+            for interface in self.interfaces_of(device["id"]):
+                interface["inOctets"] = interface["outOctets"] = 0
+                interface["inErrors"] = interface["outErrors"] = 0
+        elif change < 0.85:
+            device["softwareVersion"] = self.random.choice(VERSIONS)
+        else:
+            device["collectionStatus"] = (
+                "Partial Collection Failure" if device["collectionStatus"] == "Managed" else "Managed"
+            )
+
+    def interfaces_of(self, device_id: str) -> List[Dict]:
+        index = int(device_id.rsplit("-", 1)[1]) * INTERFACES_PER_DEVICE
+        return self.interfaces[index:index + INTERFACES_PER_DEVICE]
+
+    def page(self, items: List[Dict], offset: int, limit: int) -> List[Dict]:
+        # El offset de DNA Center empieza en 1
+        start = max(offset, 1) - 1
+        return items[start:start + min(limit, MAX_PAGE_SIZE)]
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"    # keep-alive como el controlador real
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(max(0.0, server.random.gauss(server.latency, server.latency / 4)))
+        if server.error_rate and server.random.random() < server.error_rate:
+            self._send(server.random.choice((429, 500, 503)), {"error": "error simulado"})
+            return
+        inventory = server.inventory
+        inventory.advance()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        offset = int(query.get("offset", ["1"])[0])
+        limit = int(query.get("limit", [str(MAX_PAGE_SIZE)])[0])
+        parts = url.path[len(API_PREFIX):].strip("/").split("/") if url.path.startswith(API_PREFIX) else []
+        with inventory.lock:
+            if parts == ["network-device"]:
+                body = {"response": inventory.page(inventory.devices, offset, limit), "version": "1.0"}
+            elif parts == ["network-device", "count"]:
+                body = {"response": len(inventory.devices), "version": "1.0"}
+            elif len(parts) == 2 and parts[0] == "network-device":
+                device = inventory.by_id.get(parts[1])
+                if device is None:
+                    self._send(404, {"response": {"errorCode": "NOT_FOUND"}})
+                    return
+                body = {"response": device, "version": "1.0"}
+            elif parts == ["interface"]:
+                body = {"response": inventory.page(inventory.interfaces, offset, limit), "version": "1.0"}
+            elif parts == ["interface", "count"]:
+                body = {"response": len(inventory.interfaces), "version": "1.0"}
+            else:
+                body = None
+            payload = json.dumps(body).encode() if body is not None else None
+        if payload is None:
+            self._send(404, {"error": "recurso no simulado"})
+            return
+        self._send(200, payload)
+
+    def _send(self, status: int, body):
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+class DNACSimulator(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, devices: int, port: int = DEFAULT_PORT, churn: float = 0.01,
+                 latency: float = 0.0, error_rate: float = 0.0, seed: int = 1):
+        super().__init__(("127.0.0.1", port), SimulatorHandler)
+        self.inventory = SimulatedInventory(devices, churn, seed)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed + 1)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{API_PREFIX}/network-device"
+
+    def start(self) -> "DNACSimulator":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True, name="dnac-simulator")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador local de DNA Center")
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--churn", type=float, default=0.01, help="fracción de dispositivos que cambia cada 5 s")
+    parser.add_argument("--latency", type=float, default=0.0, help="latencia media por petición (segundos)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probabilidad de responder 429/5xx")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    simulator = DNACSimulator(args.devices, args.port, args.churn, args.latency, args.error_rate, args.seed)
+    print(f"Simulador DNA Center con {args.devices} dispositivos en {simulator.base_url}")
+    try:
+        simulator.serve_forever()
+    except KeyboardInterrupt:
+        simulator.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import json
+import secrets
+import threading
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+EVENT_BACKLOG = 10000    # eventos que se conservan para reanudar una suscripción
+
+class EventBus:
+    """
+    Registro de eventos del monitor con número de secuencia creciente.
+    Los suscriptores piden los eventos posteriores a la última secuencia que
+    vieron; si esa secuencia ya salió del backlog deben volver a leer el estado
+    completo (resync). La secuencia vuelve a 0 con cada proceso, así que el id
+    que ven los clientes es "<época>-<seq>" y una época distinta también es resync.
+    """
+    def __init__(self, backlog: int = EVENT_BACKLOG, epoch: Optional[str] = None):
+        self._events: Deque[Tuple[int, str, Any]] = deque(maxlen=backlog)
+        self._lock = threading.Lock()
+        self.last_seq = 0
+        self.epoch = epoch or secrets.token_hex(4)
+
+    def publish(self, event: str, data: Any) -> int:
+        with self._lock:
+            self.last_seq += 1
+            self._events.append((self.last_seq, event, data))
+            return self.last_seq
+
+    @classmethod
+    def restore(cls, events: List[Tuple[int, str, Any]], last_seq: int, epoch: str) -> "EventBus":
+        """Reconstruir los eventos recientes publicados por otro proceso (snapshot_channel.py)"""
+        bus = cls(epoch=epoch)
+        bus._events.extend(events)
+        bus.last_seq = last_seq
+        return bus
+
+    def since(self, seq: int) -> Optional[List[Tuple[int, str, Any]]]:
+        """Eventos con secuencia > seq, o None si ya no se pueden reconstruir"""
+        with self._lock:
+            if seq == self.last_seq:
+                return []
+            if seq > self.last_seq:
+                return None     # secuencia que este registro nunca emitió
+            oldest = self._events[0][0] if self._events else self.last_seq + 1
+            if seq < oldest - 1:
+                return None
+            return [event for event in self._events if event[0] > seq]
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+def parse_event_id(value: str) -> Tuple[Optional[str], int]:
+    """(época, secuencia) de un id de evento; (None, 0) si no tiene la forma "<época>-<seq>" """
+    epoch, _, seq = value.rpartition("-")
+    if not epoch or not seq.isdigit():
+        return None, 0
+    return epoch, int(seq)
+
+def format_sse(event_id: Optional[str], event: str, data: Any) -> str:
+    """Serializar un evento en formato text/event-stream"""
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+    return "\n".join(lines) + "\n\n"
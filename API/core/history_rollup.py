@@ -0,0 +1,171 @@
+import os
+import pickle
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+# (segundos por intervalo, intervalos que se conservan)
+ROLLUP_TIERS = (
+    (60, 180),       # 1 min durante 3 h
+    (900, 672),      # 15 min durante 7 días
+    (3600, 720),     # 1 h durante 30 días
+)
+
+ROLLUP_COLUMNS = ("bucket", "samples", "reachable", "min_uptime", "max_uptime",
+                  "interface_changes", "version_changes", "reboots")
+_TYPECODES = ("I", "H", "H", "i", "i", "H", "H", "H")
+
+class RollupSeries:
+    """Intervalos agregados de un dispositivo en un nivel, en buffer circular de columnas"""
+    __slots__ = ("capacity", "head") + ROLLUP_COLUMNS
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.head = 0
+        for name, typecode in zip(ROLLUP_COLUMNS, _TYPECODES):
+            setattr(self, name, array(typecode))
+
+    def __len__(self) -> int:
+        return len(self.bucket)
+
+    def _last(self) -> int:
+        return len(self.bucket) - 1 if len(self.bucket) < self.capacity else (self.head - 1) % self.capacity
+
+    def add(self, bucket: int, reachable: bool, uptime: int,
+            interface_change: bool, version_change: bool, reboot: bool):
+        last = self._last() if len(self.bucket) else None
+        if last is not None and self.bucket[last] == bucket:
+            # El intervalo sigue abierto: se actualiza en su lugar
+            self.samples[last] += 1
+            self.reachable[last] += reachable
+            if uptime >= 0:
+                if self.min_uptime[last] < 0 or uptime < self.min_uptime[last]:
+                    self.min_uptime[last] = uptime
+                if uptime > self.max_uptime[last]:
+                    self.max_uptime[last] = uptime
+            self.interface_changes[last] += interface_change
+            self.version_changes[last] += version_change
+            self.reboots[last] += reboot
+            return
+        row = (bucket, 1, int(reachable), uptime, uptime,
+               int(interface_change), int(version_change), int(reboot))
+        if len(self.bucket) < self.capacity:
+            for name, value in zip(ROLLUP_COLUMNS, row):
+                getattr(self, name).append(value)
+        else:
+            for name, value in zip(ROLLUP_COLUMNS, row):
+                getattr(self, name)[self.head] = value
+            self.head = (self.head + 1) % self.capacity
+
+    def rows(self, first_bucket: int, last_bucket: int) -> List[Tuple]:
+        """Intervalos entre dos números de intervalo, en orden cronológico"""
+        order = list(range(self.head, len(self.bucket))) + list(range(self.head))
+        columns = [getattr(self, name) for name in ROLLUP_COLUMNS]
+        return [tuple(column[i] for column in columns) for i in order
+                if first_bucket <= self.bucket[i] <= last_bucket]
+
+class RollupStore:
+    """
+    Agregados por nivel (1 min, 15 min, 1 h) mantenidos a medida que
+    update_history ingiere cada sondeo: proporción de alcanzabilidad,
+    uptime mínimo/máximo, cambios de interfaces, cambios de versión y reinicios.
+    """
+    def __init__(self, tiers=ROLLUP_TIERS):
+        self.tiers = tuple(tiers)
+        self._series: Dict[int, Dict[str, RollupSeries]] = {step: {} for step, _ in self.tiers}
+        self._last: Dict[str, Tuple[int, str, int]] = {}   # device_id -> (interfaces, versión, uptime)
+
+    def append_parsed(self, device_id: str, timestamp: float, reachability: str,
+                      uptime: int, interfaces: int, version: str):
+        """Misma firma que HistoryStore.append_parsed"""
+        self.add(device_id, timestamp, reachability.lower() == "reachable", uptime, interfaces, version)
+
+    def add(self, device_id: str, timestamp: float, reachable: bool,
+            uptime: int, interfaces: int, version: str):
+        previous = self._last.get(device_id)
+        interface_change = previous is not None and previous[0] != interfaces
+        version_change = previous is not None and previous[1] != version
+        reboot = previous is not None and 0 <= uptime < previous[2]
+        self._last[device_id] = (interfaces, version, uptime if uptime >= 0 else (previous[2] if previous else -1))
+        for step, capacity in self.tiers:
+            series = self._series[step].get(device_id)
+            if series is None:
+                series = self._series[step][device_id] = RollupSeries(capacity)
+            series.add(int(timestamp // step), reachable, uptime, interface_change, version_change, reboot)
+
+    def __len__(self) -> int:
+        return len(self._last)
+
+    @property
+    def horizon(self) -> int:
+        """Segundos que cubre el nivel más largo (intervalo × capacidad)"""
+        return max(step * capacity for step, capacity in self.tiers)
+
+    def save(self, path: str, until: float):
+        """Guardar los agregados con el timestamp del último sondeo incluido"""
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump((self.tiers, until, self._series, self._last), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+    def load(self, path: str) -> Optional[float]:
+        """Restaurar lo guardado por save(); devuelve hasta qué timestamp llega o None si no sirve"""
+        try:
+            with open(path, "rb") as f:
+                tiers, until, series, last = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError) as e:
+            print(f"No se pudieron leer los agregados guardados: {str(e)}")
+            return None
+        if tuple(tiers) != self.tiers:
+            return None     # otros niveles: se reconstruyen desde los segmentos
+        self._series, self._last = series, last
+        return until
+
+    def retain(self, device_ids: Set[str]):
+        """Descartar los agregados de los dispositivos que ya no están en el inventario"""
+        for device_id in [device_id for device_id in self._last if device_id not in device_ids]:
+            del self._last[device_id]
+            for series in self._series.values():
+                series.pop(device_id, None)
+
+    def pick_tier(self, step: int) -> Optional[int]:
+        """Nivel más grueso cuyo intervalo divide al paso pedido"""
+        candidates = [tier for tier, _ in self.tiers if tier <= step and step % tier == 0]
+        return max(candidates) if candidates else None
+
+    def query(self, device_id: str, start: float, end: float, step: int) -> Optional[List[Dict]]:
+        """Agregados de `step` segundos entre start y end; None si ningún nivel sirve"""
+        tier = self.pick_tier(step)
+        if tier is None:
+            return None
+        series = self._series[tier].get(device_id)
+        if series is None:
+            return []
+        merged: Dict[int, List[int]] = {}
+        for bucket, samples, reachable, min_up, max_up, if_changes, ver_changes, reboots in series.rows(
+                int(start // tier), int(end // tier)):
+            key = bucket * tier // step
+            row = merged.get(key)
+            if row is None:
+                merged[key] = [samples, reachable, min_up, max_up, if_changes, ver_changes, reboots]
+                continue
+            row[0] += samples
+            row[1] += reachable
+            if min_up >= 0 and (row[2] < 0 or min_up < row[2]):
+                row[2] = min_up
+            row[3] = max(row[3], max_up)
+            row[4] += if_changes
+            row[5] += ver_changes
+            row[6] += reboots
+        return [{
+            "timestamp": datetime.fromtimestamp(key * step).isoformat(),
+            "step": step,
+            "samples": samples,
+            "availability": round(reachable / samples, 4) if samples else None,
+            "min_uptime": min_up if min_up >= 0 else None,
+            "max_uptime": max_up if max_up >= 0 else None,
+            "interface_changes": if_changes,
+            "version_changes": ver_changes,
+            "reboots": reboots
+        } for key, (samples, reachable, min_up, max_up, if_changes, ver_changes, reboots) in sorted(merged.items())]
@@ -0,0 +1,234 @@
+import re
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, List, Iterator, Optional, Set, Tuple
+
+_UPTIME_RE = re.compile(r"^(?:(\d+)\s+days?,\s*)?(\d+):(\d+):(\d+(?:\.\d+)?)$")
+
+def parse_uptime(uptime: str) -> Optional[int]:
+    """Convertir '1 day, 0:09:19.00' de DNA Center a segundos (None si no se reconoce)"""
+    match = _UPTIME_RE.match((uptime or "").strip())
+    if not match:
+        return None
+    days, hours, minutes, seconds = match.groups()
+    return int(days or 0) * 86400 + int(hours) * 3600 + int(minutes) * 60 + int(float(seconds))
+
+def format_uptime(total_seconds: int) -> str:
+    """Operación inversa de parse_uptime, en el formato de DNA Center"""
+    if total_seconds < 0:
+        return ""
+    days, rest = divmod(int(total_seconds), 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, seconds = divmod(rest, 60)
+    clock = f"{hours}:{minutes:02d}:{seconds:02d}.00"
+    if days:
+        return f"{days} day{'s' if days != 1 else ''}, {clock}"
+    return clock
+
+class StringTable:
+    """Tabla de internado: cada texto repetido se guarda una sola vez y se referencia por código"""
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = list(values or [])
+        self._codes: Dict[str, int] = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self._codes.get(value)
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+def history_point(timestamp: float, reachability: str, uptime: int, interfaces: int, version: str) -> Dict:
+    """Punto de historial en el formato de HistoryPointModel"""
+    return {
+        "timestamp": datetime.fromtimestamp(timestamp).isoformat(),
+        "reachability": reachability,
+        "uptime": format_uptime(uptime),
+        "interface_count": interfaces,
+        "software_version": version
+    }
+
+COLUMNS = ("timestamps", "reachability", "uptime", "interfaces", "versions")
+
+def check_capacity(capacity: int) -> int:
+    # Con capacidad 0 el buffer circular no tiene dónde escribir (y values[-0:] conserva todo)
+    if capacity < 1:
+        raise ValueError(f"La capacidad del historial debe ser al menos 1 (se recibió {capacity})")
+    return capacity
+
+class DeviceHistory:
+    """
+    Buffer circular de capacidad fija con una columna (array) por campo.
+    Las columnas crecen hasta `capacity` y luego se sobrescriben en `head`,
+    así que agregar y descartar el punto más viejo es O(1).
+    Un único escritor (el hilo de monitoreo) incrementa `seq` antes y después
+    de cada modificación; los lectores copian las columnas y reintentan si
+    `seq` cambió (seqlock), sin bloquear nunca al escritor.
+    """
+    __slots__ = ("capacity", "head", "seq", "timestamps", "reachability", "uptime", "interfaces", "versions")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.head = 0                         # posición del punto más viejo una vez lleno
+        self.seq = 0                          # impar mientras hay una escritura en curso
+        self.timestamps = array("d")          # epoch en segundos
+        self.reachability = array("B")        # código en HistoryStore.reachability_table
+        self.uptime = array("q")              # segundos (-1 si no se pudo interpretar)
+        self.interfaces = array("I")
+        self.versions = array("H")            # código en HistoryStore.version_table
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def append(self, timestamp: float, reachability: int, uptime: int, interfaces: int, version: int):
+        self.seq += 1
+        # seq vuelve a ser par aunque falle la escritura: si quedara impar, columns() no terminaría
+        try:
+            if len(self.timestamps) < self.capacity:
+                self.timestamps.append(timestamp)
+                self.reachability.append(reachability)
+                self.uptime.append(uptime)
+                self.interfaces.append(interfaces)
+                self.versions.append(version)
+            else:
+                i = self.head
+                self.timestamps[i] = timestamp
+                self.reachability[i] = reachability
+                self.uptime[i] = uptime
+                self.interfaces[i] = interfaces
+                self.versions[i] = version
+                self.head = (i + 1) % self.capacity
+        finally:
+            self.seq += 1
+
+    def columns(self) -> Tuple[List, ...]:
+        """Copia consistente de todas las columnas en orden cronológico"""
+        while True:
+            seq = self.seq
+            if seq & 1:
+                time.sleep(0)    # escritura en curso: ceder el GIL al escritor
+                continue
+            head = self.head
+            # Copiar con slicing (no memoryview: una vista exportada impediría agregar al array)
+            copies = [getattr(self, name)[:] for name in COLUMNS]
+            if self.seq == seq:
+                return tuple(column[head:].tolist() + column[:head].tolist() for column in copies)
+
+    def column(self, column: str) -> List:
+        return self.columns()[COLUMNS.index(column)]
+
+    def resize(self, capacity: int):
+        """Cambiar la capacidad conservando los puntos más recientes"""
+        check_capacity(capacity)
+        columns = {name: values[-capacity:] for name, values in zip(COLUMNS, self.columns())}
+        self.seq += 1
+        try:
+            self.capacity = capacity
+            self.head = 0
+            for name, values in columns.items():
+                setattr(self, name, array(getattr(self, name).typecode, values))
+        finally:
+            self.seq += 1
+
+class HistoryStore:
+    """Historial por dispositivo con buffers circulares y textos internados"""
+    def __init__(self, capacity: int):
+        self.capacity = check_capacity(capacity)
+        self.reachability_table = StringTable()
+        self.version_table = StringTable()
+        self._devices: Dict[str, DeviceHistory] = {}
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self._devices
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def __bool__(self) -> bool:
+        return bool(self._devices)
+
+    def point_count(self) -> int:
+        return sum(len(history) for history in self._devices.values())
+
+    def get(self, device_id: str) -> Optional[DeviceHistory]:
+        return self._devices.get(device_id)
+
+    def items(self) -> Iterator[Tuple[str, DeviceHistory]]:
+        return iter(list(self._devices.items()))
+
+    def append(self, device_id: str, timestamp: float, reachability: str,
+               uptime: str, interface_count: int, software_version: str):
+        uptime_seconds = parse_uptime(uptime)
+        self.append_parsed(device_id, timestamp, reachability,
+                           -1 if uptime_seconds is None else uptime_seconds,
+                           int(interface_count), software_version)
+
+    def append_parsed(self, device_id: str, timestamp: float, reachability: str,
+                      uptime_seconds: int, interface_count: int, software_version: str):
+        history = self._devices.get(device_id)
+        if history is None:
+            history = self._devices[device_id] = DeviceHistory(self.capacity)
+        history.append(
+            timestamp,
+            self.reachability_table.code(reachability),
+            uptime_seconds,
+            interface_count,
+            self.version_table.code(software_version)
+        )
+
+    def retain(self, device_ids: Set[str]):
+        """Descartar el historial en memoria de los dispositivos que ya no están en el inventario"""
+        for device_id in [device_id for device_id in self._devices if device_id not in device_ids]:
+            del self._devices[device_id]
+
+    def set_capacity(self, capacity: int):
+        check_capacity(capacity)
+        if capacity == self.capacity:
+            return
+        self.capacity = capacity
+        for history in self._devices.values():
+            history.resize(capacity)
+
+    def reachable_series(self, device_id: str) -> Tuple[List[float], List[int]]:
+        """Serie (epoch, 1/0) de alcanzabilidad para gráficos"""
+        timestamps, reachability, *_ = self._devices[device_id].columns()
+        reachable = [int(value.lower() == "reachable") for value in self.reachability_table.values]
+        return timestamps, [reachable[code] for code in reachability]
+
+    def points(self, device_id: str, until: Optional[float] = None) -> List[Dict]:
+        """Historial en el formato de HistoryPointModel (hasta `until`, si se indica)"""
+        history = self._devices.get(device_id)
+        if history is None:
+            return []    # el dispositivo salió del inventario después de consultar `in`
+        timestamps, reachability, uptime, interfaces, versions = history.columns()
+        return [history_point(timestamp, self.reachability_table[reachability], uptime,
+                              interfaces, self.version_table[version])
+                for timestamp, reachability, uptime, interfaces, version in zip(
+                    timestamps, reachability, uptime, interfaces, versions
+                ) if until is None or timestamp <= until]
+
+class HistoryView:
+    """
+    Historial en memoria tal como estaba al publicar una instantánea: los
+    puntos agregados después (timestamp > until) no se ven; until=None no
+    filtra. Los puntos que el buffer ya descartó tampoco, como en HistoryStore.
+    """
+    __slots__ = ("store", "until")
+
+    def __init__(self, store: HistoryStore, until: Optional[float]):
+        self.store = store
+        self.until = until
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self.store
+
+    def points(self, device_id: str) -> List[Dict]:
+        return self.store.points(device_id, self.until)
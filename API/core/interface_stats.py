@@ -0,0 +1,248 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+BANDWIDTH_THRESHOLD = 70.0       # porcentaje de utilización (monitor-config/bandwidth-threshold)
+ERROR_THRESHOLD = 5              # errores por intervalo (monitor-config/error-threshold)
+RATE_TOLERANCE = 1.5             # una tasa mayor que 1.5 x speed se considera reinicio del contador
+COUNTER64_MASK = 0xFFFFFFFFFFFFFFFF
+COUNTER64_HALF = 1 << 63
+COUNTER32_MASK = 0xFFFFFFFF
+COUNTER32_HALF = 1 << 31
+
+# Campos del inventario de interfaces de DNA Center (/interface)
+COUNTER_FIELDS = {
+    "in_octets": "inOctets",
+    "out_octets": "outOctets",
+    "in_errors": "inErrors",
+    "out_errors": "outErrors",
+}
+
+@dataclass
+class InterfaceSample:
+    """Estado y métricas de una interfaz en el último sondeo"""
+    id: str                          # "<device_id>/<nombre>"
+    device_id: str
+    hostname: str
+    interface: str
+    description: str
+    enabled: bool
+    oper_status: str
+    speed: Optional[int]             # Mbps
+    in_octets: Optional[int]
+    out_octets: Optional[int]
+    in_errors: Optional[int]
+    out_errors: Optional[int]
+    rx_bps: Optional[float]
+    tx_bps: Optional[float]
+    rx_utilization: Optional[float]
+    tx_utilization: Optional[float]
+    error_delta: Optional[float]     # errores de entrada + salida en el último intervalo
+    error_rate: Optional[float]      # errores por segundo
+    over_bandwidth: bool
+    over_errors: bool
+    last_updated: Optional[str]
+
+def _counter(value) -> Tuple[int, bool]:
+    try:
+        return int(value), True
+    except (TypeError, ValueError):
+        return 0, False
+
+def _optional(value) -> Optional[float]:
+    value = float(value)
+    return None if math.isnan(value) else round(value, 2)
+
+class InterfaceStats:
+    """
+    Contadores de todas las interfaces de todos los dispositivos en arreglos
+    contiguos (una fila por interfaz). Cada sondeo calcula deltas, tasas y
+    utilización en una sola pasada vectorizada; un contador que retrocede se
+    toma como vuelta (wrap) si el delta resultante es plausible y como
+    reinicio en caso contrario, y esa muestra queda sin tasa.
+    numpy se importa con el primer sondeo: importar el monitor no lo carga.
+    """
+    def __init__(self):
+        self.keys: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.rows_by_device: Dict[str, List[int]] = {}
+        self.meta: List[Tuple[str, str, str, str, bool, str]] = []   # device_id, hostname, nombre, descripción, enabled, oper
+        self.generation = 0
+        self.timestamp: Optional[float] = None
+        # Arreglos por fila; None hasta el primer sondeo
+        self.counters: Dict[str, object] = {}
+        self.present: Dict[str, object] = {}
+        self.sampled_at = self.speed_bps = None
+        self.rx_bps = self.tx_bps = None
+        self.rx_utilization = self.tx_utilization = None
+        self.error_delta = self.error_rate = None
+        self.over_bandwidth = self.over_errors = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def update(self, rows: List[Dict], devices_by_id: Dict[str, object], now: float,
+               bandwidth_threshold: float = BANDWIDTH_THRESHOLD,
+               error_threshold: float = ERROR_THRESHOLD):
+        """
+        Ingerir un sondeo del inventario de interfaces.
+        Devuelve (ids con cambio en over_bandwidth, ids con cambio en over_errors, ids eliminados).
+        """
+        import numpy as np
+        keys, meta, speeds = [], [], []
+        raw = {name: [] for name in COUNTER_FIELDS}
+        for row in rows:
+            device_id = row.get("deviceId", "")
+            name = row.get("portName") or row.get("name") or row.get("id", "")
+            device = devices_by_id.get(device_id)
+            keys.append(f"{device_id}/{name}")
+            meta.append((device_id, getattr(device, "hostname", device_id), name,
+                         row.get("description") or "", str(row.get("adminStatus", "")).upper() == "UP",
+                         str(row.get("status", "unknown")).lower()))
+            speeds.append(row.get("speed"))   # kbps en DNA Center
+            for field_name, source in COUNTER_FIELDS.items():
+                raw[field_name].append(row.get(source))
+        n = len(keys)
+
+        # Fila anterior de cada interfaz (-1 si es nueva)
+        if keys == self.keys:
+            previous = np.arange(n)
+            removed = []
+        else:
+            previous = np.fromiter((self.positions.get(key, -1) for key in keys), dtype=np.int64, count=n)
+            current = set(keys)
+            removed = [key for key in self.keys if key not in current]
+        known = previous >= 0
+        source = np.where(known, previous, 0)
+
+        def gather(column, fill):
+            if column is None:
+                return np.full(n, fill)
+            if len(column) == 0:
+                return np.full(n, fill, dtype=column.dtype)
+            return np.where(known, column[source], fill)
+
+        counters, present = {}, {}
+        for field_name in COUNTER_FIELDS:
+            parsed = [_counter(value) for value in raw[field_name]]
+            counters[field_name] = np.fromiter((v for v, _ in parsed), dtype=np.uint64, count=n)
+            present[field_name] = np.fromiter((ok for _, ok in parsed), dtype=bool, count=n)
+        speed_bps = np.fromiter((_counter(s)[0] * 1000.0 for s in speeds), dtype=np.float64, count=n)
+
+        dt = now - gather(self.sampled_at, np.nan)
+        has_dt = known & (dt > 0)
+
+        def deltas(field_name, mask, half):
+            new = counters[field_name]
+            old = gather(self.counters.get(field_name), 0).astype(np.uint64)
+            valid = has_dt & present[field_name] & gather(self.present.get(field_name), False)
+            delta = (new - old) & np.uint64(mask)  # aritmética módulo 2^64 / 2^32
+            wrapped = new < old
+            # Si retrocede y el delta es enorme, el contador se reinició (p. ej. reboot)
+            valid &= ~(wrapped & (delta >= np.uint64(half)))
+            return delta.astype(np.float64), valid
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            in_delta, in_valid = deltas("in_octets", COUNTER64_MASK, COUNTER64_HALF)
+            out_delta, out_valid = deltas("out_octets", COUNTER64_MASK, COUNTER64_HALF)
+            rx_bps = np.where(in_valid, in_delta * 8 / dt, np.nan)
+            tx_bps = np.where(out_valid, out_delta * 8 / dt, np.nan)
+            has_speed = speed_bps > 0
+            # Una tasa muy superior a la velocidad de la interfaz solo se explica por un reinicio
+            rx_bps[has_speed & (rx_bps > speed_bps * RATE_TOLERANCE)] = np.nan
+            tx_bps[has_speed & (tx_bps > speed_bps * RATE_TOLERANCE)] = np.nan
+            rx_util = np.where(has_speed, rx_bps / speed_bps * 100, np.nan)
+            tx_util = np.where(has_speed, tx_bps / speed_bps * 100, np.nan)
+
+            in_err, in_err_valid = deltas("in_errors", COUNTER32_MASK, COUNTER32_HALF)
+            out_err, out_err_valid = deltas("out_errors", COUNTER32_MASK, COUNTER32_HALF)
+            error_delta = np.where(in_err_valid & out_err_valid, in_err + out_err,
+                                   np.where(in_err_valid, in_err, np.where(out_err_valid, out_err, np.nan)))
+            error_rate = error_delta / dt
+
+            # Una muestra inválida (nueva, sin contadores o reiniciada) conserva el estado de alerta previo
+            previous_bw = gather(self.over_bandwidth, False)
+            previous_err = gather(self.over_errors, False)
+            # np.maximum propaga NaN: si un sentido no tiene muestra válida se conserva el estado
+            utilization = np.maximum(rx_util, tx_util)
+            over_bandwidth = np.where(np.isnan(utilization), previous_bw, utilization > bandwidth_threshold)
+            over_errors = np.where(np.isnan(error_delta), previous_err, error_delta > error_threshold)
+
+        bandwidth_changed = [keys[i] for i in np.flatnonzero(over_bandwidth != previous_bw)]
+        errors_changed = [keys[i] for i in np.flatnonzero(over_errors != previous_err)]
+
+        if keys != self.keys:
+            self.keys = keys
+            self.positions = {key: i for i, key in enumerate(keys)}
+            self.rows_by_device = {}
+            for i, (device_id, *_) in enumerate(meta):
+                self.rows_by_device.setdefault(device_id, []).append(i)
+        self.meta = meta
+        self.counters = counters
+        self.present = present
+        self.sampled_at = np.full(n, now)
+        self.speed_bps = speed_bps
+        self.rx_bps, self.tx_bps = rx_bps, tx_bps
+        self.rx_utilization, self.tx_utilization = rx_util, tx_util
+        self.error_delta, self.error_rate = error_delta, error_rate
+        self.over_bandwidth, self.over_errors = over_bandwidth, over_errors
+        self.timestamp = now
+        self.generation += 1
+        return bandwidth_changed, errors_changed, removed
+
+    def sample(self, row: int) -> InterfaceSample:
+        device_id, hostname, name, description, enabled, oper_status = self.meta[row]
+        present = {field_name: bool(self.present[field_name][row]) for field_name in COUNTER_FIELDS}
+        counter = lambda field_name: int(self.counters[field_name][row]) if present[field_name] else None
+        speed = self.speed_bps[row]
+        return InterfaceSample(
+            id=self.keys[row],
+            device_id=device_id,
+            hostname=hostname,
+            interface=name,
+            description=description,
+            enabled=enabled,
+            oper_status=oper_status,
+            speed=int(speed // 1_000_000) if speed > 0 else None,
+            in_octets=counter("in_octets"),
+            out_octets=counter("out_octets"),
+            in_errors=counter("in_errors"),
+            out_errors=counter("out_errors"),
+            rx_bps=_optional(self.rx_bps[row]),
+            tx_bps=_optional(self.tx_bps[row]),
+            rx_utilization=_optional(self.rx_utilization[row]),
+            tx_utilization=_optional(self.tx_utilization[row]),
+            error_delta=_optional(self.error_delta[row]),
+            error_rate=_optional(self.error_rate[row]),
+            over_bandwidth=bool(self.over_bandwidth[row]),
+            over_errors=bool(self.over_errors[row]),
+            last_updated=datetime.fromtimestamp(self.sampled_at[row]).isoformat()
+        )
+
+    # Interfaz de mapeo para AlertEngine: las muestras se construyen solo al consultarlas
+    def __getitem__(self, interface_id: str) -> InterfaceSample:
+        return self.sample(self.positions[interface_id])
+
+    def get(self, interface_id: str, default=None) -> Optional[InterfaceSample]:
+        row = self.positions.get(interface_id)
+        return default if row is None else self.sample(row)
+
+    def device_samples(self, device_id: str) -> List[InterfaceSample]:
+        return [self.sample(row) for row in self.rows_by_device.get(device_id, ())]
+
+    def top(self, limit: int, metric: str = "utilization") -> List[InterfaceSample]:
+        """Interfaces con mayor utilización (o tasa de errores), de mayor a menor"""
+        if not self.keys:
+            return []
+        import numpy as np
+        if metric == "errors":
+            values = self.error_rate
+        else:
+            values = np.fmax(self.rx_utilization, self.tx_utilization)
+        values = np.where(np.isnan(values), -np.inf, values)
+        order = np.argsort(-values, kind="stable")[:limit]
+        return [self.sample(row) for row in order]
+
+    def samples(self) -> List[InterfaceSample]:
+        return [self.sample(row) for row in range(len(self.keys))]
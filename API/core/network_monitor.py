@@ -1,15 +1,28 @@
-import requests
-import json
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
+import os
+import math
 import time
 from datetime import datetime
-import matplotlib.pyplot as plt
-from dataclasses import dataclass
-from collections import defaultdict
+from dataclasses import dataclass, field, asdict
+import copy
 import threading
-
-# Desactivar advertencias de SSL
-requests.packages.urllib3.disable_warnings()
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from adaptive_poller import AdaptivePoller, FAST_INTERVAL
+from history_store import HistoryStore, HistoryView, parse_uptime
+from segment_store import SegmentStore
+from history_rollup import RollupStore
+from device_index import DeviceIndex
+from alert_engine import Alert, AlertEngine, INTERFACE_RULES
+from alert_store import AlertStore, ALERT_DB
+from interface_stats import InterfaceStats, BANDWIDTH_THRESHOLD, ERROR_THRESHOLD
+from event_stream import EventBus
+from metrics import (REGISTRY, STAGE_SECONDS, DEVICES, OPEN_ALERTS, HISTORY_POINTS, INTERFACES, CYCLES,
+                     CYCLE_ERRORS)
+from profiling import CycleProfiler, MemorySampler
+from report_worker import (ReportWorker, ReportSnapshot, write_json_atomic, downsample_minmax,
+                           render_reachability_chart, DEVICES_TABLE, ALERTS_REPORT, REACHABILITY_CHART)
 
 # Configuración RESTCONF
 BASE_URL = "https://10.10.20.85/dna/intent/api/v1/network-device"
@@ -23,263 +36,681 @@ HEADERS = {
 
 POLLING_INTERVAL = 15  # segundos
 HISTORY_LIMIT = 1440
+HISTORY_DIR = "history_data"   # segmentos de historial en disco
+HISTORY_RETENTION_DAYS = 28
+ROLLUP_FILE = "rollups.pickle"   # agregados guardados en HISTORY_DIR para no releer semanas de segmentos
+ROLLUP_SAVE_INTERVAL = 3600      # segundos entre guardados de los agregados
+ALERT_RETENTION = 24  # horas que se conservan las alertas resueltas (alert-retention)
+INTERFACE_POLLING_INTERVAL = 60  # segundos entre sondeos del inventario de interfaces
+RECENT_CYCLES = 120   # ciclos con tiempos por etapa disponibles en /admin/cycles
 
-@dataclass
-class Alert:
-    type: str
-    message: str
-    severity: str
-    timestamp: str
-    device_id: Optional[str] = None
+# Campos de DeviceInfo con su valor por defecto en el payload de DNA Center
+DEVICE_FIELDS = [
+    ("hostname", ""), ("managementIpAddress", ""), ("macAddress", ""), ("softwareVersion", ""),
+    ("reachabilityStatus", ""), ("upTime", ""), ("serialNumber", ""), ("platformId", ""),
+    ("interfaceCount", "0"), ("lastUpdated", ""), ("id", ""), ("description", ""), ("role", ""),
+    ("vendor", "Cisco"), ("type", ""), ("family", ""), ("series", ""), ("softwareType", ""),
+    ("deviceSupportLevel", ""), ("collectionStatus", ""), ("bootDateTime", ""), ("controller", "")
+]
+DEVICE_FIELD_NAMES = tuple(name for name, _ in DEVICE_FIELDS)
+# Textos de los campos de baja cardinalidad (versión, plataforma, familia, rol, estados de
+# reachability, soporte y colección...): miles de dispositivos y sondeos sucesivos
+# comparten un mismo str en lugar de una copia por dispositivo
+_interned: Dict[str, str] = {}
+
+def parse_boot_time(value: str) -> Optional[float]:
+    """bootDateTime de DNA Center ('2025-06-16 14:31:22', hora local) como timestamp"""
+    try:
+        return datetime.fromisoformat(value).timestamp() if value else None
+    except ValueError:
+        return None
 
-@dataclass
 class DeviceInfo:
-    hostname: str
-    managementIpAddress: str
-    macAddress: str
-    softwareVersion: str
-    reachabilityStatus: str
-    upTime: str
-    serialNumber: str
-    platformId: str
-    interfaceCount: str
-    lastUpdated: str
-    id: str
-    description: str = ""
-    role: str = ""
-    vendor: str = "Cisco"
-    type: str = ""
-    family: str = ""
-    series: str = ""
-    softwareType: str = ""
-    deviceSupportLevel: str = ""
-    collectionStatus: str = ""
-    bootDateTime: str = ""
-
-    def __post_init__(self):
+    """
+    Dispositivo del inventario, con los nombres de campo de DNA Center.
+    Sin __dict__ por instancia (__slots__); upTime y bootDateTime se convierten
+    a segundos una sola vez, al construirlo (uptime_seconds, boot_time).
+    """
+    __slots__ = DEVICE_FIELD_NAMES + ("uptime_seconds", "boot_time")
+
+    def __init__(self, **values):
+        self._load(tuple(values.get(name, default) for name, default in DEVICE_FIELDS))
+
+    @classmethod
+    def from_values(cls, values: tuple, previous: Optional["DeviceInfo"] = None) -> "DeviceInfo":
+        """Construir desde los valores en el orden de DEVICE_FIELDS; `previous` evita reconvertir bootDateTime"""
+        device = cls.__new__(cls)
+        device._load(values, previous)
+        return device
+
+    def _load(self, values: tuple, previous: Optional["DeviceInfo"] = None):
+        # Asignación explícita: en cada sondeo se construyen miles y setattr por nombre es ~10 veces más lento
+        (self.hostname, self.managementIpAddress, self.macAddress, software_version, reachability,
+         self.upTime, self.serialNumber, platform_id, interface_count, self.lastUpdated, self.id,
+         self.description, role, vendor, device_type, family, series, software_type, support_level,
+         collection_status, self.bootDateTime, controller) = values
+        intern = _interned.setdefault
+        self.softwareVersion = intern(software_version, software_version)
+        self.reachabilityStatus = intern(reachability, reachability)
+        self.platformId = intern(platform_id, platform_id)
+        self.role = intern(role, role)
+        self.vendor = intern(vendor, vendor)
+        self.type = intern(device_type, device_type)
+        self.family = intern(family, family)
+        self.series = intern(series, series)
+        self.softwareType = intern(software_type, software_type)
+        self.deviceSupportLevel = intern(support_level, support_level)
+        self.collectionStatus = intern(collection_status, collection_status)
+        self.controller = intern(controller, controller)
         # Convertir interfaceCount a entero si es posible
         try:
-            self.interfaceCount = int(self.interfaceCount)
+            self.interfaceCount = int(interface_count)
         except (ValueError, TypeError):
             self.interfaceCount = 0
+        self.uptime_seconds = parse_uptime(self.upTime)
+        if previous is not None and previous.bootDateTime == self.bootDateTime:
+            self.boot_time = previous.boot_time
+        else:
+            self.boot_time = parse_boot_time(self.bootDateTime)
+
+    def to_dict(self) -> Dict:
+        """Campos de DNA Center (la forma de DeviceModel en la API)"""
+        return {name: getattr(self, name) for name in DEVICE_FIELD_NAMES}
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.__getstate__() == other.__getstate__()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"DeviceInfo(id={self.id!r}, hostname={self.hostname!r}, reachabilityStatus={self.reachabilityStatus!r})"
 
 @dataclass
 class DeviceResponse:
     response: List[DeviceInfo]
     version: str
 
+@dataclass
+class ChangeSet:
+    """Diferencias entre dos instantáneas consecutivas del inventario"""
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    modified: Dict[str, List[str]] = field(default_factory=dict)  # device_id -> campos cambiados
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+    def changed_ids(self) -> List[str]:
+        return self.added + list(self.modified)
+
+@dataclass(frozen=True)
+class MonitorSnapshot:
+    """
+    Estado publicado al final de cada ciclo (o refresco) del monitor.
+    Nada de lo que referencia se modifica después de publicarlo: el hilo de
+    monitoreo construye listas, índices y ChangeSet nuevos en cada ciclo y
+    reemplaza `NetworkMonitor.snapshot` con una sola asignación, así que los
+    lectores toman la referencia una vez y ven un estado consistente sin locks.
+    """
+    generation: int
+    cycle: int
+    timestamp: float
+    devices: tuple
+    index: DeviceIndex
+    changes: ChangeSet
+    alerts: tuple
+    resolved_alerts: tuple
+    interfaces: InterfaceStats
+    history: HistoryView
+    epoch: str = ""   # ejecución del monitor que publicó (época del EventBus): la generación vuelve a 0 al reiniciar
+
 class NetworkMonitor:
+    scheduler_class: Optional[type] = None   # ControllerScheduler (controllers.py) salvo que una subclase indique otro
+
     def __init__(self):
         self.alerts: List[Alert] = []
+        self.alert_retention = ALERT_RETENTION
+        self.alert_engine = AlertEngine(retention=ALERT_RETENTION * 3600)
+        self.interface_alert_engine = AlertEngine(INTERFACE_RULES, retention=ALERT_RETENTION * 3600)
+        self.bandwidth_threshold = BANDWIDTH_THRESHOLD
+        self.error_threshold = ERROR_THRESHOLD
+        self.alert_events = []
+        self.alert_history = AlertStore(ALERT_DB)   # se escribe una vez por ciclo (flush_alert_history)
         self.running = False
         self.polling_interval = POLLING_INTERVAL
         self.history_limit = HISTORY_LIMIT
         self.devices: List[DeviceInfo] = []
-        self.device_history = defaultdict(list)
+        self.changes = ChangeSet()
+        self.generation = 0   # se incrementa cada vez que cambian los dispositivos o las alertas
+        self.events = EventBus()
+        self.index = DeviceIndex([])
+        self._devices_by_id: Dict[str, DeviceInfo] = {}
+        self._device_hashes: Dict[str, int] = {}
+        self.device_history = HistoryStore(HISTORY_LIMIT)
+        self._history_segments: Optional[SegmentStore] = None
+        self._segments_lock = threading.Lock()
+        self.history_rollups = RollupStore()
+        self.interface_stats = InterfaceStats()
+        self._interfaces_polled_at = 0.0
+        self.cycles = 0
+        self.report_worker = ReportWorker()
+        self._inventory_dirty = True
+        self._history_loaded = False
+        self._scheduler = None
+        self._scheduler_lock = threading.Lock()
+        self.poller = AdaptivePoller()
+        self.profiler = CycleProfiler()
+        self.memory = MemorySampler()
+        self.recent_cycles = deque(maxlen=RECENT_CYCLES)
+        self._cycle_stages: Dict[str, float] = {}
+        self._loop_ident: Optional[int] = None
+        self._history_until: Optional[float] = None
+        self._rollups_saved_at = time.time()
+        self.snapshot_listeners: List[Callable[[MonitorSnapshot], None]] = []
+        self._inventory_lock = threading.Lock()       # un solo hilo modifica inventario y alertas a la vez
+        self._loop_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()                # reprograma la espera entre ciclos (config, stop)
+        self._flight_lock = threading.Lock()
+        self._inventory_flight: Optional[Future] = None
+        self._publish()
+
+    @property
+    def scheduler(self):
+        # Se crea con el primer sondeo y no al construir el monitor: importar network_monitor
+        # o api_restconf no carga el cliente HTTP (requests) ni lee controllers.json
+        if self._scheduler is None:
+            with self._scheduler_lock:
+                if self._scheduler is None:
+                    from controllers import ControllerScheduler, load_controllers
+                    scheduler_class = self.scheduler_class or ControllerScheduler
+                    self._scheduler = scheduler_class(load_controllers(BASE_URL, HEADERS))
+        return self._scheduler
+
+    @property
+    def history_segments(self) -> SegmentStore:
+        # Igual que el planificador: construir el monitor no crea HISTORY_DIR ni lee su índice;
+        # el almacén se abre al arrancar (load_history) o con la primera consulta de historial
+        if self._history_segments is None:
+            with self._segments_lock:
+                if self._history_segments is None:
+                    self._history_segments = SegmentStore(HISTORY_DIR, HISTORY_RETENTION_DAYS)
+        return self._history_segments
+
+    def load_history(self):
+        # Recuperar el historial reciente desde disco en lugar de esperar nuevos sondeos
+        if self._history_loaded:
+            return
+        self._history_loaded = True
+        now = time.time()
+        # El buffer de puntos cubre history_limit sondeos; cada nivel de agregados su propio horizonte
+        # (hasta 30 días, limitado por la retención de los segmentos). Los agregados guardados solo
+        # necesitan los sondeos posteriores a su guardado.
+        saved_until = self.history_rollups.load(os.path.join(HISTORY_DIR, ROLLUP_FILE))
+        if saved_until is not None:
+            rollups_since = math.nextafter(saved_until, math.inf)
+        else:
+            rollups_since = now - min(self.history_rollups.horizon, HISTORY_RETENTION_DAYS * 86400)
+        self._rollups_saved_at = now
+        loaded = self.history_segments.load_into(
+            (now - self.history_limit * self.polling_interval, self.device_history),
+            (rollups_since, self.history_rollups)
+        )
+        if loaded:
+            print(f"Historial recuperado desde disco: {loaded} puntos")
+
+    def save_rollups(self):
+        """Guardar los agregados en HISTORY_DIR (cada ROLLUP_SAVE_INTERVAL, desde update_history)"""
+        if self._history_until is None:
+            return
+        try:
+            self.history_rollups.save(os.path.join(HISTORY_DIR, ROLLUP_FILE), self._history_until)
+        except OSError as e:
+            print(f"Error al guardar los agregados: {str(e)}")
+        self._rollups_saved_at = time.time()
 
     def start_monitoring(self):
-        self.running = True
-        monitor_thread = threading.Thread(target=self._monitoring_loop)
-        monitor_thread.daemon = True
-        monitor_thread.start()
+        with self._loop_lock:
+            self.running = True
+            # Si el hilo anterior todavía no terminó (stop seguido de start) sigue siendo el único ciclo;
+            # uno que murió se reemplaza
+            if self._thread is not None and self._thread.is_alive():
+                self._wake.set()
+                return
+            self._thread = threading.Thread(target=self._monitoring_loop, daemon=True, name="network-monitor")
+            self._thread.start()
         print(f"Monitor iniciado. Actualizando cada {self.polling_interval} segundos...")
 
     def stop_monitoring(self):
         self.running = False
+        self._wake.set()
         print("Monitor detenido")
 
+    def configure(self, running: bool, **config) -> Dict:
+        """Aplicar la configuración de network-monitor:config y devolver el estado"""
+        self._apply_config(**config)
+        if running and not self.running:
+            self.start_monitoring()
+        elif not running and self.running:
+            self.stop_monitoring()
+        else:
+            self._wake.set()    # el intervalo nuevo rige desde la espera en curso
+        return self.status()
+
+    def _apply_config(self, polling_interval: int, history_limit: int, alert_retention: int = ALERT_RETENTION,
+                      bandwidth_threshold: float = BANDWIDTH_THRESHOLD, error_threshold: int = ERROR_THRESHOLD):
+        self.polling_interval = polling_interval
+        self.history_limit = history_limit
+        self.alert_retention = alert_retention
+        self.bandwidth_threshold = bandwidth_threshold
+        self.error_threshold = error_threshold
+
+    def _keep_running(self) -> bool:
+        # Salir y liberar el hilo de forma atómica respecto de start_monitoring
+        with self._loop_lock:
+            if not self.running:
+                self._thread = None
+            return self.running
+
     def _monitoring_loop(self):
-        while self.running:
+        self._loop_ident = threading.get_ident()
+        try:
+            self.load_history()   # en el hilo del monitor: el servidor responde mientras se lee el disco
+        except Exception as e:
+            self._cycle_failed(e)
+        while self._keep_running():
             start_time = time.time()
-            self.fetch_devices()
-            self.check_for_alerts()
-            self.update_history()
-            if len(self.device_history.get(list(self.device_history.keys())[0], [])) % 5 == 0:
-                self.generate_reports()
-            elapsed = time.time() - start_time
-            time.sleep(max(0, self.polling_interval - elapsed))
+            self._cycle_stages = {}
+            self.profiler.cycle_started()
+            error = None
+            try:
+                with self._stage("cycle"):
+                    self._poll_inventory(cycle=True)
+                    with self._stage("history"):
+                        self.update_history()
+                    if time.time() - self._interfaces_polled_at >= INTERFACE_POLLING_INTERVAL:
+                        with self._stage("interfaces"):
+                            self.update_interface_stats()
+                    self.cycles += 1
+                    with self._stage("publish"):
+                        self._publish()
+                    with self._stage("alert_history"):
+                        self.flush_alert_history()
+                    if self.cycles % 5 == 0:
+                        with self._stage("reports"):
+                            self.generate_reports()
+            except Exception as e:
+                error = self._cycle_failed(e)
+            self.profiler.cycle_finished()
+            self._record_cycle(start_time, error)
+            self._update_gauges()
+            self.events.publish("status", self.status())
+            try:
+                # Hasta el próximo ciclo solo se consultan los dispositivos inestables
+                self.refresh_hot_devices(start_time)
+            except Exception as e:
+                self._cycle_failed(e)
+                # Esperar el resto del intervalo en lugar de reintentar enseguida
+                self._wake.wait(max(0, start_time + self.polling_interval - time.time()))
+                self._wake.clear()
+
+    def _cycle_failed(self, error: Exception) -> str:
+        # Un error del controlador, del parseo o del almacenamiento no debe detener el monitoreo:
+        # se informa (log, /admin/cycles, netmon_cycle_errors_total) y el ciclo siguiente lo reintenta
+        message = f"{type(error).__name__}: {error}"
+        CYCLE_ERRORS.inc()
+        print(f"Error en el ciclo de monitoreo: {message}")
+        return message
+
+    def _publish(self):
+        # Copia superficial de InterfaceStats: update() reemplaza sus arreglos en lugar de modificarlos
+        self.snapshot = MonitorSnapshot(
+            generation=self.generation,
+            cycle=self.cycles,
+            timestamp=time.time(),
+            devices=tuple(self.devices),
+            index=self.index,
+            changes=self.changes,
+            alerts=tuple(self.alerts),
+            resolved_alerts=tuple(self.resolved_alerts()),
+            interfaces=copy.copy(self.interface_stats),
+            history=HistoryView(self.device_history, self._history_until),
+            epoch=self.events.epoch
+        )
+        # p. ej. collector_service.py, que comparte la instantánea con los workers de la API
+        for listener in self.snapshot_listeners:
+            listener(self.snapshot)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Sondeo fuera del ciclo (API): inventario y alertas, luego publicar una instantánea nueva"""
+        if not self._poll_inventory(force=force):
+            return False
+        self._publish()
+        return True
+
+    def _poll_inventory(self, force: bool = False, cycle: bool = False) -> bool:
+        # Single-flight: si ya hay un sondeo en curso (del ciclo o de otra petición) se espera su
+        # resultado en lugar de lanzar otro contra DNA Center
+        with self._flight_lock:
+            flight = self._inventory_flight
+            leader = flight is None
+            if leader:
+                flight = self._inventory_flight = Future()
+        if not leader:
+            return flight.result()
+        try:
+            with self._inventory_lock:
+                ok = self.fetch_devices(force=force)
+                if ok:
+                    self.poller.observe(self.changes, self._devices_by_id, time.time(), cycle=cycle)
+                # Las alertas se evalúan aunque el sondeo falle: las reglas con demora avanzan con el tiempo
+                with self._stage("alerts"):
+                    self.check_for_alerts()
+            flight.set_result(ok)
+            return ok
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._flight_lock:
+                self._inventory_flight = None
+
+    def _in_cycle(self) -> bool:
+        return threading.get_ident() == self._loop_ident
+
+    @contextmanager
+    def _stage(self, name: str):
+        # Histograma por etapa (GET /metrics); un perf_counter y un bisect por etapa y ciclo
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            STAGE_SECONDS.observe(elapsed, stage=name)
+            if self._in_cycle():
+                self._cycle_stages[name] = self._cycle_stages.get(name, 0.0) + elapsed
+
+    def _record_cycle(self, start_time: float, error: Optional[str] = None):
+        duration = self._cycle_stages.get("cycle", 0.0)
+        self.recent_cycles.append({
+            "cycle": self.cycles,
+            "started": datetime.fromtimestamp(start_time).isoformat(),
+            "duration": round(duration, 6),
+            "overrun": duration > self.polling_interval,
+            "devices": len(self.devices),
+            "changes": len(self.changes.changed_ids()) + len(self.changes.removed),
+            "stages": {name: round(value, 6) for name, value in self._cycle_stages.items() if name != "cycle"},
+            "error": error
+        })
+
+    def _update_gauges(self):
+        CYCLES.inc()
+        DEVICES.set(len(self.devices))
+        severities = {"critical": 0, "warning": 0, "info": 0}
+        for alert in self.alerts:
+            severities[alert.severity] = severities.get(alert.severity, 0) + 1
+        for severity, count in severities.items():
+            OPEN_ALERTS.set(count, severity=severity)
+        HISTORY_POINTS.set(self.device_history.point_count())
+        INTERFACES.set(len(self.interface_stats))
+
+    def refresh_hot_devices(self, cycle_started: float):
+        # El fin de la espera se recalcula en cada vuelta: un cambio de polling_interval la reprograma.
+        # Los controladores con un intervalo propio más corto se sondean en cuanto vencen, sin esperar al ciclo
+        while self.running:
+            now = time.time()
+            until = cycle_started + self.polling_interval
+            if now >= until:
+                return
+            controllers_due = self.scheduler.next_due()
+            if controllers_due is not None and controllers_due <= now:
+                self.refresh()
+                now = time.time()
+                controllers_due = self.scheduler.next_due()
+            due = self.poller.due(now)
+            if due:
+                results = self.scheduler.fetch_devices(due)
+                now = time.time()
+                for device_id in due:
+                    self.poller.record(device_id, results.get(device_id) is not None, now)
+                if any(results.values()):
+                    devices = self.scheduler.merged()
+                    if devices is not None:
+                        with self._inventory_lock:
+                            self._apply_hot_devices(devices, now)
+                        self._publish()
+            wake_at = until if controllers_due is None else min(until, controllers_due)
+            self._wake.wait(max(0, min(FAST_INTERVAL, wake_at - time.time())))
+            self._wake.clear()
+
+    def _apply_hot_devices(self, devices: List[Dict], now: float):
+        self._parse_devices({"response": devices})
+        self.poller.observe(self.changes, self._devices_by_id, now)
+        self.check_for_alerts()
 
     def check_for_alerts(self):
-        new_alerts = []
-        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        for device in self.devices:
-            # Verificar estado de alcanzabilidad
-            if device.reachabilityStatus.lower() != "reachable":
-                new_alerts.append(Alert(
-                    type="DEVICE_UNREACHABLE",
-                    message=f"El dispositivo {device.hostname} ({device.managementIpAddress}) no es alcanzable",
-                    severity="critical",
-                    timestamp=current_time,
-                    device_id=device.id
-                ))
-            
-            # Verificar si el dispositivo está soportado
-            if device.deviceSupportLevel.lower() != "supported":
-                new_alerts.append(Alert(
-                    type="UNSUPPORTED_DEVICE",
-                    message=f"El dispositivo {device.hostname} no está soportado (Estado: {device.deviceSupportLevel})",
-                    severity="warning",
-                    timestamp=current_time,
-                    device_id=device.id
-                ))
-            
-            # Verificar estado de colección
-            if device.collectionStatus.lower() != "managed":
-                new_alerts.append(Alert(
-                    type="COLLECTION_ISSUE",
-                    message=f"Problema con la colección de datos del dispositivo {device.hostname} (Estado: {device.collectionStatus})",
-                    severity="warning",
-                    timestamp=current_time,
-                    device_id=device.id
-                ))
-            
-            # Verificar tiempo de actividad (uptime) muy bajo (posible reinicio reciente)
-            if ":" in device.upTime:
-                try:
-                    hours, minutes, seconds = map(float, device.upTime.split(":"))
-                    total_seconds = hours * 3600 + minutes * 60 + seconds
-                    if total_seconds < 300:  # Menos de 5 minutos de uptime
-                        new_alerts.append(Alert(
-                            type="RECENT_REBOOT",
-                            message=f"El dispositivo {device.hostname} se reinició recientemente (Uptime: {device.upTime})",
-                            severity="warning",
-                            timestamp=current_time,
-                            device_id=device.id
-                        ))
-                except ValueError:
-                    pass
-        
-        self.alerts = new_alerts
+        # Solo se evalúan los dispositivos del último ChangeSet; las alertas abiertas conservan su timestamp
+        self.alert_engine.retention = self.alert_retention * 3600
+        self.alert_events = self.alert_engine.evaluate(self.changes, self._devices_by_id)
+        self._publish_alert_events(self.alert_events)
+
+    def _publish_alert_events(self, alert_events):
+        if alert_events:
+            self.alert_history.add(alert_events)
+            self.alerts = self.alert_engine.open_alerts() + self.interface_alert_engine.open_alerts()
+            self.generation += 1
+            for event, alert in alert_events:
+                self.events.publish("alert", {"event": event, "alert": asdict(alert)})
+
+    def flush_alert_history(self):
+        # Eventos de alertas del ciclo (incluidos refrescos y sondeos rápidos) en una sola transacción
+        self.alert_history.flush(self.alert_retention * 3600)
+
+    def resolved_alerts(self) -> List[Alert]:
+        return self.alert_engine.resolved_alerts() + self.interface_alert_engine.resolved_alerts()
+
+    def update_interface_stats(self) -> bool:
+        # Contadores de interfaces: deltas, tasas y utilización en una pasada sobre todas las interfaces
+        now = time.time()
+        self._interfaces_polled_at = now
+        rows = self.scheduler.collect_interfaces(deadline=now + self.polling_interval * 0.8)
+        if rows is None:
+            print("Error al obtener interfaces: ningún controlador respondió")
+            return False
+        with self._inventory_lock:
+            self._apply_interfaces(rows, now)
+        return True
+
+    def _apply_interfaces(self, rows: List[Dict], now: float):
+        bandwidth_changed, errors_changed, removed = self.interface_stats.update(
+            rows, self._devices_by_id, now, self.bandwidth_threshold, self.error_threshold
+        )
+        changes = ChangeSet(removed=removed)
+        for interface_id in bandwidth_changed:
+            changes.modified.setdefault(interface_id, []).append("over_bandwidth")
+        for interface_id in errors_changed:
+            changes.modified.setdefault(interface_id, []).append("over_errors")
+        self.interface_alert_engine.retention = self.alert_retention * 3600
+        self._publish_alert_events(self.interface_alert_engine.evaluate(changes, self.interface_stats, now))
+
+    def status(self) -> Dict:
+        return {
+            "polling_interval": self.polling_interval,
+            "history_limit": self.history_limit,
+            "running": self.running,
+            "alert_retention": self.alert_retention,
+            "cycle": self.cycles,
+            "generation": self.generation,
+            "bandwidth_threshold": self.bandwidth_threshold,
+            "error_threshold": self.error_threshold,
+            "interface_count": len(self.interface_stats),
+            "sweep_interval": self.poller.sweep_interval(self.polling_interval),
+            **self.poller.status()
+        }
+
+    def render_metrics(self) -> str:
+        return REGISTRY.render()
 
     def update_history(self):
-        timestamp = datetime.now().isoformat()
+        timestamp = time.time()
+        # Limitar el historial según HISTORY_LIMIT (puede cambiar vía network-monitor:config)
+        self.device_history.set_capacity(self.history_limit)
+        rows = []
         for device in self.devices:
-            self.device_history[device.id].append({
-                "timestamp": timestamp,
-                "reachability": device.reachabilityStatus,
-                "uptime": device.upTime,
-                "interface_count": device.interfaceCount,
-                "software_version": device.softwareVersion
-            })
-            
-            # Limitar el historial según HISTORY_LIMIT
-            if len(self.device_history[device.id]) > self.history_limit:
-                self.device_history[device.id].pop(0)
+            uptime = device.uptime_seconds
+            row = (device.id, device.reachabilityStatus, -1 if uptime is None else uptime,
+                   device.interfaceCount, device.softwareVersion)
+            self.device_history.append_parsed(row[0], timestamp, *row[1:])
+            self.history_rollups.append_parsed(row[0], timestamp, *row[1:])
+            rows.append(row)
+        # Con rotación del inventario, los dispositivos retirados no deben acumularse en memoria
+        # (su historial sigue en los segmentos en disco)
+        if len(self.device_history) > len(rows) or len(self.history_rollups) > len(rows):
+            device_ids = {row[0] for row in rows}
+            self.device_history.retain(device_ids)
+            self.history_rollups.retain(device_ids)
+        try:
+            self.history_segments.append_batch(timestamp, rows)
+            self.history_segments.expire()
+        except OSError as e:
+            print(f"Error al guardar historial en disco: {str(e)}")
+        self._history_until = timestamp
+        if timestamp - self._rollups_saved_at >= ROLLUP_SAVE_INTERVAL:
+            self.save_rollups()
 
     def generate_reports(self):
+        # La escritura de archivos y el gráfico se hacen en el ReportWorker para no atrasar el ciclo
         print("Generando reportes...")
-        self.generate_devices_table()
-        self.generate_reachability_report()
-        self.generate_alerts_report()
+        inventory_changed = self._inventory_dirty
+        self._inventory_dirty = False
+        self.report_worker.submit(ReportSnapshot(
+            devices_table=tuple(self._devices_table()) if inventory_changed else None,
+            reachability=self._reachability_series(),
+            alerts=tuple(self._alerts_data())
+        ))
+
+    def _devices_table(self) -> List[Dict]:
+        return [{
+            "hostname": device.hostname,
+            "management_ip": device.managementIpAddress,
+            "platform": device.platformId,
+            "software_version": device.softwareVersion,
+            "reachability": device.reachabilityStatus,
+            "uptime": device.upTime,
+            "interfaces": device.interfaceCount,
+            "serial_number": device.serialNumber,
+            "last_updated": device.lastUpdated,
+            "device_id": device.id
+        } for device in self.devices]
+
+    def _reachability_series(self):
+        # Series ya reducidas: el gráfico no necesita cada punto de cada dispositivo
+        series = []
+        for device_id, _ in self.device_history.items():
+            device = self.index.get("id", device_id)
+            if device:
+                timestamps, reachability = self.device_history.reachable_series(device_id)
+                series.append((device.hostname, *downsample_minmax(timestamps, reachability)))
+        return tuple(series)
+
+    def _alerts_data(self) -> List[Dict]:
+        return [{
+            "timestamp": alert.timestamp,
+            "severity": alert.severity,
+            "message": alert.message,
+            "device_id": alert.device_id or "N/A"
+        } for alert in self.alerts]
 
     def generate_devices_table(self) -> List[Dict]:
-        devices_table = []
-        for device in self.devices:
-            devices_table.append({
-                "hostname": device.hostname,
-                "management_ip": device.managementIpAddress,
-                "platform": device.platformId,
-                "software_version": device.softwareVersion,
-                "reachability": device.reachabilityStatus,
-                "uptime": device.upTime,
-                "interfaces": device.interfaceCount,
-                "serial_number": device.serialNumber,
-                "last_updated": device.lastUpdated,
-                "device_id": device.id
-            })
-        
-        with open("devices_table.json", "w") as f:
-            json.dump(devices_table, f, indent=2)
+        devices_table = self._devices_table()
+        write_json_atomic(DEVICES_TABLE, devices_table)
         return devices_table
 
     def generate_reachability_report(self):
-        if not self.device_history:
+        series = self._reachability_series()
+        if not series:
             print("No hay datos históricos de alcanzabilidad")
             return
-        
-        plt.figure(figsize=(12, 6))
-        
-        # Preparar datos para el gráfico
-        device_status = {}
-        for device_id, history in self.device_history.items():
-            device = next((d for d in self.devices if d.id == device_id), None)
-            if device:
-                timestamps = [entry["timestamp"] for entry in history]
-                reachability = [1 if entry["reachability"].lower() == "reachable" else 0 for entry in history]
-                device_status[device.hostname] = (timestamps, reachability)
-        
-        # Crear gráfico para cada dispositivo
-        for hostname, (timestamps, reachability) in device_status.items():
-            plt.plot(timestamps, reachability, label=hostname)
-        
-        plt.title("Estado de Alcanzabilidad de Dispositivos (Histórico)")
-        plt.ylabel("Alcanzable (1) / No Alcanzable (0)")
-        plt.xlabel("Tiempo")
-        plt.xticks(rotation=45)
-        plt.legend()
-        plt.tight_layout()
-        plt.savefig("reachability_history.png")
-        plt.close()
-        print("Reporte de alcanzabilidad generado: reachability_history.png")
+        render_reachability_chart(series)
+        print(f"Reporte de alcanzabilidad generado: {REACHABILITY_CHART}")
 
     def generate_alerts_report(self):
-        if not self.alerts:
+        alerts_data = self._alerts_data()
+        if not alerts_data:
             print("No hay alertas para reportar")
             return
-        
-        alerts_data = [{
-            "timestamp": alert.timestamp,
-            "severity": alert.severity,
-            "message": alert.message,
-            "device_id": alert.device_id or "N/A"
-        } for alert in self.alerts]
-        
-        with open("alerts_report.json", "w") as f:
-            json.dump(alerts_data, f, indent=2)
-        print("Reporte de alertas generado: alerts_report.json")
+        write_json_atomic(ALERTS_REPORT, alerts_data)
+        print(f"Reporte de alertas generado: {ALERTS_REPORT}")
 
-    def fetch_devices(self) -> bool:
-        try:
-            response = requests.get(BASE_URL, headers=HEADERS, verify=False)
-            if response.status_code == 200:
-                data = response.json()
-                self._parse_devices(data)
-                return True
-            print(f"Error al obtener dispositivos: {response.status_code}")
-            return False
-        except Exception as e:
-            print(f"Error en fetch_devices: {str(e)}")
+    def fetch_devices(self, force: bool = False) -> bool:
+        # Los controladores que no respondan antes del fin del intervalo no deben atrasar el ciclo;
+        # conservan su último inventario y su resultado se aplica en un ciclo posterior
+        deadline = time.time() + self.polling_interval * 0.8
+        # El barrido completo se espacia mientras el inventario está estable
+        sweep_interval = self.poller.sweep_interval(self.polling_interval)
+        with self._stage("fetch"):
+            devices = self.scheduler.collect(sweep_interval, deadline=deadline, force=force)
+        if devices is None:
+            print("Error al obtener dispositivos: ningún controlador respondió")
             return False
+        with self._stage("parse"):
+            self._parse_devices({"response": devices})
+        return True
 
     def _parse_devices(self, data: Dict):
+        # Solo se vuelven a construir los dispositivos cuyo contenido cambió desde el sondeo anterior
         try:
-            self.devices = []
+            previous = self._devices_by_id
+            previous_hashes = self._device_hashes
+            devices: List[DeviceInfo] = []
+            devices_by_id: Dict[str, DeviceInfo] = {}
+            hashes: Dict[str, int] = {}
+            changes = ChangeSet()
             for device_data in data.get("response", []):
-                device_info = DeviceInfo(
-                    hostname=device_data.get("hostname", ""),
-                    managementIpAddress=device_data.get("managementIpAddress", ""),
-                    macAddress=device_data.get("macAddress", ""),
-                    softwareVersion=device_data.get("softwareVersion", ""),
-                    reachabilityStatus=device_data.get("reachabilityStatus", ""),
-                    upTime=device_data.get("upTime", ""),
-                    serialNumber=device_data.get("serialNumber", ""),
-                    platformId=device_data.get("platformId", ""),
-                    interfaceCount=str(device_data.get("interfaceCount", "0")),
-                    lastUpdated=device_data.get("lastUpdated", ""),
-                    id=device_data.get("id", ""),
-                    description=device_data.get("description", ""),
-                    role=device_data.get("role", ""),
-                    vendor=device_data.get("vendor", "Cisco"),
-                    type=device_data.get("type", ""),
-                    family=device_data.get("family", ""),
-                    series=device_data.get("series", ""),
-                    softwareType=device_data.get("softwareType", ""),
-                    deviceSupportLevel=device_data.get("deviceSupportLevel", ""),
-                    collectionStatus=device_data.get("collectionStatus", ""),
-                    bootDateTime=device_data.get("bootDateTime", "")
-                )
-                self.devices.append(device_info)
+                values = tuple(device_data.get(name, default) for name, default in DEVICE_FIELDS)
+                device_id = device_data.get("id", "")
+                digest = hash(values)
+                device_info = previous.get(device_id)
+                if device_info is None or previous_hashes.get(device_id) != digest:
+                    old = device_info
+                    device_info = DeviceInfo.from_values(values, previous=old)
+                    if old is None:
+                        changes.added.append(device_id)
+                    else:
+                        modified = [name for name, _ in DEVICE_FIELDS
+                                    if getattr(old, name) != getattr(device_info, name)]
+                        if modified:
+                            changes.modified[device_id] = modified
+                devices.append(device_info)
+                devices_by_id[device_id] = device_info
+                hashes[device_id] = digest
+            changes.removed = [device_id for device_id in previous if device_id not in devices_by_id]
+            if changes:
+                self.index = DeviceIndex(devices)
+            self.devices = devices
+            self._devices_by_id = devices_by_id
+            self._device_hashes = hashes
+            self.changes = changes
+            if changes:
+                self._inventory_dirty = True
+                self.generation += 1
+                self.events.publish("devices", {
+                    "added": [devices_by_id[device_id].to_dict() for device_id in changes.added],
+                    "removed": changes.removed,
+                    "modified": {
+                        device_id: {name: getattr(devices_by_id[device_id], name) for name in names}
+                        for device_id, names in changes.modified.items()
+                    }
+                })
         except Exception as e:
             print(f"Error parsing devices: {str(e)}")
             raise
@@ -0,0 +1,218 @@
+import io
+import sys
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+
+SAMPLE_INTERVAL = 0.01       # segundos entre muestras del perfilador por muestreo
+TOP_ENTRIES = 40             # funciones en el resumen
+TRACEMALLOC_FRAMES = 10      # profundidad de pila guardada por asignación
+
+class CycleProfiler:
+    """
+    Perfilado bajo demanda de los próximos N ciclos del monitor.
+    start() solo lo arma: el hilo de monitoreo lo activa al comenzar el
+    siguiente ciclo (cProfile perfila únicamente el hilo que lo habilita) y lo
+    detiene al terminar el ciclo N o cuando se pidió stop(). El modo "sampling"
+    muestrea las pilas de todos los hilos (incluidos los de descarga) con
+    sys._current_frames(), con un costo independiente de la cantidad de llamadas.
+    """
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.cycles = 0
+        self.remaining = 0
+        self.state = "idle"              # idle | armed | running | done
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.result: Optional[Dict] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._samples: Counter = Counter()
+        self._sample_count = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, cycles: int, mode: str = "cprofile"):
+        if mode not in ("cprofile", "sampling"):
+            raise ValueError("mode debe ser cprofile o sampling")
+        with self._lock:
+            if self.state in ("armed", "running"):
+                raise RuntimeError("ya hay un perfilado en curso")
+            self.mode = mode
+            self.cycles = self.remaining = max(1, cycles)
+            self.state = "armed"
+            self.result = None
+            self.started_at = self.finished_at = None
+            self._stop.clear()
+
+    def stop(self):
+        """Pedir que termine al final del ciclo actual"""
+        with self._lock:
+            if self.state == "armed":
+                self.state = "idle"
+            elif self.state == "running":
+                self.remaining = 0
+                self._stop.set()
+
+    # Llamados desde el hilo de monitoreo
+    def cycle_started(self):
+        if self.state != "armed":
+            return
+        with self._lock:
+            self.state = "running"
+            self.started_at = datetime.now().isoformat()
+            if self.mode == "cprofile":
+                self._profile = cProfile.Profile()
+                self._profile.enable()
+            else:
+                self._samples = Counter()
+                self._sample_count = 0
+                self._sampler = threading.Thread(target=self._sample_loop, daemon=True, name="profiler-sampler")
+                self._sampler.start()
+
+    def cycle_finished(self):
+        if self.state != "running":
+            return
+        with self._lock:
+            self.remaining -= 1
+            if self.remaining > 0:
+                return
+            if self._profile is not None:
+                self._profile.disable()
+                self.result = self._cprofile_summary(self._profile)
+                self._profile = None
+            if self._sampler is not None:
+                self._stop.set()
+                self._sampler.join()
+                self._sampler = None
+                self.result = self._sampling_summary()
+            self.state = "done"
+            self.finished_at = datetime.now().isoformat()
+
+    def _cprofile_summary(self, profile: cProfile.Profile) -> Dict:
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats("cumulative").print_stats(TOP_ENTRIES)
+        functions = []
+        for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+            functions.append({
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "total_seconds": round(total, 6),
+                "cumulative_seconds": round(cumulative, 6)
+            })
+        functions.sort(key=lambda f: f["cumulative_seconds"], reverse=True)
+        return {"functions": functions[:TOP_ENTRIES], "text": stream.getvalue()}
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        names = {}
+        # Primero se muestrea y después se espera: un ciclo más corto que el intervalo tiene al menos una muestra
+        while True:
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._samples[";".join(reversed(stack))] += 1
+            self._sample_count += 1
+            if self._stop.wait(SAMPLE_INTERVAL):
+                break
+
+    def _sampling_summary(self) -> Dict:
+        own, cumulative = Counter(), Counter()
+        for stack, count in self._samples.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames[1:]):
+                cumulative[frame] += count
+        # Fracción sobre las pilas muestreadas (una por hilo y muestra)
+        total = max(1, sum(self._samples.values()))
+        return {
+            "samples": self._sample_count,
+            "interval_seconds": SAMPLE_INTERVAL,
+            "self": [{"function": f, "fraction": round(c / total, 4)} for f, c in own.most_common(TOP_ENTRIES)],
+            "cumulative": [{"function": f, "fraction": round(c / total, 4)}
+                           for f, c in cumulative.most_common(TOP_ENTRIES)],
+            # Formato "collapsed stacks" (flamegraph.pl / speedscope)
+            "collapsed": [f"{stack} {count}" for stack, count in self._samples.most_common()]
+        }
+
+    def status(self) -> Dict:
+        return {
+            "state": self.state,
+            "mode": self.mode,
+            "cycles": self.cycles,
+            "remaining": self.remaining,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result
+        }
+
+class MemorySampler:
+    """
+    Instantáneas de tracemalloc sobre el proceso en ejecución.
+    Solo se registran las asignaciones hechas después de start(); cada
+    instantánea se compara con la anterior para ver qué creció (por ejemplo
+    device_history en history_store.py).
+    """
+    def __init__(self):
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def running(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = TRACEMALLOC_FRAMES):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._previous = None
+
+    def stop(self):
+        tracemalloc.stop()
+        self._previous = None
+
+    def snapshot(self, limit: int = 20, group_by: str = "lineno") -> Dict:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc no está activo")
+        if group_by not in ("lineno", "filename", "traceback"):
+            raise ValueError("group_by debe ser lineno, filename o traceback")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        top = [self._stat(stat) for stat in snapshot.statistics(group_by)[:limit]]
+        growth = None
+        if self._previous is not None:
+            growth = [self._stat(stat, diff=True) for stat in snapshot.compare_to(self._previous, group_by)[:limit]]
+        self._previous = snapshot
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "top": top,
+            "growth": growth
+        }
+
+    @staticmethod
+    def _stat(stat, diff: bool = False) -> Dict:
+        entry = {
+            "location": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+            "size_bytes": stat.size,
+            "count": stat.count
+        }
+        if diff:
+            entry["size_diff_bytes"] = stat.size_diff
+            entry["count_diff"] = stat.count_diff
+        return entry
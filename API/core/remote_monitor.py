@@ -0,0 +1,171 @@
+"""
+Monitor de solo lectura para los workers de la API cuando la recolección corre
+en un proceso aparte (collector_service.py). Expone lo que usa api_restconf.py
+de NetworkMonitor: las lecturas salen de la instantánea compartida y el resto
+se envía al colector por el socket de control.
+"""
+from dataclasses import replace
+from typing import Dict, List, Optional
+from network_monitor import (MonitorSnapshot, ChangeSet, POLLING_INTERVAL, HISTORY_LIMIT, ALERT_RETENTION)
+from device_index import DeviceIndex
+from interface_stats import InterfaceStats, BANDWIDTH_THRESHOLD, ERROR_THRESHOLD
+from history_rollup import ROLLUP_TIERS
+from alert_store import QUERY_LIMIT
+from event_stream import EventBus
+from metrics import HTTP_REQUEST_SECONDS
+from snapshot_channel import SnapshotReader, ControlClient, SharedState
+
+class RemoteHistory:
+    """Historial en memoria del colector hasta el último ciclo publicado (como HistoryView)"""
+    def __init__(self, control: ControlClient, until: Optional[float]):
+        self.control = control
+        self.until = until
+
+    def __contains__(self, device_id: str) -> bool:
+        return self.control.call("history.contains", device_id)
+
+    def points(self, device_id: str) -> List[Dict]:
+        return self.control.call("history.points", device_id, self.until)
+
+class RemoteRollups:
+    tiers = ROLLUP_TIERS
+
+    def __init__(self, control: ControlClient):
+        self.control = control
+
+    def query(self, device_id: str, start: float, end: float, step: int) -> Optional[List[Dict]]:
+        return self.control.call("rollups.query", device_id, start, end, step)
+
+class RemoteSegments:
+    def __init__(self, control: ControlClient):
+        self.control = control
+
+    def points(self, device_id: str, start: float, end: float) -> List[Dict]:
+        return self.control.call("segments.points", device_id, start, end)
+
+    def points_by_device(self, device_ids: List[str], start: float, end: float) -> Dict[str, List[Dict]]:
+        return self.control.call("segments.points_by_device", device_ids, start, end)
+
+class RemoteAlertHistory:
+    def __init__(self, control: ControlClient):
+        self.control = control
+
+    def query(self, device_id: Optional[str] = None, type: Optional[str] = None,
+              severity: Optional[str] = None, status: str = "all", start: Optional[float] = None,
+              end: Optional[float] = None, limit: int = QUERY_LIMIT, cursor: Optional[int] = None) -> Dict:
+        return self.control.call("alerts.query", device_id, type, severity, status, start, end, limit, cursor)
+
+class RemoteProfiler:
+    def __init__(self, control: ControlClient):
+        self.control = control
+
+    def start(self, cycles: int, mode: str = "cprofile"):
+        self.control.call("profiler.start", cycles, mode)
+
+    def stop(self):
+        self.control.call("profiler.stop")
+
+    def status(self) -> Dict:
+        return self.control.call("profiler.status")
+
+class RemoteMemory:
+    def __init__(self, control: ControlClient):
+        self.control = control
+
+    @property
+    def running(self) -> bool:
+        return self.control.call("memory.running")
+
+    def start(self, frames: int):
+        self.control.call("memory.start", frames)
+
+    def stop(self):
+        self.control.call("memory.stop")
+
+    def snapshot(self, limit: int = 20, group_by: str = "lineno") -> Dict:
+        return self.control.call("memory.snapshot", limit, group_by)
+
+class RemoteScheduler:
+    def __init__(self, monitor: "RemoteMonitor"):
+        self.monitor = monitor
+
+    def status(self) -> List[Dict]:
+        state = self.monitor.state()
+        return state.controllers if state else []
+
+class RemoteMonitor:
+    def __init__(self, snapshot_path: Optional[str] = None, control_path: Optional[str] = None):
+        self.reader = SnapshotReader(snapshot_path)
+        self.control = ControlClient(control_path)
+        self.history_rollups = RemoteRollups(self.control)
+        self.history_segments = RemoteSegments(self.control)
+        self.alert_history = RemoteAlertHistory(self.control)
+        self.profiler = RemoteProfiler(self.control)
+        self.memory = RemoteMemory(self.control)
+        self.scheduler = RemoteScheduler(self)
+        self._state: Optional[SharedState] = None
+        self._snapshot = MonitorSnapshot(
+            generation=0, cycle=0, timestamp=0.0, devices=(), index=DeviceIndex([]), changes=ChangeSet(),
+            alerts=(), resolved_alerts=(), interfaces=InterfaceStats(), history=RemoteHistory(self.control, None)
+        )
+        self._events = EventBus()
+
+    def state(self) -> Optional[SharedState]:
+        state = self.reader.current()
+        if state is not None and state is not self._state:
+            # Una vez por publicación: el historial se consulta al colector y los eventos se reconstruyen
+            self._snapshot = replace(state.snapshot, history=RemoteHistory(self.control, state.history_until))
+            self._events = EventBus.restore(state.events, state.last_event_seq, state.event_epoch)
+            self._state = state
+        return state
+
+    # El ciclo de sondeo es del colector
+    def start_monitoring(self):
+        print("Usando el colector externo (collector_service.py)")
+
+    def stop_monitoring(self):
+        pass
+
+    @property
+    def snapshot(self) -> MonitorSnapshot:
+        self.state()
+        return self._snapshot
+
+    @property
+    def events(self) -> EventBus:
+        self.state()
+        return self._events
+
+    @property
+    def recent_cycles(self) -> List[Dict]:
+        state = self.state()
+        return list(state.cycles) if state else []
+
+    @property
+    def polling_interval(self) -> int:
+        return self.status()["polling_interval"]
+
+    def status(self) -> Dict:
+        state = self.state()
+        if state is not None:
+            return state.status
+        return {
+            "polling_interval": POLLING_INTERVAL,
+            "history_limit": HISTORY_LIMIT,
+            "running": False,
+            "alert_retention": ALERT_RETENTION,
+            "bandwidth_threshold": BANDWIDTH_THRESHOLD,
+            "error_threshold": ERROR_THRESHOLD
+        }
+
+    def refresh(self, force: bool = False) -> bool:
+        return self.control.call("refresh", force)
+
+    def configure(self, **config) -> Dict:
+        return self.control.call("configure", config)
+
+    def render_metrics(self) -> str:
+        """Métricas del colector más la latencia HTTP de este worker"""
+        state = self.state()
+        http = "\n".join(HTTP_REQUEST_SECONDS.render()) + "\n"
+        return http + (state.metrics if state else "")
@@ -0,0 +1,135 @@
+import os
+import json
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+from metrics import STAGE_SECONDS
+
+DEVICES_TABLE = "devices_table.json"
+REACHABILITY_CHART = "reachability_history.png"
+ALERTS_REPORT = "alerts_report.json"
+MAX_PLOT_POINTS = 500     # puntos por serie después de reducir
+RENDER_TIMEOUT = 120      # segundos
+
+@dataclass(frozen=True)
+class ReportSnapshot:
+    """Datos inmutables de un ciclo para generar reportes fuera del hilo de monitoreo"""
+    devices_table: Optional[Tuple[dict, ...]]             # None si el inventario no cambió
+    reachability: Tuple[Tuple[str, Tuple[float, ...], Tuple[int, ...]], ...]
+    alerts: Tuple[dict, ...]
+
+def write_json_atomic(path: str, data):
+    """Escribir en un temporal y renombrar, así nunca se lee un archivo a medias"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def downsample_minmax(timestamps: Sequence[float], values: Sequence[int], max_points: int = MAX_PLOT_POINTS):
+    """
+    Reducir una serie a lo sumo `max_points` puntos conservando el mínimo y el
+    máximo de cada intervalo, para que una caída breve siga visible en el gráfico.
+    """
+    count = len(timestamps)
+    if count <= max_points:
+        return tuple(timestamps), tuple(values)
+    buckets = max_points // 2
+    out_t, out_v = [], []
+    for b in range(buckets):
+        lo = b * count // buckets
+        hi = (b + 1) * count // buckets
+        low = min(range(lo, hi), key=values.__getitem__)
+        high = max(range(lo, hi), key=values.__getitem__)
+        for i in sorted({low, high}):
+            out_t.append(timestamps[i])
+            out_v.append(values[i])
+    return tuple(out_t), tuple(out_v)
+
+def render_reachability_chart(series, path: str = REACHABILITY_CHART):
+    """Dibujar el gráfico de alcanzabilidad (se ejecuta en un proceso aparte)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+    # Crear gráfico para cada dispositivo
+    for hostname, timestamps, reachability in series:
+        plt.plot([datetime.fromtimestamp(ts) for ts in timestamps], reachability, label=hostname)
+
+    plt.title("Estado de Alcanzabilidad de Dispositivos (Histórico)")
+    plt.ylabel("Alcanzable (1) / No Alcanzable (0)")
+    plt.xlabel("Tiempo")
+    plt.xticks(rotation=45)
+    plt.legend()
+    plt.tight_layout()
+    tmp_path = f"{path}.tmp"
+    plt.savefig(tmp_path, format="png")
+    plt.close()
+    os.replace(tmp_path, path)
+    return path
+
+class ReportWorker:
+    """
+    Genera reportes en un hilo propio a partir de ReportSnapshot.
+    Si llega una instantánea nueva antes de terminar la anterior, la pendiente
+    se descarta: solo interesa el estado más reciente (salvo su tabla de
+    dispositivos, que la nueva hereda si no trae una propia). El gráfico se dibuja en
+    un proceso aparte para que matplotlib no compita con el monitor por el GIL.
+    """
+    def __init__(self):
+        self._queue: "queue.Queue[ReportSnapshot]" = queue.Queue(maxsize=1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, snapshot: ReportSnapshot):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="report-worker")
+            self._thread.start()
+        try:
+            pending = self._queue.get_nowait()
+        except queue.Empty:
+            pending = None
+        # generate_reports ya marcó el inventario como escrito: su tabla no puede perderse
+        if pending is not None and snapshot.devices_table is None and pending.devices_table is not None:
+            snapshot = replace(snapshot, devices_table=pending.devices_table)
+        self._queue.put_nowait(snapshot)
+
+    def _run(self):
+        while True:
+            snapshot = self._queue.get()
+            if snapshot is None:
+                return
+            try:
+                with STAGE_SECONDS.time(stage="report_write"):
+                    self.write(snapshot)
+            except Exception as e:
+                print(f"Error generando reportes: {str(e)}")
+
+    def write(self, snapshot: ReportSnapshot):
+        if snapshot.devices_table is not None:
+            write_json_atomic(DEVICES_TABLE, list(snapshot.devices_table))
+
+        if snapshot.reachability:
+            if self._pool is None:
+                # spawn: no se hereda el estado de los hilos del monitor
+                self._pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+            self._pool.submit(render_reachability_chart, snapshot.reachability).result(timeout=RENDER_TIMEOUT)
+            print(f"Reporte de alcanzabilidad generado: {REACHABILITY_CHART}")
+        else:
+            print("No hay datos históricos de alcanzabilidad")
+
+        if snapshot.alerts:
+            write_json_atomic(ALERTS_REPORT, list(snapshot.alerts))
+            print(f"Reporte de alertas generado: {ALERTS_REPORT}")
+        else:
+            print("No hay alertas para reportar")
+
+    def close(self):
+        if self._thread is not None:
+            self.submit(None)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
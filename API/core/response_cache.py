@@ -0,0 +1,84 @@
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from fastapi import Request, Response
+
+def json_bytes(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+GZIP_MIN_SIZE = 1024     # bytes; los cuerpos pequeños no compensan la compresión
+MAX_ENTRIES = 256
+
+class CachedBody:
+    """Cuerpo ya serializado para una generación, con su ETag y versión gzip"""
+    __slots__ = ("epoch", "generation", "body", "etag", "gzip_etag", "_gzipped")
+
+    def __init__(self, generation: int, body: bytes, epoch: str = ""):
+        self.epoch = epoch
+        self.generation = generation
+        self.body = body
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.etag = f'"{epoch}-{digest}"' if epoch else f'"{digest}"'
+        # ETag fuerte distinto para la versión gzip: son representaciones diferentes
+        self.gzip_etag = f'{self.etag[:-1]}-gz"'
+        self._gzipped: Optional[bytes] = None
+
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+class ResponseCache:
+    """
+    Caché de respuestas serializadas por generación de la instantánea.
+    Mientras el colector no publique una generación nueva, cada GET reutiliza
+    los mismos bytes (sin pydantic ni json.dumps) y responde 304 si el cliente
+    envía el ETag vigente en If-None-Match. La generación vuelve a 0 cuando el
+    colector se reinicia, así que la entrada y el ETag llevan también su época.
+    """
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, generation: int, build: Callable[[], Any],
+            serialize: Callable[[Any], bytes] = json_bytes, epoch: str = "") -> CachedBody:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.generation == generation and entry.epoch == epoch:
+                self._entries.move_to_end(key)
+                return entry
+        # Se serializa fuera del lock; si dos peticiones coinciden, ambas producen el mismo cuerpo
+        body = serialize(build())
+        entry = CachedBody(generation, body, epoch)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def response(self, request: Request, key: Hashable, generation: int,
+                 build: Callable[[], Any], media_type: str = "application/json",
+                 serialize: Callable[[Any], bytes] = json_bytes, epoch: str = "") -> Response:
+        """`key` debe distinguir cada representación (p. ej. el formato pedido en Accept)"""
+        entry = self.get(key, generation, build, serialize, epoch)
+        gzipped = len(entry.body) >= GZIP_MIN_SIZE and "gzip" in request.headers.get("accept-encoding", "")
+        etag = entry.gzip_etag if gzipped else entry.etag
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept, Accept-Encoding"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=entry.gzipped(), media_type=media_type, headers=headers)
+        return Response(content=entry.body, media_type=media_type, headers=headers)
@@ -0,0 +1,212 @@
+import os
+import json
+import mmap
+import bisect
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Iterator, Optional, Tuple
+from history_store import StringTable, history_point
+
+# Registro fijo: timestamp, uptime, índice de dispositivo, interfaces, versión, alcanzabilidad
+RECORD = struct.Struct("<dqIIHBx")
+INDEX_FILE = "index.json"
+SEGMENT_SUFFIX = ".seg"
+BULK_SCAN_RATIO = 8    # una consulta de más de 1/8 de los dispositivos recorre cada ciclo completo
+
+class SegmentStore:
+    """
+    Historial persistente en disco, solo de agregado.
+    Cada día UTC es un segmento con registros de tamaño fijo ordenados por tiempo;
+    `index.json` guarda las tablas de textos (ids, alcanzabilidad, versiones).
+    Las lecturas por rango mapean el segmento en memoria y buscan por bisección.
+
+    Dentro de cada ciclo (registros con el mismo timestamp) los registros se
+    ordenan por código de dispositivo, y por segmento se guarda en memoria dónde
+    empieza cada ciclo: el historial de un dispositivo es una bisección por
+    ciclo, no un recorrido de todos los dispositivos de la ventana.
+    """
+    def __init__(self, directory: str, retention_days: int = 28):
+        self.directory = directory
+        self.retention_days = retention_days
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        index = self._load_index()
+        self.device_table = StringTable(index.get("devices", []))
+        self.reachability_table = StringTable(index.get("reachability", []))
+        self.version_table = StringTable(index.get("versions", []))
+        # Segmentos anteriores a sorted_since se escribieron sin ordenar por dispositivo
+        self.sorted_since = index.get("sorted_since")
+        if self.sorted_since is None:
+            self.sorted_since = self._segment_name(time.time() + 86400) if self.segments() else ""
+            if index:
+                self._save_index()
+        self._batches: Dict[str, Tuple[int, List[int]]] = {}   # segmento -> (registros, inicio de cada ciclo)
+        self._batches_lock = threading.Lock()
+
+    def _load_index(self) -> Dict:
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump({
+                "record": RECORD.format,
+                "devices": self.device_table.values,
+                "reachability": self.reachability_table.values,
+                "versions": self.version_table.values,
+                "sorted_since": self.sorted_since
+            }, f)
+        os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def _segment_name(timestamp: float) -> str:
+        return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y%m%d") + SEGMENT_SUFFIX
+
+    def segments(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(SEGMENT_SUFFIX))
+
+    def append_batch(self, timestamp: float, rows: List[Tuple[str, str, int, int, str]]):
+        """Agregar un ciclo completo: filas (device_id, alcanzabilidad, uptime_s, interfaces, versión)"""
+        with self._lock:
+            known = (len(self.device_table.values), len(self.reachability_table.values), len(self.version_table.values))
+            records = sorted(
+                (self.device_table.code(device_id), uptime, interfaces,
+                 self.version_table.code(version), self.reachability_table.code(reachability))
+                for device_id, reachability, uptime, interfaces, version in rows
+            )
+            buffer = bytearray(RECORD.size * len(records))
+            for i, (device, uptime, interfaces, version, reachability) in enumerate(records):
+                RECORD.pack_into(buffer, i * RECORD.size, timestamp, uptime, device, interfaces, version, reachability)
+            # El índice se escribe antes que los datos para que ningún registro apunte a un código desconocido
+            if known != (len(self.device_table.values), len(self.reachability_table.values), len(self.version_table.values)):
+                self._save_index()
+            with open(os.path.join(self.directory, self._segment_name(timestamp)), "ab") as f:
+                f.write(buffer)
+
+    def expire(self, now: Optional[float] = None):
+        """Eliminar segmentos más viejos que la retención"""
+        now = now if now is not None else time.time()
+        oldest = self._segment_name(now - self.retention_days * 86400)
+        for name in self.segments():
+            if name < oldest:
+                os.remove(os.path.join(self.directory, name))
+                with self._batches_lock:
+                    self._batches.pop(name, None)
+
+    def _records(self, name: str, start: float, end: float, device: Optional[int] = None) -> Iterator[Tuple]:
+        path = os.path.join(self.directory, name)
+        with open(path, "rb") as f:
+            count = os.fstat(f.fileno()).st_size // RECORD.size
+            if count == 0:
+                return
+            with mmap.mmap(f.fileno(), count * RECORD.size, access=mmap.ACCESS_READ) as mapped:
+                lo = self._bisect(mapped, 0, count, start)
+                hi = self._bisect(mapped, lo, count, end, right=True)
+                if device is None or name < self.sorted_since:
+                    # Sin copiar el rango: iter_unpack recorre las páginas mapeadas
+                    with memoryview(mapped) as view:
+                        records = RECORD.iter_unpack(view[lo * RECORD.size:hi * RECORD.size])
+                        try:
+                            for record in records:
+                                if device is None or record[2] == device:
+                                    yield record
+                        finally:
+                            del records     # liberar la vista antes de cerrar el mmap
+                    return
+                starts = self._batch_starts(name, mapped, count)
+                for i in range(bisect.bisect_right(starts, lo) - 1, len(starts)):
+                    first = max(starts[i], lo)
+                    if first >= hi:
+                        break
+                    last = min(starts[i + 1] if i + 1 < len(starts) else count, hi)
+                    position = self._bisect(mapped, first, last, device, field=2)
+                    while position < last:
+                        record = RECORD.unpack_from(mapped, position * RECORD.size)
+                        if record[2] != device:
+                            break
+                        yield record
+                        position += 1
+
+    def _batch_starts(self, name: str, mapped, count: int) -> List[int]:
+        """Posición del primer registro de cada ciclo del segmento (incremental: solo se agregan ciclos)"""
+        with self._batches_lock:
+            covered, starts = self._batches.get(name, (0, []))
+            if covered == count:
+                return starts
+            # El último ciclo conocido pudo estar incompleto: se vuelve a medir desde su inicio
+            starts = list(starts)
+            position = starts.pop() if starts else 0
+            while position < count:
+                starts.append(position)
+                timestamp = RECORD.unpack_from(mapped, position * RECORD.size)[0]
+                position = self._bisect(mapped, position, count, timestamp, right=True)
+            self._batches[name] = (count, starts)
+            return starts
+
+    @staticmethod
+    def _bisect(mapped, lo: int, hi: int, value, right: bool = False, field: int = 0) -> int:
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = RECORD.unpack_from(mapped, mid * RECORD.size)[field]
+            if current < value or (right and current == value):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _segments_between(self, start: float, end: float) -> List[str]:
+        first, last = self._segment_name(start), self._segment_name(end)
+        return [name for name in self.segments() if first <= name <= last]
+
+    def read_range(self, start: float, end: float, device_id: Optional[str] = None) -> Iterator[Tuple[str, float, str, int, int, str]]:
+        """Registros entre start y end (epoch), opcionalmente de un solo dispositivo"""
+        with self._lock:
+            devices = list(self.device_table.values)
+            reachability = list(self.reachability_table.values)
+            versions = list(self.version_table.values)
+            wanted = self.device_table.lookup(device_id) if device_id is not None else None
+        if device_id is not None and wanted is None:
+            return
+        for name in self._segments_between(start, end):
+            for timestamp, uptime, device, interfaces, version, reach in self._records(name, start, end, wanted):
+                yield devices[device], timestamp, reachability[reach], uptime, interfaces, versions[version]
+
+    def points(self, device_id: str, start: float, end: float) -> List[Dict]:
+        """Historial de un dispositivo en el formato de HistoryPointModel"""
+        return [history_point(timestamp, reachability, uptime, interfaces, version)
+                for _, timestamp, reachability, uptime, interfaces, version
+                in self.read_range(start, end, device_id)]
+
+    def points_by_device(self, device_ids: List[str], start: float, end: float) -> Dict[str, List[Dict]]:
+        """Historial de varios dispositivos: por dispositivo si son pocos, si no en una sola pasada"""
+        result: Dict[str, List[Dict]] = {device_id: [] for device_id in device_ids}
+        if len(result) * BULK_SCAN_RATIO < len(self.device_table.values):
+            for device_id in result:
+                result[device_id] = self.points(device_id, start, end)
+            return result
+        for device_id, timestamp, reachability, uptime, interfaces, version in self.read_range(start, end):
+            points = result.get(device_id)
+            if points is not None:
+                points.append(history_point(timestamp, reachability, uptime, interfaces, version))
+        return result
+
+    def load_into(self, *targets: Tuple[float, object]) -> int:
+        """
+        Arranque en frío: reconstruir los historiales en memoria (append_parsed) desde
+        disco en una sola pasada. targets: pares (desde, store); cada store recibe
+        los registros con timestamp >= su inicio.
+        """
+        end = time.time() + 86400
+        count = 0
+        for record in self.read_range(min(since for since, _ in targets), end):
+            for since, store in targets:
+                if record[1] >= since:
+                    store.append_parsed(*record)
+            count += 1
+        return count
@@ -0,0 +1,280 @@
+"""
+Canal entre el proceso colector (collector_service.py) y los workers de la API.
+
+- Instantánea: el colector serializa el estado publicado en cada ciclo a un
+  archivo en memoria compartida y lo reemplaza con os.replace; cada worker
+  mapea el archivo con mmap y solo lo vuelve a leer cuando cambió.
+- Control: un socket Unix para las operaciones que deben ejecutarse en el
+  colector (forzar actualización, configuración, historial, perfilado).
+
+Ambos usan pickle, así que viven en un directorio privado (0700) del usuario
+(runtime_dir) y se crean con permisos 0600. Antes de deserializar se verifica
+que el archivo, el socket y el proceso del otro extremo sean del mismo usuario
+y que nadie más pueda escribirlos; si no, se rechazan con UnsafeChannel.
+"""
+import os
+import mmap
+import stat
+import pickle
+import socket
+import struct
+import tempfile
+import threading
+import socketserver
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+RUNTIME_DIR_ENV = "NETMON_RUNTIME_DIR"   # mismo valor para el colector y los workers
+SNAPSHOT_NAME = "snapshot"
+CONTROL_NAME = "control.sock"
+CALL_TIMEOUT = 60      # segundos de espera por la respuesta del colector
+SHARED_EVENTS = 1000   # eventos recientes que viajan con cada instantánea (stream SSE de los workers)
+_LENGTH = struct.Struct("!I")
+
+class CollectorUnavailable(ConnectionError):
+    """No hay un proceso colector escuchando en el socket de control"""
+
+class UnsafeChannel(CollectorUnavailable):
+    """El directorio, la instantánea o el socket no son privados del usuario actual"""
+
+def check_private(info: os.stat_result, path: str, directory: bool = False):
+    if stat.S_ISLNK(info.st_mode):
+        raise UnsafeChannel(f"{path} es un enlace simbólico")
+    if info.st_uid != os.getuid():
+        raise UnsafeChannel(f"{path} pertenece a otro usuario (uid {info.st_uid})")
+    # El directorio no debe ser accesible por otros; archivos y socket, no escribibles por otros
+    if info.st_mode & (0o077 if directory else 0o022):
+        raise UnsafeChannel(f"{path} tiene permisos {stat.filemode(info.st_mode)}")
+
+def runtime_dir() -> str:
+    """
+    Directorio privado del canal: NETMON_RUNTIME_DIR, $XDG_RUNTIME_DIR/netmon o
+    /dev/shm/netmon-<uid>. Se crea con 0700 y se rechaza si ya existe con otro
+    dueño o más permisos.
+    """
+    path = os.environ.get(RUNTIME_DIR_ENV)
+    if not path:
+        base = os.environ.get("XDG_RUNTIME_DIR")
+        path = os.path.join(base, "netmon") if base else os.path.join(SHARED_DIR, f"netmon-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    check_private(os.lstat(path), path, directory=True)
+    return path
+
+def channel_path(name: str) -> str:
+    return os.path.join(runtime_dir(), name)
+
+def _peer_uid(sock: socket.socket) -> Optional[int]:
+    """Usuario del proceso al otro lado del socket Unix (None si el sistema no lo informa)"""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials = struct.Struct("3i")
+    return credentials.unpack(sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, credentials.size))[1]
+
+def _check_peer(sock: socket.socket):
+    uid = _peer_uid(sock)
+    if uid is not None and uid != os.getuid():
+        raise UnsafeChannel(f"El otro extremo del socket de control es de otro usuario (uid {uid})")
+
+@dataclass(frozen=True)
+class SharedState:
+    """Lo que un worker necesita para responder sin consultar al colector"""
+    snapshot: object                 # MonitorSnapshot sin historial (history=None)
+    history_until: Optional[float]   # último punto de historial incluido en la instantánea
+    status: Dict
+    controllers: List[Dict]
+    cycles: Tuple[Dict, ...]
+    events: Tuple[Tuple, ...]
+    last_event_seq: int
+    event_epoch: str                 # época del EventBus del colector (ids "<época>-<seq>")
+    metrics: str                     # exposición de las métricas del colector
+
+class SnapshotPublisher:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or channel_path(SNAPSHOT_NAME)
+        self._lock = threading.Lock()
+
+    def publish(self, state: SharedState):
+        data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            temp = f"{self.path}.{os.getpid()}.tmp"
+            fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp, self.path)
+
+    def close(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+class SnapshotReader:
+    """
+    Última instantánea publicada. os.stat en cada lectura (microsegundos); el
+    archivo se mapea y deserializa solo cuando cambió el inodo, es decir una
+    vez por publicación y por worker. El directorio se resuelve con la primera
+    lectura: construir el lector no crea nada.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._key = None
+        self._state: Optional[SharedState] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[SharedState]:
+        if self.path is None:
+            self.path = channel_path(SNAPSHOT_NAME)
+        try:
+            info = os.stat(self.path)
+        except FileNotFoundError:
+            return self._state
+        key = (info.st_ino, info.st_mtime_ns, info.st_size)
+        if key != self._key:
+            with self._lock:
+                if key != self._key:
+                    try:
+                        fd = os.open(self.path, os.O_RDONLY | os.O_NOFOLLOW)
+                    except FileNotFoundError:
+                        return self._state
+                    with open(fd, "rb") as f:
+                        # Se verifica el archivo abierto, no la ruta: no puede cambiar entre ambos pasos
+                        opened = os.fstat(f.fileno())
+                        check_private(opened, self.path)
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                            self._state = pickle.loads(mapped)
+                    self._key = (opened.st_ino, opened.st_mtime_ns, opened.st_size)
+        return self._state
+
+def _send(sock: socket.socket, message):
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+
+def _read_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+def _receive(sock: socket.socket):
+    header = _read_exact(sock, _LENGTH.size)
+    if header is None:
+        return None
+    data = _read_exact(sock, _LENGTH.unpack(header)[0])
+    return None if data is None else pickle.loads(data)
+
+class _ControlHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            _check_peer(self.request)
+        except UnsafeChannel as e:
+            print(f"Conexión de control rechazada: {str(e)}")
+            return
+        while True:
+            request = _receive(self.request)
+            if request is None:
+                return
+            operation, args = request
+            call = self.server.calls.get(operation)
+            try:
+                if call is None:
+                    raise ValueError(f"Operación desconocida: {operation}")
+                reply = (True, call(*args))
+            except (ValueError, KeyError, RuntimeError) as e:
+                reply = (False, e)
+            except Exception as e:
+                print(f"Error en la operación {operation}: {str(e)}")
+                reply = (False, RuntimeError(str(e)))
+            _send(self.request, reply)
+
+class ControlServer(socketserver.ThreadingUnixStreamServer):
+    """Socket de control del colector: ejecuta solo las operaciones de `calls`"""
+    daemon_threads = True
+
+    def __init__(self, calls: Dict[str, Callable], path: Optional[str] = None):
+        path = path or channel_path(CONTROL_NAME)
+        if os.path.lexists(path):
+            os.unlink(path)
+        super().__init__(path, _ControlHandler)
+        os.chmod(path, 0o600)
+        self.calls = calls
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ControlServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True, name="collector-control")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+class ControlClient:
+    """Cliente del socket de control: una conexión persistente por hilo"""
+    def __init__(self, path: Optional[str] = None, timeout: float = CALL_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            if self.path is None:
+                self.path = channel_path(CONTROL_NAME)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                check_private(os.lstat(self.path), self.path)
+                sock.connect(self.path)
+                _check_peer(sock)
+            except UnsafeChannel:
+                sock.close()
+                raise
+            except OSError as e:
+                sock.close()
+                raise CollectorUnavailable(f"Colector no disponible en {self.path}: {e}") from e
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def call(self, operation: str, *args):
+        # Una conexión reutilizada pudo quedar cerrada si el colector se reinició: se reintenta
+        # una vez con una nueva. Un timeout no se reintenta (la operación pudo ejecutarse).
+        reused = getattr(self._local, "sock", None) is not None
+        sock = self._connection()
+        try:
+            _send(sock, (operation, args))
+            reply = _receive(sock)
+        except socket.timeout:
+            self._close()
+            raise
+        except OSError as e:
+            self._close()
+            if reused:
+                return self.call(operation, *args)
+            raise CollectorUnavailable(f"Colector no disponible: {e}") from e
+        if reply is None:
+            self._close()
+            if reused:
+                return self.call(operation, *args)
+            raise CollectorUnavailable("El colector cerró la conexión")
+        ok, value = reply
+        if not ok:
+            raise value
+        return value
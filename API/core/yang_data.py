@@ -0,0 +1,127 @@
+"""
+Datos del monitor con la forma de los modelos YANG (network-devices,
+network-monitor y network-monitor-extensions), para codificarlos o
+validarlos con el esquema compilado de yang_schema.py.
+"""
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from yang_schema import YangSchema
+
+DEVICES = "network-devices:devices"
+DEVICE = "network-devices:devices/device"
+INTERFACES = "network-monitor:interfaces"
+ALERTS = "network-monitor:alerts"
+MONITOR_CONFIG = "network-monitor:monitor-config"
+CONFIG_FIELDS = ("polling_interval", "bandwidth_threshold", "error_threshold", "running",
+                 "history_limit", "alert_retention")
+VALIDATION_ERRORS = 100    # errores detallados por validación (el total se cuenta igual)
+# Tipos de AlertEngine que existen en el enum type de network-monitor; el resto se publica como OTHER
+# y el tipo original va en alert-type (network-monitor-extensions)
+ALERT_TYPES = frozenset(("INTERFACE_DOWN", "NO_IP_ASSIGNED", "HIGH_ERROR_RATE", "HIGH_BANDWIDTH"))
+
+@lru_cache(maxsize=4096)
+def yang_timestamp(value: Optional[str]) -> Optional[str]:
+    """Fecha del monitor o de DNA Center (hora local sin zona) como yang:date-and-time"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).astimezone().isoformat()
+    except ValueError:
+        return value    # se informa al validar
+
+def device_entry(schema: YangSchema, device) -> Dict:
+    # Los campos de DeviceInfo llevan el mismo nombre que los leaf de network-devices
+    entry = {}
+    for name in schema.node(DEVICE).children:
+        value = getattr(device, name, None)
+        if value not in (None, ""):
+            entry[name] = value
+    if "lastUpdated" in entry:
+        entry["lastUpdated"] = yang_timestamp(entry["lastUpdated"])
+    return entry
+
+def devices_data(schema: YangSchema, devices: Iterable) -> Dict:
+    return {"device": [device_entry(schema, device) for device in devices]}
+
+def interface_entry(sample) -> Dict:
+    return {
+        "name": sample.interface,
+        "description": sample.description,
+        "enabled": sample.enabled,
+        "oper-status": sample.oper_status or None,
+        "speed": sample.speed,
+        "statistics": {
+            "in-octets": sample.in_octets,
+            "out-octets": sample.out_octets,
+            "in-errors": sample.in_errors,
+            "out-errors": sample.out_errors,
+            "last-updated": yang_timestamp(sample.last_updated)
+        },
+        "rx-utilization": sample.rx_utilization,
+        "tx-utilization": sample.tx_utilization
+    }
+
+def interfaces_data(samples: Iterable) -> Dict:
+    return {"interface": [interface_entry(sample) for sample in samples]}
+
+def alert_entry(alert) -> Dict:
+    entry = {
+        "type": alert.type if alert.type in ALERT_TYPES else "OTHER",
+        "message": alert.message,
+        "severity": alert.severity,
+        "timestamp": yang_timestamp(alert.timestamp),
+        "alert-type": alert.type,
+        "device-id": alert.device_id
+    }
+    # Las alertas de dispositivo no tienen interfaz: el leaf se omite
+    if alert.interface is not None:
+        entry["interface"] = alert.interface
+    return entry
+
+def alerts_data(alerts: Iterable) -> Dict:
+    return {"alert": [alert_entry(alert) for alert in alerts]}
+
+def config_data(status: Dict) -> Dict:
+    return {name.replace("_", "-"): status[name] for name in CONFIG_FIELDS if name in status}
+
+def validate_snapshot(schema: YangSchema, snapshot, config: Optional[Dict] = None,
+                      limit: int = VALIDATION_ERRORS) -> Dict:
+    """
+    Validar una instantánea completa del monitor contra los modelos con los mismos
+    documentos que sirve la API: inventario, interfaces de cada dispositivo, alertas
+    abiertas y resueltas (status=all) y, si se pasa, la configuración.
+    """
+    started = time.perf_counter()
+    errors: List[str] = []
+    count = 0
+
+    def collect(found, prefix: str = ""):
+        nonlocal count
+        for error in found:
+            count += 1
+            if len(errors) < limit:
+                errors.append(prefix + error)
+
+    collect(schema.iter_errors(DEVICES, devices_data(schema, snapshot.devices)))
+    stats = snapshot.interfaces
+    interfaces = 0
+    # Una lista por dispositivo: el nombre de interfaz solo es clave dentro de cada uno
+    for device_id in stats.rows_by_device:
+        samples = stats.device_samples(device_id)
+        interfaces += len(samples)
+        collect(schema.iter_errors(INTERFACES, interfaces_data(samples)), f"device={device_id}: ")
+    alerts = [*snapshot.alerts, *snapshot.resolved_alerts]
+    collect(schema.iter_errors(ALERTS, alerts_data(alerts)))
+    if config is not None:
+        collect(schema.iter_errors(MONITOR_CONFIG, config_data(config)))
+    return {
+        "generation": snapshot.generation,
+        "schema": schema.key,
+        "valid": count == 0,
+        "error_count": count,
+        "errors": errors,
+        "checked": {"devices": len(snapshot.devices), "interfaces": interfaces, "alerts": len(alerts)},
+        "seconds": time.perf_counter() - started
+    }
@@ -0,0 +1,533 @@
+"""
+Esquema YANG precompilado para validar y codificar datos RESTCONF.
+
+pyang solo se usa para compilar: recorre los módulos (con augment, grouping y
+typedef ya resueltos) y el resultado se reduce a nodos y tipos simples que se
+serializan con pickle en YANG_CACHE_DIR. La clave de la caché combina nombre,
+revisión y hash de cada archivo, así que cargar el esquema al arrancar es leer
+un pickle de unos KB; solo se vuelve a compilar cuando cambia un módulo.
+
+Los datos de instancia son dicts con los nombres locales de los nodos (listas
+para list y leaf-list). Se codifican como application/yang-data+json (RFC 7951)
+o application/yang-data+xml (RFC 7950).
+"""
+import os
+import re
+import json
+import time
+import pickle
+import hashlib
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+SCHEMA_FORMAT = 1          # se incrementa si cambia la estructura serializada
+YANG_CACHE_DIR = "__yangcache__"   # relativo al directorio de los modelos
+REVISION_RE = re.compile(rb"^\s*revision\s+\"?(\d{4}-\d{2}-\d{2})", re.MULTILINE)
+
+# Tipos enteros: rango propio y si RFC 7951 los codifica como texto (64 bits)
+INT_TYPES = {
+    "int8": (-2**7, 2**7 - 1), "int16": (-2**15, 2**15 - 1),
+    "int32": (-2**31, 2**31 - 1), "int64": (-2**63, 2**63 - 1),
+    "uint8": (0, 2**8 - 1), "uint16": (0, 2**16 - 1),
+    "uint32": (0, 2**32 - 1), "uint64": (0, 2**64 - 1),
+}
+JSON_STRING_INTS = ("int64", "uint64")
+
+class SchemaError(Exception):
+    """Los módulos YANG no se pudieron compilar"""
+
+@lru_cache(maxsize=None)
+def _regex(pattern: str) -> "re.Pattern":
+    return re.compile(pattern)
+
+# Categorías Unicode de XSD (\p{..}) que tienen equivalente en re
+_CATEGORIES = {"L": r"[^\W\d_]", "N": r"\d", "Nd": r"\d"}
+
+def xsd_to_python(pattern: str) -> Optional[str]:
+    """
+    Traducir un pattern YANG (expresión regular de XSD) a la sintaxis de re.
+    Cubre lo que usan los módulos IETF habituales; devuelve None si aparece
+    algo sin equivalente (\\i, \\c, resta de clases, otras categorías).
+    """
+    out = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            escape_char = pattern[i + 1:i + 2]
+            if escape_char in ("p", "P"):
+                match = re.match(r"\{(\w+)\}", pattern[i + 2:])
+                if not match or match.group(1) not in _CATEGORIES or escape_char == "P":
+                    return None
+                out.append(_CATEGORIES[match.group(1)])
+                i += 2 + match.end()
+                continue
+            if escape_char in ("i", "I", "c", "C"):
+                return None
+            out.append(pattern[i:i + 2])
+            i += 2
+        elif char == "[":
+            end, members, categories = i + 1, [], []
+            negated = pattern[end:end + 1] == "^"
+            if negated:
+                end += 1
+            while end < len(pattern) and pattern[end] != "]":
+                if pattern[end] == "\\":
+                    match = re.match(r"\\p\{(\w+)\}", pattern[end:])
+                    if match:
+                        if match.group(1) not in _CATEGORIES:
+                            return None
+                        categories.append(_CATEGORIES[match.group(1)])
+                        end += match.end()
+                        continue
+                    if pattern[end + 1:end + 2] in ("P", "i", "I", "c", "C"):
+                        return None
+                    members.append(pattern[end:end + 2])
+                    end += 2
+                    continue
+                if pattern[end] == "[" or pattern[end:end + 2] == "-[":
+                    return None    # resta de clases
+                members.append("\\[" if pattern[end] == "[" else pattern[end])
+                end += 1
+            if end >= len(pattern):
+                return None
+            if categories:
+                if negated:
+                    return None
+                options = ([f"[{''.join(members)}]"] if members else []) + categories
+                out.append("(?:" + "|".join(options) + ")")
+            else:
+                out.append("[" + ("^" if negated else "") + "".join(members) + "]")
+            i = end + 1
+        elif char in "^$":
+            out.append("\\" + char)    # en XSD no son anclas
+            i += 1
+        else:
+            out.append(char)
+            i += 1
+    translated = "".join(out)
+    try:
+        _regex(translated)
+    except re.error:
+        return None
+    return translated
+
+@dataclass
+class LeafType:
+    """Tipo resuelto de un leaf: tipo base YANG más todas las restricciones heredadas"""
+    name: str                                    # uint32, string, decimal64, enumeration, union...
+    ranges: Tuple[Tuple[Any, Any], ...] = ()
+    lengths: Tuple[Tuple[int, int], ...] = ()
+    patterns: Tuple[Tuple[str, bool], ...] = ()  # (expresión de re, invert-match)
+    enums: Tuple[str, ...] = ()
+    fraction_digits: int = 0
+    members: Tuple["LeafType", ...] = ()         # union
+
+    def parse(self, value) -> Any:
+        """Valor normalizado del leaf; ValueError con el motivo si no es válido"""
+        name = self.name
+        if name in INT_TYPES:
+            if isinstance(value, bool) or not isinstance(value, (int, str)):
+                raise ValueError(f"se esperaba un entero ({name})")
+            try:
+                number = int(value)
+            except ValueError:
+                raise ValueError(f"'{value}' no es un entero ({name})") from None
+            low, high = INT_TYPES[name]
+            if not low <= number <= high:
+                raise ValueError(f"{number} fuera del rango de {name}")
+            self._check_ranges(number)
+            return number
+        if name == "decimal64":
+            if isinstance(value, bool):
+                raise ValueError("se esperaba un decimal")
+            try:
+                number = Decimal(str(value))
+            except InvalidOperation:
+                raise ValueError(f"'{value}' no es un decimal") from None
+            if not number.is_finite():
+                raise ValueError(f"{value} no es un decimal finito")
+            number = number.quantize(Decimal(1).scaleb(-self.fraction_digits), rounding=ROUND_HALF_EVEN)
+            self._check_ranges(number)
+            return number
+        if name == "boolean":
+            if isinstance(value, bool):
+                return value
+            if value in ("true", "false"):
+                return value == "true"
+            raise ValueError("se esperaba true o false")
+        if name == "enumeration":
+            if value not in self.enums:
+                raise ValueError(f"'{value}' no es uno de {list(self.enums)}")
+            return value
+        if name == "union":
+            for member in self.members:
+                try:
+                    return member.parse(value)
+                except ValueError:
+                    continue
+            raise ValueError(f"'{value}' no es válido para ningún tipo de la unión")
+        if name == "empty":
+            if value not in (None, True, [None]):
+                raise ValueError("un leaf empty no tiene valor")
+            return None
+        if not isinstance(value, str):
+            raise ValueError(f"se esperaba texto ({name})")
+        if self.lengths and not any(low <= len(value) <= high for low, high in self.lengths):
+            raise ValueError(f"longitud {len(value)} fuera de {list(self.lengths)}")
+        for pattern, invert in self.patterns:
+            if (_regex(pattern).fullmatch(value) is None) != invert:
+                raise ValueError(f"'{value}' no cumple el pattern {pattern}")
+        return value
+
+    def _check_ranges(self, number):
+        if self.ranges and not any(low <= number <= high for low, high in self.ranges):
+            raise ValueError(f"{number} fuera del rango {[(str(l), str(h)) for l, h in self.ranges]}")
+
+    def _member(self, value) -> Tuple["LeafType", Any]:
+        if self.name != "union":
+            return self, self.parse(value)
+        for member in self.members:
+            try:
+                return member._member(value)
+            except ValueError:
+                continue
+        raise ValueError(f"'{value}' no es válido para ningún tipo de la unión")
+
+    def to_json(self, value):
+        leaf_type, parsed = self._member(value)
+        if leaf_type.name in JSON_STRING_INTS or leaf_type.name == "decimal64":
+            return str(parsed)
+        if leaf_type.name == "empty":
+            return [None]
+        return parsed
+
+    def to_xml(self, value) -> str:
+        leaf_type, parsed = self._member(value)
+        if leaf_type.name == "boolean":
+            return "true" if parsed else "false"
+        if leaf_type.name == "empty":
+            return ""
+        return escape(str(parsed))
+
+@dataclass
+class SchemaNode:
+    name: str
+    module: str
+    namespace: str
+    kind: str                                    # container | list | leaf | leaf-list
+    keys: Tuple[str, ...] = ()
+    children: Dict[str, "SchemaNode"] = field(default_factory=dict)
+    type: Optional[LeafType] = None
+
+@dataclass
+class YangSchema:
+    key: str
+    revisions: Dict[str, str]                    # módulo -> revisión
+    sources: Dict[str, str]                      # archivo -> sha256 (incluye los importados)
+    roots: Dict[str, SchemaNode]                 # "módulo:nombre" -> nodo de datos de primer nivel
+    unsupported_patterns: Tuple[str, ...] = ()   # patterns sin traducción: no se verifican
+
+    def node(self, path: str) -> SchemaNode:
+        """Nodo por ruta de esquema: "network-devices:devices/device" """
+        first, *rest = path.strip("/").split("/")
+        node = self.roots.get(first)
+        for name in rest:
+            if node is None:
+                break
+            node = node.children.get(name.split(":")[-1])
+        if node is None:
+            raise KeyError(f"Nodo YANG desconocido: {path}")
+        return node
+
+    # Validación
+    def iter_errors(self, path: str, data) -> Iterator[str]:
+        """Errores de `data` contra el nodo `path` (a medida que se encuentran)"""
+        node = self.node(path)
+        return self._errors(node, data, "/" + path.strip("/"), top=True)
+
+    def validate(self, path: str, data) -> List[str]:
+        return list(self.iter_errors(path, data))
+
+    def _errors(self, node: SchemaNode, data, where: str, top: bool = False) -> Iterator[str]:
+        if node.kind == "leaf":
+            try:
+                node.type.parse(data)
+            except ValueError as e:
+                yield f"{where}: {e}"
+        elif node.kind == "leaf-list":
+            if not isinstance(data, (list, tuple)):
+                yield f"{where}: se esperaba una lista de valores"
+                return
+            for value in data:
+                try:
+                    node.type.parse(value)
+                except ValueError as e:
+                    yield f"{where}: {e}"
+        elif node.kind == "list":
+            if top and isinstance(data, dict):
+                data = [data]
+            if not isinstance(data, (list, tuple)):
+                yield f"{where}: se esperaba una lista de entradas"
+                return
+            seen = set()
+            for entry in data:
+                if not isinstance(entry, dict):
+                    yield f"{where}: cada entrada debe ser un objeto"
+                    continue
+                key = tuple(entry.get(name) for name in node.keys)
+                entry_where = where + "".join(f"[{name}='{value}']" for name, value in zip(node.keys, key))
+                missing = [name for name, value in zip(node.keys, key) if value is None]
+                if missing:
+                    yield f"{entry_where}: faltan las claves {missing}"
+                elif node.keys and key in seen:
+                    yield f"{entry_where}: clave duplicada"
+                seen.add(key)
+                yield from self._children_errors(node, entry, entry_where)
+        else:
+            if not isinstance(data, dict):
+                yield f"{where}: se esperaba un objeto"
+                return
+            yield from self._children_errors(node, data, where)
+
+    def _children_errors(self, node: SchemaNode, data: Dict, where: str) -> Iterator[str]:
+        children = node.children
+        for name, value in data.items():
+            child = children.get(name)
+            if child is None:
+                yield f"{where}/{name}: nodo desconocido"
+            elif value is None:
+                continue
+            elif child.kind == "leaf":
+                # Caso más frecuente resuelto aquí, sin un generador por leaf
+                try:
+                    child.type.parse(value)
+                except ValueError as e:
+                    yield f"{where}/{name}: {e}"
+            else:
+                yield from self._errors(child, value, f"{where}/{name}")
+
+    # Codificación
+    def encode_json(self, path: str, data) -> bytes:
+        """application/yang-data+json (RFC 7951): nombres calificados con el módulo donde cambia"""
+        node = self.node(path)
+        document = {f"{node.module}:{node.name}": self._json(node, data, top=True)}
+        return json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def _json(self, node: SchemaNode, data, top: bool = False):
+        if node.kind == "leaf":
+            return node.type.to_json(data)
+        if node.kind == "leaf-list":
+            return [node.type.to_json(value) for value in data]
+        if node.kind == "list":
+            entries = [data] if top and isinstance(data, dict) else data
+            return [self._json_children(node, entry) for entry in entries]
+        return self._json_children(node, data)
+
+    def _json_children(self, node: SchemaNode, data: Dict) -> Dict:
+        result = {}
+        for name, value in data.items():
+            child = node.children.get(name)
+            if child is None or value is None:
+                continue
+            member = name if child.module == node.module else f"{child.module}:{name}"
+            result[member] = self._json(child, value)
+        return result
+
+    def encode_xml(self, path: str, data) -> bytes:
+        """application/yang-data+xml (RFC 7950): xmlns en la raíz y donde cambia el módulo"""
+        node = self.node(path)
+        if node.kind in ("list", "leaf-list") and not isinstance(data, dict):
+            raise ValueError("Un documento XML tiene un solo elemento raíz: se codifica una entrada")
+        out: List[str] = []
+        self._xml(node, data, out, None)
+        return "".join(out).encode()
+
+    def _xml(self, node: SchemaNode, data, out: List[str], namespace: Optional[str]):
+        open_tag = node.name if node.namespace == namespace else f'{node.name} xmlns="{node.namespace}"'
+        if node.kind == "leaf":
+            out.append(f"<{open_tag}>{node.type.to_xml(data)}</{node.name}>")
+            return
+        if node.kind == "leaf-list":
+            for value in data:
+                out.append(f"<{open_tag}>{node.type.to_xml(value)}</{node.name}>")
+            return
+        if node.kind == "list" and not isinstance(data, dict):
+            for entry in data:
+                self._xml(node, entry, out, namespace)
+            return
+        out.append(f"<{open_tag}>")
+        # Las claves de una lista van primero (RFC 7950, 7.8.5)
+        names = [*node.keys, *(name for name in data if name not in node.keys)]
+        for name in names:
+            child = node.children.get(name)
+            value = data.get(name)
+            if child is not None and value is not None:
+                self._xml(child, value, out, node.namespace)
+        out.append(f"</{node.name}>")
+
+def _file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def schema_key(models_dir: str, modules: Sequence[str]) -> str:
+    """Clave de la caché: nombre, revisión y hash de cada módulo (sin importar pyang)"""
+    digest = hashlib.sha256(f"format={SCHEMA_FORMAT}".encode())
+    for name in modules:
+        with open(os.path.join(models_dir, name), "rb") as f:
+            text = f.read()
+        revision = REVISION_RE.search(text)
+        digest.update(f"|{name}@{revision.group(1).decode() if revision else ''}:".encode())
+        digest.update(hashlib.sha256(text).digest())
+    return digest.hexdigest()[:24]
+
+def _leaf_type(spec) -> LeafType:
+    """Reducir la cadena de TypeSpec de pyang (typedef sobre typedef) a un LeafType"""
+    ranges, lengths, patterns, enums, fraction_digits, members = (), (), [], (), 0, ()
+    name = None
+    while spec is not None:
+        kind = type(spec).__name__
+        if kind == "RangeTypeSpec" and not ranges:
+            ranges = tuple((_number(low), _number(high if high is not None else low)) for low, high in spec.ranges)
+        elif kind == "LengthTypeSpec" and not lengths:
+            lengths = tuple((int(low), int(high if high is not None else low)) for low, high in spec.lengths)
+        elif kind == "PatternTypeSpec":
+            patterns.extend((p.spec, p.invert_match) for p in spec.res)
+        elif kind == "EnumTypeSpec" and not enums:
+            enums = tuple(enum for enum, _ in spec.enums)
+        elif kind == "UnionTypeSpec":
+            members = tuple(_leaf_type(t.i_type_spec) for t in spec.types)
+        if hasattr(spec, "fraction_digits") and not fraction_digits:
+            fraction_digits = spec.fraction_digits
+        name = spec.name
+        spec = spec.base
+    return LeafType(name=name, ranges=ranges, lengths=lengths, patterns=tuple(patterns), enums=enums,
+                    fraction_digits=fraction_digits, members=members)
+
+def _number(value):
+    # Los límites de decimal64 llegan como Decimal64Value (entero escalado)
+    if hasattr(value, "fd"):
+        return Decimal(value.value).scaleb(-value.fd)
+    return int(value) if not isinstance(value, str) else value
+
+def _schema_node(stmt) -> Optional[SchemaNode]:
+    if stmt.keyword not in ("container", "list", "leaf", "leaf-list", "choice", "case"):
+        return None
+    module = stmt.i_module.i_modulename
+    node = SchemaNode(
+        name=stmt.arg,
+        module=module,
+        namespace=stmt.i_module.search_one("namespace").arg,
+        kind=stmt.keyword
+    )
+    if stmt.keyword in ("leaf", "leaf-list"):
+        node.type = _leaf_type(stmt.search_one("type").i_type_spec)
+        return node
+    if stmt.keyword == "list" and stmt.search_one("key") is not None:
+        node.keys = tuple(stmt.search_one("key").arg.split())
+    for child in stmt.i_children:
+        compiled = _schema_node(child)
+        if compiled is None:
+            continue
+        if compiled.kind in ("choice", "case"):
+            # choice/case no aparecen en los datos: sus nodos cuelgan del padre
+            node.children.update(compiled.children)
+        else:
+            node.children[compiled.name] = compiled
+    return node
+
+def _translate_patterns(leaf_type: LeafType, unsupported: set) -> LeafType:
+    patterns = []
+    for pattern, invert in leaf_type.patterns:
+        translated = xsd_to_python(pattern)
+        if translated is None:
+            unsupported.add(pattern)
+        else:
+            patterns.append((translated, invert))
+    leaf_type.patterns = tuple(patterns)
+    leaf_type.members = tuple(_translate_patterns(member, unsupported) for member in leaf_type.members)
+    return leaf_type
+
+def _translate_tree(node: SchemaNode, unsupported: set):
+    if node.type is not None:
+        _translate_patterns(node.type, unsupported)
+    for child in node.children.values():
+        _translate_tree(child, unsupported)
+
+def compile_schema(models_dir: str, modules: Sequence[str]) -> YangSchema:
+    """Compilar los módulos con pyang (lento: solo cuando la caché no sirve)"""
+    from pyang import context, repository
+
+    ctx = context.Context(repository.FileRepository(models_dir, use_env=False))
+    for name in modules:
+        with open(os.path.join(models_dir, name)) as f:
+            ctx.add_module(name, f.read())
+    ctx.validate()
+    errors = [f"{error[0].ref}:{error[0].line}: {error[1]}" for error in ctx.errors
+              if not error[1].endswith("_WARNING") and error[1] not in ("LINT", "UNUSED_IMPORT")]
+    if errors:
+        raise SchemaError("Errores en los modelos YANG: " + "; ".join(errors))
+
+    roots: Dict[str, SchemaNode] = {}
+    revisions: Dict[str, str] = {}
+    sources: Dict[str, str] = {}
+    for (module_name, revision), module in ctx.modules.items():
+        revisions[module_name] = revision
+        ref = module.pos.ref
+        path = ref if os.path.isabs(ref) else os.path.join(models_dir, ref)
+        if os.path.exists(path):
+            sources[os.path.abspath(path)] = _file_hash(path)
+        if module.keyword != "module":
+            continue
+        for child in module.i_children:
+            compiled = _schema_node(child)
+            if compiled is not None:
+                roots[f"{compiled.module}:{compiled.name}"] = compiled
+    unsupported: set = set()
+    for root in roots.values():
+        _translate_tree(root, unsupported)
+    return YangSchema(key=schema_key(models_dir, modules), revisions=revisions, sources=sources,
+                      roots=roots, unsupported_patterns=tuple(sorted(unsupported)))
+
+def _sources_match(schema: YangSchema) -> bool:
+    try:
+        return all(_file_hash(path) == digest for path, digest in schema.sources.items())
+    except OSError:
+        return False
+
+def load_schema(models_dir: str, modules: Sequence[str], cache_dir: Optional[str] = None) -> YangSchema:
+    """
+    Esquema desde la caché si coincide la clave (y los módulos importados no
+    cambiaron); si no, compilarlo con pyang y guardarlo para el próximo arranque.
+    """
+    started = time.perf_counter()
+    cache_dir = cache_dir or os.path.join(models_dir, YANG_CACHE_DIR)
+    key = schema_key(models_dir, modules)
+    cache_path = os.path.join(cache_dir, f"schema-{key}.pickle")
+    try:
+        with open(cache_path, "rb") as f:
+            schema = pickle.load(f)
+        if schema.key == key and _sources_match(schema):
+            print(f"Esquema YANG cargado desde caché en {(time.perf_counter() - started) * 1000:.1f} ms")
+            return schema
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+    schema = compile_schema(models_dir, modules)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            pickle.dump(schema, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, cache_path)
+        for name in os.listdir(cache_dir):
+            if name.startswith("schema-") and name != os.path.basename(cache_path):
+                os.remove(os.path.join(cache_dir, name))    # versiones anteriores de los módulos
+    except OSError as e:
+        print(f"No se pudo guardar la caché del esquema YANG: {str(e)}")
+    for pattern in schema.unsupported_patterns:
+        print(f"Advertencia: pattern YANG sin traducción, no se verifica: {pattern}")
+    print(f"Esquema YANG compilado en {(time.perf_counter() - started) * 1000:.1f} ms")
+    return schema
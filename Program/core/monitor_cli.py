@@ -1,6 +1,9 @@
 # core/monitor_cli.py
 import os
+import json
+import time
 import requests
+from requests.adapters import HTTPAdapter
 
 class NetworkMonitorCLI:
     """
@@ -12,34 +15,111 @@ class NetworkMonitorCLI:
             "RESTCONF_BASE_URL",
             "http://localhost:8000/restconf/data"
         )
-        self.headers = {"Accept": "application/yang-data+json"}
+        # JSON plano: la UI usa campos que los modelos YANG no tienen (device_id de las alertas,
+        # polling_interval del estado); con application/yang-data+json la API devuelve el
+        # contenedor RFC 7951 y las listas llegarían vacías
+        self.headers = {"Accept": "application/json"}
+        # Una sola sesión keep-alive para todas las consultas (la UI las hace desde varios hilos)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.streams_url = self.base_url.replace("/restconf/data", "/restconf/streams")
+        self.last_event_id = None
 
     def fetch_all_devices(self):
         url = f"{self.base_url}/network-devices:devices"
-        resp = requests.get(url, headers=self.headers)
+        resp = self.session.get(url, headers=self.headers)
         resp.raise_for_status()
         return resp.json()
 
     def fetch_device(self, device_id):
         url = f"{self.base_url}/network-devices:devices/device={device_id}"
-        resp = requests.get(url, headers=self.headers)
+        resp = self.session.get(url, headers=self.headers)
         resp.raise_for_status()
         return resp.json()
 
     def fetch_history(self, device_id):
         url = f"{self.base_url}/network-devices:device-history/device={device_id}"
-        resp = requests.get(url, headers=self.headers)
+        resp = self.session.get(url, headers=self.headers)
         resp.raise_for_status()
         return resp.json()
 
+    def fetch_history_bulk(self, device_ids, start=None, end=None, fields=None):
+        """
+        Historial de varios dispositivos en una sola petición. Generador de
+        (device_id, puntos) que se va leyendo a medida que llega la respuesta.
+        start/end: datetime o texto ISO 8601; fields: campos a incluir por punto.
+        """
+        url = self.base_url.replace("/restconf/data", "/restconf/operations") + "/network-devices:get-history"
+        body = {"device_ids": list(device_ids)}
+        if start is not None:
+            body["start"] = start if isinstance(start, str) else start.isoformat()
+        if end is not None:
+            body["end"] = end if isinstance(end, str) else end.isoformat()
+        if fields is not None:
+            body["fields"] = list(fields)
+        with self.session.post(url, json=body, headers={"Accept": "application/x-ndjson"}, stream=True) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if line:
+                    item = json.loads(line)
+                    yield item["device_id"], item["points"]
+
     def fetch_alerts(self):
         url = f"{self.base_url}/network-alerts:alerts"
-        resp = requests.get(url, headers=self.headers)
+        resp = self.session.get(url, headers=self.headers)
         resp.raise_for_status()
         return resp.json()
 
     def fetch_status(self):
         url = f"{self.base_url}/network-monitor:status"
-        resp = requests.get(url, headers=self.headers)
+        resp = self.session.get(url, headers=self.headers)
         resp.raise_for_status()
-        return resp.json()
\ No newline at end of file
+        return resp.json()
+
+    def subscribe(self, last_event_id=None, reconnect_delay=5):
+        """
+        Generador de eventos del stream SSE del monitor: tuplas (id, evento, datos)
+        con evento en "devices", "alert", "status" o "resync". Se reconecta solo y
+        reanuda desde el último evento recibido; ante "resync" el cliente debe
+        volver a leer dispositivos y alertas completos.
+        """
+        if last_event_id is not None:
+            self.last_event_id = last_event_id
+        url = f"{self.streams_url}/network-monitor:events"
+        while True:
+            headers = {"Accept": "text/event-stream"}
+            if self.last_event_id is not None:
+                headers["Last-Event-ID"] = str(self.last_event_id)
+            try:
+                with self.session.get(url, headers=headers, stream=True, timeout=(5, 60)) as resp:
+                    resp.raise_for_status()
+                    yield from self._parse_sse(resp.iter_lines(decode_unicode=True))
+            except (requests.ConnectionError, requests.Timeout):
+                pass
+            time.sleep(reconnect_delay)
+
+    def _parse_sse(self, lines):
+        event_id, event, data = None, "message", []
+        for line in lines:
+            if line is None:
+                continue
+            if line == "":
+                if data:
+                    if event_id is not None:
+                        self.last_event_id = event_id
+                    yield event_id, event, json.loads("\n".join(data))
+                event_id, event, data = None, "message", []
+            elif line.startswith(":"):
+                continue
+            else:
+                name, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if name == "id" and value:
+                    # "<época>-<seq>": se devuelve tal cual en Last-Event-ID
+                    event_id = value
+                elif name == "event":
+                    event = value
+                elif name == "data":
+                    data.append(value)
\ No newline at end of file
@@ -8,11 +8,152 @@ from core.monitor_cli import NetworkMonitorCLI
 # Título personalizado de la aplicación
 titulo = "Custom Network Device Monitor (Cisco DNA RESTCONF)"
 
+# Columnas visibles de la tabla de dispositivos
+DEVICE_COLUMNS = ("hostname", "managementIpAddress", "platformId", "softwareVersion",
+                  "reachabilityStatus", "upTime", "role")
+
 # Función helper para convertir camelCase a texto legible
 def humanize(key):
     s = re.sub(r'(?<!^)(?=[A-Z])', ' ', key)
     return s.capitalize()
 
+def alert_key(a):
+    return f"{a.get('type')}:{a.get('device_id')}:{a.get('interface') or ''}"
+
+class DeviceTable(ttk.Frame):
+    """
+    Tabla de dispositivos ordenable y filtrable.
+    Cada dispositivo es una fila del Treeview con iid = id del dispositivo; Tk solo
+    dibuja las filas visibles, así que no se crea ningún widget por dispositivo.
+    Las actualizaciones tocan únicamente las filas cuyo contenido cambió.
+    """
+    def __init__(self, master, on_select=None):
+        super().__init__(master)
+        self.on_select = on_select
+        self.devices = {}          # id -> dict completo del dispositivo
+        self._values = {}          # id -> tupla mostrada en la fila
+        self._detached = set()     # filas ocultas por el filtro
+        self._sort_column = None
+        self._sort_reverse = False
+
+        bar = ttk.Frame(self)
+        bar.pack(fill="x", pady=(0, 2))
+        ttk.Label(bar, text="Filtrar:").pack(side="left")
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", lambda *_: self.apply_filter())
+        ttk.Entry(bar, textvariable=self.filter_var).pack(side="left", fill="x", expand=True, padx=5)
+        self.count_label = ttk.Label(bar, text="0 dispositivos")
+        self.count_label.pack(side="right")
+
+        self.tree = ttk.Treeview(self, columns=DEVICE_COLUMNS, show="headings", selectmode="browse")
+        for col in DEVICE_COLUMNS:
+            self.tree.heading(col, text=humanize(col), command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=120, anchor='w')
+        scroll = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+        scroll.pack(side="right", fill="y")
+        self.tree.pack(fill="both", expand=True)
+        self.tree.bind("<<TreeviewSelect>>", self._selected)
+
+    def set_devices(self, devices):
+        """Reemplazar el inventario completo aplicando solo las diferencias"""
+        incoming = {d.get('id'): d for d in devices}
+        removed = [device_id for device_id in self.devices if device_id not in incoming]
+        self.apply_changes(
+            added=[d for device_id, d in incoming.items() if device_id not in self.devices],
+            removed=removed,
+            modified={device_id: d for device_id, d in incoming.items()
+                      if device_id in self.devices and self.devices[device_id] != d}
+        )
+
+    def apply_changes(self, added=(), removed=(), modified=None):
+        """Aplicar un diff del stream: dispositivos nuevos, ids eliminados y campos modificados"""
+        resort = False
+        for device_id in removed:
+            self.devices.pop(device_id, None)
+            self._values.pop(device_id, None)
+            self._detached.discard(device_id)
+            if self.tree.exists(device_id):
+                self.tree.delete(device_id)
+        for d in added:
+            device_id = d.get('id')
+            self.devices[device_id] = dict(d)
+            self._upsert_row(device_id)
+            resort = True
+        for device_id, fields in (modified or {}).items():
+            if device_id not in self.devices:
+                continue
+            self.devices[device_id].update(fields)
+            self._upsert_row(device_id)
+            resort = resort or self._sort_column in fields
+        if resort and self._sort_column:
+            self._resort()
+        self._update_count()
+        selection = self.tree.selection()
+        if selection and self.on_select and (selection[0] in (modified or {})):
+            self.on_select(self.devices[selection[0]])
+
+    def _row_values(self, device_id):
+        d = self.devices[device_id]
+        return tuple(str(d.get(col, "")) for col in DEVICE_COLUMNS)
+
+    def _matches(self, values):
+        text = self.filter_var.get().strip().lower()
+        return not text or any(text in value.lower() for value in values)
+
+    def _upsert_row(self, device_id):
+        values = self._row_values(device_id)
+        if self._values.get(device_id) == values:
+            return
+        self._values[device_id] = values
+        if not self.tree.exists(device_id):
+            self.tree.insert("", "end", iid=device_id, values=values)
+        else:
+            self.tree.item(device_id, values=values)
+        visible = self._matches(values)
+        if not visible and device_id not in self._detached:
+            self.tree.detach(device_id)
+            self._detached.add(device_id)
+        elif visible and device_id in self._detached:
+            self.tree.reattach(device_id, "", "end")
+            self._detached.discard(device_id)
+
+    def apply_filter(self):
+        for device_id, values in self._values.items():
+            visible = self._matches(values)
+            if visible and device_id in self._detached:
+                self.tree.reattach(device_id, "", "end")
+                self._detached.discard(device_id)
+            elif not visible and device_id not in self._detached:
+                self.tree.detach(device_id)
+                self._detached.add(device_id)
+        if self._sort_column:
+            self._resort()
+        self._update_count()
+
+    def sort_by(self, column):
+        if self._sort_column == column:
+            self._sort_reverse = not self._sort_reverse
+        else:
+            self._sort_column, self._sort_reverse = column, False
+        self._resort()
+
+    def _resort(self):
+        position = DEVICE_COLUMNS.index(self._sort_column)
+        visible = [device_id for device_id in self._values if device_id not in self._detached]
+        visible.sort(key=lambda device_id: self._values[device_id][position].lower(), reverse=self._sort_reverse)
+        for index, device_id in enumerate(visible):
+            self.tree.move(device_id, "", index)
+
+    def _update_count(self):
+        shown = len(self._values) - len(self._detached)
+        self.count_label.config(text=f"{shown} de {len(self._values)} dispositivos")
+
+    def _selected(self, _event):
+        selection = self.tree.selection()
+        if selection and self.on_select:
+            self.on_select(self.devices.get(selection[0], {}))
+
 class NetworkMonitorApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -20,11 +161,13 @@ class NetworkMonitorApp(tk.Tk):
         self.geometry("900x650")
         self.monitor = NetworkMonitorCLI()
         self.countdown = 15
+        self.alert_rows = {}   # clave (tipo:device_id) -> valores mostrados
         self.create_widgets()
         # Carga inicial sin bloquear UI
         self.refresh_devices()
         self.refresh_alerts()
         self.refresh_status()
+        self.start_stream()
         self.after(1000, self.update_timer)
 
     def create_widgets(self):
@@ -36,9 +179,18 @@ class NetworkMonitorApp(tk.Tk):
         lbl_title = ttk.Label(header, text=titulo, font=(None, 16, 'bold'))
         lbl_title.pack(side="left")
 
-        # Notebook para dispositivos
-        self.notebook = ttk.Notebook(self)
-        self.notebook.pack(fill="both", expand=True, padx=10, pady=2)
+        # Tabla de dispositivos y detalle del seleccionado
+        panes = ttk.PanedWindow(self, orient="horizontal")
+        panes.pack(fill="both", expand=True, padx=10, pady=2)
+        self.device_table = DeviceTable(panes, on_select=self._show_device)
+        panes.add(self.device_table, weight=3)
+        detail_frame = ttk.LabelFrame(panes, text="Detalle")
+        self.tree_detail = ttk.Treeview(detail_frame, columns=("Valor",), show="tree headings")
+        self.tree_detail.heading("#0", text="Campo")
+        self.tree_detail.heading("Valor", text="Valor")
+        self.tree_detail.column("#0", width=140)
+        self.tree_detail.pack(fill="both", expand=True, padx=5, pady=5)
+        panes.add(detail_frame, weight=2)
 
         # Sección de alertas (Treeview original)
         alerts_frame = ttk.LabelFrame(self, text="Alertas")
@@ -63,6 +215,7 @@ class NetworkMonitorApp(tk.Tk):
             self.next_update_label.config(text=f"Siguiente actualización: {self.countdown}s")
             self.countdown -= 1
         elif self.countdown == 0:
+            # Solo se llega aquí si el stream no entregó el estado del ciclo
             self.next_update_label.config(text="Actualizando...")
             self._set_status_color('yellow')
             self.refresh_alerts()
@@ -76,18 +229,45 @@ class NetworkMonitorApp(tk.Tk):
         self.canvas_status.delete("all")
         self.canvas_status.create_oval(2, 2, 18, 18, fill=color, outline=color)
 
+    def _apply_status(self, st):
+        running = st.get('running', False)
+        self._set_status_color("green" if running else "red")
+        self.countdown = st.get('polling_interval', 15)
+
     def refresh_status(self):
         def task():
             try:
                 st = self.monitor.fetch_status()
-                running = st.get('running', False)
-                color = "green" if running else "red"
-                self.after(0, lambda: self._set_status_color(color))
-                self.after(0, lambda: setattr(self, 'countdown', 15))
+                self.after(0, self._apply_status, st)
             except Exception as e:
                 self.after(0, lambda: messagebox.showerror("Error Estado", str(e)))
         threading.Thread(target=task, daemon=True).start()
 
+    def start_stream(self):
+        """Recibir solo los cambios desde el stream SSE del monitor"""
+        def task():
+            try:
+                for _, event, data in self.monitor.subscribe():
+                    self.after(0, self._handle_event, event, data)
+            except Exception as e:
+                print(f"Stream de eventos detenido: {e}")
+        threading.Thread(target=task, daemon=True).start()
+
+    def _handle_event(self, event, data):
+        if event == "devices":
+            self.device_table.apply_changes(data.get('added', []), data.get('removed', []), data.get('modified', {}))
+        elif event == "alert":
+            a = data.get('alert', {})
+            if data.get('event') == "open":
+                self._upsert_alert(a)
+            else:
+                self._remove_alert(alert_key(a))
+        elif event == "status":
+            self._apply_status(data)
+        elif event == "resync":
+            self.refresh_devices()
+            self.refresh_alerts()
+
     def refresh_alerts(self):
         def task():
             try:
@@ -99,51 +279,53 @@ class NetworkMonitorApp(tk.Tk):
         threading.Thread(target=task, daemon=True).start()
 
     def _populate_alerts(self, alerts):
-        for item in self.tree_alerts.get_children():
-            self.tree_alerts.delete(item)
-        for a in alerts:
-            self.tree_alerts.insert("", "end", values=(
-                a.get('type'),
-                a.get('message'),
-                a.get('severity'),
-                a.get('timestamp'),
-                a.get('interface'),
-            ))
+        # Diff por (tipo, dispositivo): solo se insertan, actualizan o borran las filas necesarias
+        incoming = {alert_key(a): a for a in alerts}
+        for key in [k for k in self.alert_rows if k not in incoming]:
+            self._remove_alert(key)
+        for a in incoming.values():
+            self._upsert_alert(a)
+
+    def _upsert_alert(self, a):
+        key = alert_key(a)
+        values = (
+            a.get('type'),
+            a.get('message'),
+            a.get('severity'),
+            a.get('timestamp'),
+            a.get('interface'),
+        )
+        if self.alert_rows.get(key) == values:
+            return
+        if key in self.alert_rows:
+            self.tree_alerts.item(key, values=values)
+        else:
+            self.tree_alerts.insert("", "end", iid=key, values=values)
+        self.alert_rows[key] = values
+
+    def _remove_alert(self, key):
+        if self.alert_rows.pop(key, None) is not None:
+            self.tree_alerts.delete(key)
 
     def refresh_devices(self):
         def task():
             try:
                 data = self.monitor.fetch_all_devices()
                 devices = data if isinstance(data, list) else data.get('response', [])
-                self.after(0, self._build_device_tabs, devices)
+                self.after(0, self.device_table.set_devices, devices)
             except Exception as e:
                 self.after(0, lambda: messagebox.showerror("Error Dispositivos", str(e)))
         threading.Thread(target=task, daemon=True).start()
 
-    def _build_device_tabs(self, devices):
-        for tab in self.notebook.tabs():
-            self.notebook.forget(tab)
-        for d in devices:
-            frame = ttk.Frame(self.notebook)
-            self.notebook.add(frame, text=d.get('hostname'))
-            table = ttk.Frame(frame)
-            table.pack(fill="both", expand=True, padx=5, pady=5)
-            # Encabezados de tabla con fondo gris claro
-            tk.Label(table, text="Campo", borderwidth=1, relief="solid", bg="#cccccc", font=(None,10,'bold')).grid(row=0, column=0, sticky="nsew")
-            tk.Label(table, text="Valor", borderwidth=1, relief="solid", bg="#cccccc", font=(None,10,'bold')).grid(row=0, column=1, sticky="nsew")
-            table.columnconfigure(0, weight=1)
-            table.columnconfigure(1, weight=2)
-            # Filas de datos (sin 'description') con humanized keys
-            row = 1
-            for key, val in d.items():
-                if key == 'description':
-                    continue
-                display_key = humanize(key)
-                tk.Label(table, text=display_key, borderwidth=1, relief="solid", bg="#ffffff", anchor="w").grid(row=row, column=0, sticky="nsew")
-                tk.Label(table, text=str(val), borderwidth=1, relief="solid", bg="#ffffff", anchor="w").grid(row=row, column=1, sticky="nsew")
-                row += 1
-        if devices:
-            self.notebook.select(0)
+    def _show_device(self, d):
+        # Detalle del dispositivo seleccionado (sin 'description') con humanized keys
+        children = self.tree_detail.get_children()
+        if children:
+            self.tree_detail.delete(*children)
+        for key, val in d.items():
+            if key == 'description':
+                continue
+            self.tree_detail.insert("", "end", text=humanize(key), values=(str(val),))
 
 if __name__ == '__main__':
     app = NetworkMonitorApp()
@@ -0,0 +1,44 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Los módulos de API/core se importan por nombre, como al ejecutar api_restconf.py
+sys.path.insert(0, os.path.join(ROOT, "API", "core"))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture(scope="session")
+def simulator():
+    from dnac_simulator import DNACSimulator
+    sim = DNACSimulator(50, port=0).start()
+    yield sim
+    sim.stop()
+
+@pytest.fixture(scope="session")
+def api(simulator, tmp_path_factory):
+    """Cliente de la API contra el simulador; historial, reportes y alerts.db van a un directorio temporal"""
+    import network_monitor
+    from fastapi.testclient import TestClient
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("netmon"))
+    network_monitor.BASE_URL = simulator.base_url
+    import api_restconf
+    try:
+        with TestClient(api_restconf.app) as client:
+            assert client.get("/restconf/data/network-devices:devices").status_code == 200
+            yield client
+    finally:
+        os.chdir(cwd)
+
+@pytest.fixture
+def unreachable(api, simulator):
+    """Tres dispositivos no alcanzables: alertas DEVICE_UNREACHABLE sin interfaz"""
+    devices = simulator.inventory.devices[:3]
+    previous = [device["reachabilityStatus"] for device in devices]
+    for device in devices:
+        device["reachabilityStatus"] = "Unreachable"
+    assert api.post("/restconf/data/network-monitor:update").status_code == 200
+    yield api
+    for device, status in zip(devices, previous):
+        device["reachabilityStatus"] = status
+    api.post("/restconf/data/network-monitor:update")
@@ -0,0 +1,11 @@
+INTERFACES = "/restconf/data/network-monitor:interfaces"
+
+def test_interfaces_top(api):
+    assert api.post("/restconf/data/network-monitor:update").status_code == 200
+    response = api.get(INTERFACES, params={"top": 2})
+    assert response.status_code == 200
+    assert len(response.json()) <= 2
+
+def test_interfaces_top_out_of_range(api):
+    for top in (0, -1, 10 ** 6):
+        assert api.get(INTERFACES, params={"top": top}).status_code == 422
@@ -0,0 +1,18 @@
+from Program.core.monitor_cli import NetworkMonitorCLI
+
+def client(api):
+    # Las peticiones de la sesión van al TestClient en lugar de a un servidor real
+    cli = NetworkMonitorCLI(f"{api.base_url}/restconf/data")
+    cli.session = api
+    return cli
+
+def test_cli_receives_plain_lists(api, simulator):
+    cli = client(api)
+    devices = cli.fetch_all_devices()
+    assert isinstance(devices, list) and len(devices) == len(simulator.inventory.devices)
+    assert isinstance(cli.fetch_alerts(), list)
+    assert "polling_interval" in cli.fetch_status()
+
+def test_cli_alerts_keep_device_id(unreachable):
+    alerts = client(unreachable).fetch_alerts()
+    assert any(a["type"] == "DEVICE_UNREACHABLE" and a["device_id"] for a in alerts)
@@ -0,0 +1,34 @@
+import json
+import time
+import network_monitor
+from network_monitor import NetworkMonitor
+
+def test_controllers_keep_their_own_interval(simulator, tmp_path, monkeypatch):
+    """Un controlador con intervalo menor que el del monitor se sondea sin esperar al ciclo"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "controllers.json").write_text(json.dumps([
+        {"name": "rapido", "base_url": simulator.base_url, "polling_interval": 2},
+        {"name": "lento", "base_url": simulator.base_url},
+    ]))
+    monitor = NetworkMonitor()
+    monitor.polling_interval = 10
+    polls = {"rapido": [], "lento": []}
+    poll = monitor.scheduler._poll
+
+    def counted(controller, deadline):
+        polls[controller.name].append(time.time())
+        return poll(controller, deadline)
+
+    monkeypatch.setattr(monitor.scheduler, "_poll", counted)
+    monitor.start_monitoring()
+    try:
+        time.sleep(4.5)
+    finally:
+        monitor.stop_monitoring()
+    assert len(polls["lento"]) == 1
+    assert len(polls["rapido"]) >= 3
+    gaps = [b - a for a, b in zip(polls["rapido"], polls["rapido"][1:])]
+    assert all(gap >= 1.0 for gap in gaps)
+    fast, slow = monitor.scheduler.controllers
+    assert fast.last_started > slow.last_started
+    assert any(device["id"].startswith("rapido:") for device in monitor.scheduler.merged())
@@ -0,0 +1,14 @@
+from event_stream import EventBus, parse_event_id
+
+def test_since_ahead_of_bus_is_resync():
+    bus = EventBus()
+    assert bus.since(500) is None
+    bus.publish("status", {})
+    assert bus.since(0) == [(1, "status", {})]
+    assert bus.since(1) == []
+
+def test_event_id_roundtrip():
+    bus = EventBus()
+    assert parse_event_id(bus.event_id(7)) == (bus.epoch, 7)
+    assert parse_event_id("42") == (None, 0)
+    assert EventBus().epoch != bus.epoch
@@ -0,0 +1,29 @@
+import time
+import network_monitor
+from network_monitor import NetworkMonitor
+
+def test_loop_survives_failed_cycle(simulator, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(network_monitor, "BASE_URL", simulator.base_url)
+    monitor = NetworkMonitor()
+    monitor.polling_interval = 0.2
+    poll = monitor._poll_inventory
+    failures = []
+
+    def flaky(*args, **kwargs):
+        if not failures:
+            failures.append(1)
+            raise RuntimeError("controlador caído")
+        return poll(*args, **kwargs)
+
+    monkeypatch.setattr(monitor, "_poll_inventory", flaky)
+    monitor.start_monitoring()
+    try:
+        deadline = time.time() + 10
+        while time.time() < deadline and monitor.cycles < 1:
+            time.sleep(0.05)
+        assert monitor.cycles >= 1
+        assert monitor._thread.is_alive()
+        assert monitor.recent_cycles[0]["error"] == "RuntimeError: controlador caído"
+    finally:
+        monitor.stop_monitoring()
@@ -0,0 +1,20 @@
+from profiling import CycleProfiler
+
+def test_sampling_short_cycle_has_samples():
+    profiler = CycleProfiler()
+    profiler.start(1, mode="sampling")
+    profiler.cycle_started()
+    profiler.cycle_finished()    # mucho más corto que SAMPLE_INTERVAL
+    status = profiler.status()
+    assert status["state"] == "done"
+    assert profiler.result["samples"] >= 1
+
+def test_diagnostics_disabled_by_default(api):
+    assert api.post("/admin/profile", json={"cycles": 1}).status_code == 403
+    assert api.post("/admin/memory").status_code == 403
+    assert api.get("/admin/memory/snapshot").status_code == 403
+
+def test_diagnostics_enabled(api, monkeypatch):
+    import api_restconf
+    monkeypatch.setattr(api_restconf, "DIAGNOSTICS_ENABLED", True)
+    assert api.get("/admin/profile").status_code == 200
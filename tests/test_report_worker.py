@@ -0,0 +1,10 @@
+from report_worker import ReportWorker, ReportSnapshot
+
+def test_replaced_snapshot_keeps_devices_table(monkeypatch):
+    worker = ReportWorker()
+    monkeypatch.setattr(worker, "_thread", object())     # sin hilo: las instantáneas quedan en la cola
+    worker.submit(ReportSnapshot(devices_table=({"id": "a"},), reachability=(), alerts=()))
+    worker.submit(ReportSnapshot(devices_table=None, reachability=(), alerts=({"type": "X"},)))
+    pending = worker._queue.get_nowait()
+    assert pending.devices_table == ({"id": "a"},)
+    assert pending.alerts == ({"type": "X"},)
@@ -0,0 +1,17 @@
+from response_cache import ResponseCache
+
+def test_restarted_collector_does_not_reuse_cached_body():
+    """La generación vuelve a 0 al reiniciar el colector: la época distingue las entradas"""
+    cache = ResponseCache()
+    first = cache.get("devices", 0, lambda: ["antes"], epoch="aaaa")
+    assert cache.get("devices", 0, lambda: ["otro"], epoch="aaaa") is first
+    second = cache.get("devices", 0, lambda: ["después"], epoch="bbbb")
+    assert second.body == b'["despu\xc3\xa9s"]'
+    assert second.etag != first.etag and second.etag.startswith('"bbbb-')
+    same_body = cache.get("devices", 0, lambda: ["después"], epoch="cccc")
+    assert same_body.etag != second.etag and same_body.gzip_etag.endswith('-gz"')
+
+def test_etag_carries_monitor_epoch(api):
+    import api_restconf
+    response = api.get("/restconf/data/network-devices:devices")
+    assert response.headers["etag"].startswith(f'"{api_restconf.monitor.snapshot.epoch}-')
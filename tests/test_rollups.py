@@ -0,0 +1,36 @@
+import network_monitor
+from network_monitor import NetworkMonitor
+from segment_store import SegmentStore
+
+DAY = 86400
+
+def rows(reachability):
+    return [("dev1", reachability, 1000, 4, "17.9")]
+
+def test_rollups_rebuilt_over_tier_horizon(tmp_path, monkeypatch):
+    monkeypatch.setattr(network_monitor, "HISTORY_DIR", str(tmp_path))
+    store = SegmentStore(str(tmp_path))
+    now = network_monitor.time.time()
+    # Un punto hace 5 días (fuera de las 6 h del buffer, dentro de los 7 días de 15 min) y uno reciente
+    store.append_batch(now - 5 * DAY, rows("Unreachable"))
+    store.append_batch(now - 60, rows("Reachable"))
+    monitor = NetworkMonitor()
+    monitor.load_history()
+    assert len(monitor.device_history.points("dev1")) == 1
+    points = monitor.history_rollups.query("dev1", now - 6 * DAY, now, 900)
+    assert [p["availability"] for p in points] == [0.0, 1.0]
+
+def test_saved_rollups_replay_only_newer_points(tmp_path, monkeypatch):
+    monkeypatch.setattr(network_monitor, "HISTORY_DIR", str(tmp_path))
+    store = SegmentStore(str(tmp_path))
+    now = network_monitor.time.time()
+    store.append_batch(now - 3 * DAY, rows("Unreachable"))
+    first = NetworkMonitor()
+    first.load_history()
+    first._history_until = now - 3 * DAY
+    first.save_rollups()
+    store.append_batch(now - 60, rows("Reachable"))
+    second = NetworkMonitor()
+    second.load_history()
+    points = second.history_rollups.query("dev1", now - 4 * DAY, now, 3600)
+    assert [p["samples"] for p in points] == [1, 1]
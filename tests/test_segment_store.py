@@ -0,0 +1,28 @@
+import random
+from segment_store import SegmentStore
+
+START = 1_700_000_000.0
+
+def fill(store, cycles=50, devices=40):
+    ids = [f"dev{i}" for i in range(devices)]
+    rng = random.Random(1)
+    for cycle in range(cycles):
+        rows = [(device_id, "Reachable", cycle, 4, "17.9") for device_id in rng.sample(ids, devices - 5)]
+        store.append_batch(START + cycle * 15, rows)
+
+def test_device_range_matches_full_scan(tmp_path):
+    store = SegmentStore(str(tmp_path))
+    fill(store)
+    start, end = START + 100, START + 500
+    scanned = [record for record in store.read_range(start, end) if record[0] == "dev3"]
+    assert scanned and list(store.read_range(start, end, "dev3")) == scanned
+    # Con ciclos nuevos el índice de ciclos se extiende
+    store.append_batch(START + 50 * 15, [("dev3", "Unreachable", 1, 4, "17.9")])
+    assert list(store.read_range(START + 50 * 15, START + 50 * 15, "dev3"))[0][2] == "Unreachable"
+
+def test_unsorted_segments_are_scanned(tmp_path):
+    store = SegmentStore(str(tmp_path))
+    fill(store)
+    store.sorted_since = "99999999.seg"     # segmentos escritos antes de ordenar por dispositivo
+    scanned = [record for record in store.read_range(START, START + 1000) if record[0] == "dev3"]
+    assert list(store.read_range(START, START + 1000, "dev3")) == scanned
@@ -0,0 +1,47 @@
+import os
+import pytest
+import snapshot_channel
+from snapshot_channel import (SnapshotPublisher, SnapshotReader, ControlServer, ControlClient,
+                              UnsafeChannel, runtime_dir)
+
+@pytest.fixture
+def channel_dir(tmp_path, monkeypatch):
+    path = tmp_path / "netmon"
+    monkeypatch.setenv(snapshot_channel.RUNTIME_DIR_ENV, str(path))
+    return path
+
+def test_runtime_dir_is_private(channel_dir):
+    assert runtime_dir() == str(channel_dir)
+    assert os.stat(channel_dir).st_mode & 0o777 == 0o700
+
+def test_runtime_dir_refuses_shared_directory(channel_dir):
+    channel_dir.mkdir(mode=0o777)
+    os.chmod(channel_dir, 0o777)
+    with pytest.raises(UnsafeChannel):
+        runtime_dir()
+
+def test_reader_refuses_writable_snapshot(channel_dir):
+    publisher = SnapshotPublisher()
+    publisher.publish({"generation": 1})
+    assert SnapshotReader().current() == {"generation": 1}
+    os.chmod(publisher.path, 0o666)
+    with pytest.raises(UnsafeChannel):
+        SnapshotReader().current()
+
+@pytest.mark.skipif(os.getuid() != 0, reason="chown a otro usuario requiere root")
+def test_reader_refuses_foreign_snapshot(channel_dir):
+    publisher = SnapshotPublisher()
+    publisher.publish({"generation": 1})
+    os.chown(publisher.path, os.getuid() + 1000, -1)
+    with pytest.raises(UnsafeChannel):
+        SnapshotReader().current()
+
+def test_control_roundtrip(channel_dir):
+    server = ControlServer({"echo": lambda value: value}).start()
+    try:
+        assert ControlClient().call("echo", 42) == 42
+        os.chmod(server.server_address, 0o666)
+        with pytest.raises(UnsafeChannel):
+            ControlClient().call("echo", 1)
+    finally:
+        server.stop()
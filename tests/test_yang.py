@@ -0,0 +1,34 @@
+import json
+import xml.etree.ElementTree as ET
+
+ALERTS = "/restconf/data/network-alerts:alerts"
+YANG_JSON = "application/yang-data+json"
+YANG_XML = "application/yang-data+xml"
+ALERT_TYPES = {"INTERFACE_DOWN", "NO_IP_ASSIGNED", "HIGH_ERROR_RATE", "HIGH_BANDWIDTH", "OTHER"}
+
+def test_alerts_yang_json(unreachable):
+    assert any(a["type"] == "DEVICE_UNREACHABLE" for a in unreachable.get(ALERTS).json())
+    response = unreachable.get(ALERTS, headers={"Accept": YANG_JSON})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(YANG_JSON)
+    alerts = json.loads(response.content)["network-monitor:alerts"]["alert"]
+    assert alerts and {a["type"] for a in alerts} <= ALERT_TYPES
+    assert not any("interface" in a for a in alerts if a["type"] == "OTHER")
+    unreachable_ids = {a["network-monitor-extensions:device-id"] for a in alerts
+                       if a["network-monitor-extensions:alert-type"] == "DEVICE_UNREACHABLE"}
+    assert len(unreachable_ids) >= 3
+
+def test_alerts_yang_xml(unreachable):
+    response = unreachable.get(ALERTS, headers={"Accept": YANG_XML})
+    assert response.status_code == 200
+    root = ET.fromstring(response.content)
+    namespace = "{urn:cisco:network-monitor}"
+    alerts = root.findall(f"{namespace}alert")
+    assert alerts and {a.findtext(f"{namespace}type") for a in alerts} <= ALERT_TYPES
+    extensions = "{urn:cisco:network-monitor-extensions}"
+    assert "DEVICE_UNREACHABLE" in {a.findtext(f"{extensions}alert-type") for a in alerts}
+
+def test_validate_own_output(unreachable):
+    result = unreachable.get("/admin/yang/validate").json()
+    assert result["checked"]["devices"] and result["checked"]["alerts"] >= 3
+    assert result["valid"], result["errors"]